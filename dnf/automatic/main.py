@@ -31,6 +31,7 @@ import dnf.conf
 import libdnf.conf
 import dnf.const
 import dnf.exceptions
+import dnf.lock
 import dnf.util
 import dnf.logging
 import hawkey
@@ -70,6 +71,7 @@ def parse_arguments(args):
     parser = argparse.ArgumentParser()
     parser.add_argument('conf_path', nargs='?', default=dnf.const.CONF_AUTOMATIC_FILENAME)
     parser.add_argument('--timer', action='store_true')
+    parser.add_argument('--daemon', action='store_true')
     parser.add_argument('--installupdates', dest='installupdates', action='store_true')
     parser.add_argument('--downloadupdates', dest='downloadupdates', action='store_true')
     parser.add_argument('--no-installupdates', dest='installupdates', action='store_false')
@@ -170,6 +172,7 @@ class CommandsConfig(Config):
         self.add_option('upgrade_type', libdnf.conf.OptionEnumString('default',
                         libdnf.conf.VectorString(['default', 'security'])))
         self.add_option('random_sleep', libdnf.conf.OptionNumberInt32(300))
+        self.add_option('daemon_interval', libdnf.conf.OptionNumberInt32(3600))
 
     def imply(self):
         if self.apply_updates:
@@ -217,6 +220,87 @@ class EmittersConfig(Config):
         self.add_option('system_name', libdnf.conf.OptionString(socket.gethostname()))
 
 
+def _rpmdb_stamp(base):
+    return dnf.util._rpmdb_stamp(base.conf.installroot)
+
+
+def _refresh_sack(base, rpmdb_stamp):
+    """Keep the sack of a previous check unless the rpmdb or some metadata changed.
+
+    Returns the rpmdb stamp the sack corresponds to.
+
+    """
+    stamp = _rpmdb_stamp(base)
+    rebuild = base._sack is None or stamp is None or stamp != rpmdb_stamp
+    # do not race a concurrent makecache writing the same cache directory
+    lock = dnf.lock.build_metadata_lock(base.conf.cachedir, base.conf.exit_on_lock)
+    with lock:
+        for repo in base.repos.iter_enabled():
+            has_cache, expires_in = repo._metadata_expire_in()
+            if has_cache and (expires_in is None or expires_in > 0):
+                continue
+            try:
+                # downloads only if the metadata on the mirror changed
+                if repo.load() or not has_cache:
+                    logger.debug(_('%s: metadata changed.'), repo.id)
+                    rebuild = True
+            except dnf.exceptions.RepoError:
+                rebuild = True
+        if rebuild:
+            # repos which did not change are loaded from their solv cache
+            base.fill_sack()
+        else:
+            logger.debug(_('Reusing the package sack.'))
+    return stamp
+
+
+def _check_updates(base, conf):
+    base.reset(goal=True)
+    base._update_security_filters = []
+    upgrade(base, conf.commands.upgrade_type)
+    base.resolve()
+    output = dnf.cli.output.Output(base, base.conf)
+    trans = base.transaction
+    if not trans:
+        return
+
+    lst = output.list_transaction(trans)
+    emitters = build_emitters(conf)
+    emitters.notify_available(lst)
+    if not conf.commands.download_updates:
+        emitters.commit()
+        return
+
+    base.download_packages(trans.install_set)
+    emitters.notify_downloaded()
+    if not conf.commands.apply_updates:
+        emitters.commit()
+        return
+
+    base.do_transaction()
+    emitters.notify_applied()
+    emitters.commit()
+
+
+def _run_daemon(base, conf):
+    """Check for updates every daemon_interval seconds, keeping the sack between the checks."""
+    rpmdb_stamp = None
+    while True:
+        try:
+            rpmdb_stamp = _refresh_sack(base, rpmdb_stamp)
+            _check_updates(base, conf)
+        except dnf.exceptions.Error as exc:
+            logger.error(_('Error: %s'), ucd(exc))
+            # start over with a fresh sack next time
+            base.reset(sack=True, goal=True)
+        except Exception as exc:
+            # e.g. OSError or a libdnf RuntimeError, neither may end the daemon
+            logger.exception(_('Unexpected error: %s'), ucd(exc))
+            base.reset(sack=True, goal=True)
+        logger.debug(_('Sleep for %s seconds'), conf.commands.daemon_interval)
+        time.sleep(conf.commands.daemon_interval)
+
+
 def main(args):
     (opts, parser) = parse_arguments(args)
 
@@ -238,30 +322,10 @@ def main(args):
             base.pre_configure_plugins()
             base.read_all_repos()
             base.configure_plugins()
+            if opts.daemon:
+                _run_daemon(base, conf)
             base.fill_sack()
-            upgrade(base, conf.commands.upgrade_type)
-            base.resolve()
-            output = dnf.cli.output.Output(base, base.conf)
-            trans = base.transaction
-            if not trans:
-                return 0
-
-            lst = output.list_transaction(trans)
-            emitters = build_emitters(conf)
-            emitters.notify_available(lst)
-            if not conf.commands.download_updates:
-                emitters.commit()
-                return 0
-
-            base.download_packages(trans.install_set)
-            emitters.notify_downloaded()
-            if not conf.commands.apply_updates:
-                emitters.commit()
-                return 0
-
-            base.do_transaction()
-            emitters.notify_applied()
-            emitters.commit()
+            _check_updates(base, conf)
     except dnf.exceptions.Error as exc:
         logger.error(_('Error: %s'), ucd(exc))
         return 1
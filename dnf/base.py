@@ -39,10 +39,12 @@ try:
 except ImportError:
     from collections import Sequence
 import datetime
+import dnf.cache_manager
 import dnf.callback
 import dnf.comps
 import dnf.conf
 import dnf.conf.read
+import dnf.const
 import dnf.crypto
 import dnf.dnssec
 import dnf.drpm
@@ -56,6 +58,8 @@ try:
     WITH_MODULES = True
 except ImportError:
     WITH_MODULES = False
+import dnf.name_index
+import dnf.package
 import dnf.persistor
 import dnf.plugin
 import dnf.query
@@ -71,8 +75,10 @@ import dnf.transaction
 import dnf.util
 import dnf.yum.rpmtrans
 import functools
+import hashlib
 import hawkey
 import itertools
+import json
 import logging
 import math
 import os
@@ -112,6 +118,10 @@ class Base(object):
         self._tempfile_persistor = None
         self._update_security_filters = []
         self._allow_erasing = False
+        self._resolve_cache = False
+        self._resolved_entry = None
+        self._update_name_index = False
+        self._cache_budget = None
         self._repo_set_imported_gpg_keys = set()
         self.output = None
 
@@ -155,20 +165,26 @@ class Base(object):
                 dnf.rpm.detect_releasever(conf.installroot)
         return conf
 
+    def _filter_modules(self):
+        hot_fix_repos = [i.id for i in self.repos.iter_enabled() if i.module_hotfixes]
+        try:
+            solver_errors = self.sack.filter_modules(
+                self._moduleContainer, hot_fix_repos, self.conf.installroot,
+                self.conf.module_platform_id, False, self.conf.debug_solver)
+        except hawkey.Exception as e:
+            raise dnf.exceptions.Error(ucd(e))
+        if solver_errors:
+            logger.warning(
+                dnf.module.module_base.format_modular_solver_errors(solver_errors[0]))
+
     def _setup_excludes_includes(self, only_main=False):
         disabled = set(self.conf.disable_excludes)
         if 'all' in disabled and WITH_MODULES:
-            hot_fix_repos = [i.id for i in self.repos.iter_enabled() if i.module_hotfixes]
-            try:
-                solver_errors = self.sack.filter_modules(
-                    self._moduleContainer, hot_fix_repos, self.conf.installroot,
-                    self.conf.module_platform_id, False, self.conf.debug_solver)
-            except hawkey.Exception as e:
-                raise dnf.exceptions.Error(ucd(e))
-            if solver_errors:
-                logger.warning(
-                    dnf.module.module_base.format_modular_solver_errors(solver_errors[0]))
+            self._filter_modules()
             return
+        # patterns shared by several repos or by a repo and the main config
+        # are matched only once
+        matcher = _PatternMatcher(self.sack)
         repo_includes = []
         repo_excludes = []
         # first evaluate repo specific includes/excludes
@@ -177,63 +193,26 @@ class Base(object):
                 if r.id in disabled:
                     continue
                 if len(r.includepkgs) > 0:
-                    incl_query = self.sack.query().filterm(empty=True)
-                    for incl in set(r.includepkgs):
-                        subj = dnf.subject.Subject(incl)
-                        incl_query = incl_query.union(subj.get_best_query(
-                            self.sack, with_nevra=True, with_provides=False, with_filenames=False))
-                    incl_query.filterm(reponame=r.id)
+                    incl_query = matcher.query(r.includepkgs).filterm(reponame=r.id)
                     repo_includes.append((incl_query.apply(), r.id))
-                excl_query = self.sack.query().filterm(empty=True)
-                for excl in set(r.excludepkgs):
-                    subj = dnf.subject.Subject(excl)
-                    excl_query = excl_query.union(subj.get_best_query(
-                        self.sack, with_nevra=True, with_provides=False, with_filenames=False))
-                excl_query.filterm(reponame=r.id)
+                excl_query = matcher.query(r.excludepkgs).filterm(reponame=r.id)
                 if excl_query:
                     repo_excludes.append((excl_query, r.id))
 
         # then main (global) includes/excludes because they can mask
         # repo specific settings
         if 'main' not in disabled:
-            include_query = self.sack.query().filterm(empty=True)
-            if len(self.conf.includepkgs) > 0:
-                for incl in set(self.conf.includepkgs):
-                    subj = dnf.subject.Subject(incl)
-                    include_query = include_query.union(subj.get_best_query(
-                        self.sack, with_nevra=True, with_provides=False, with_filenames=False))
-            exclude_query = self.sack.query().filterm(empty=True)
-            for excl in set(self.conf.excludepkgs):
-                subj = dnf.subject.Subject(excl)
-                exclude_query = exclude_query.union(subj.get_best_query(
-                    self.sack, with_nevra=True, with_provides=False, with_filenames=False))
+            include_query = matcher.query(self.conf.includepkgs)
+            exclude_query = matcher.query(self.conf.excludepkgs)
             if not only_main and WITH_MODULES:
-                hot_fix_repos = [i.id for i in self.repos.iter_enabled() if i.module_hotfixes]
-                try:
-                    solver_errors = self.sack.filter_modules(
-                        self._moduleContainer, hot_fix_repos, self.conf.installroot,
-                        self.conf.module_platform_id, False, self.conf.debug_solver)
-                except hawkey.Exception as e:
-                    raise dnf.exceptions.Error(ucd(e))
-                if solver_errors:
-                    logger.warning(
-                        dnf.module.module_base.format_modular_solver_errors(solver_errors[0]))
+                self._filter_modules()
             if len(self.conf.includepkgs) > 0:
                 self.sack.add_includes(include_query)
                 self.sack.set_use_includes(True)
             if exclude_query:
                 self.sack.add_excludes(exclude_query)
         elif not only_main and WITH_MODULES:
-            hot_fix_repos = [i.id for i in self.repos.iter_enabled() if i.module_hotfixes]
-            try:
-                solver_errors = self.sack.filter_modules(
-                    self._moduleContainer, hot_fix_repos, self.conf.installroot,
-                    self.conf.module_platform_id, False, self.conf.debug_solver)
-            except hawkey.Exception as e:
-                raise dnf.exceptions.Error(ucd(e))
-            if solver_errors:
-                logger.warning(
-                    dnf.module.module_base.format_modular_solver_errors(solver_errors[0]))
+            self._filter_modules()
 
         if repo_includes:
             for query, repoid in repo_includes:
@@ -311,7 +290,10 @@ class Base(object):
         # :api
         """Load plugins and run their __init__()."""
         if self.conf.plugins:
-            self._plugins._load(self.conf, disabled_glob, enable_plugins)
+            manifest = os.path.join(self.conf.cachedir,
+                                    dnf.const.PLUGIN_MANIFEST)
+            self._plugins._load(self.conf, disabled_glob, enable_plugins,
+                                manifest)
         self._plugins._run_init(self, cli)
 
     def pre_configure_plugins(self):
@@ -324,7 +306,41 @@ class Base(object):
         """Run plugins configure() method."""
         self._plugins._run_config()
 
-    def update_cache(self, timer=False):
+    def _timer_due_repos(self, period, expiry, max_repos=None):
+        """Return the enabled repos the timer should refresh now.
+
+        Every repo has its own refresh deadline. A repo seen for the first
+        time is scheduled at an offset within the period that differs among
+        hosts, so a fleet of machines does not hit the mirrors all at once.
+        Repos without any cached metadata are always due. At most max_repos
+        repos, those overdue the most, are refreshed by one run. Their
+        deadlines are only moved by update_cache() once they loaded.
+
+        """
+        now = time.time()
+        persistor = self._repo_persistor
+        deadlines = persistor.get_refresh_deadlines()
+        due = []
+        for r in self.repos.iter_enabled():
+            is_cache = expiry[r.id][0]
+            deadline = deadlines.get(r.id)
+            if not is_cache:
+                due.append((0, r))
+            elif deadline is None:
+                deadline = now + dnf.util._host_offset(r.id, period)
+                persistor.refresh_to_set[r.id] = deadline
+                logger.debug(_('%s: scheduled for refresh in %d seconds.'),
+                             r.id, deadline - now)
+            elif deadline <= now:
+                due.append((deadline, r))
+        due.sort(key=operator.itemgetter(0))
+        if max_repos and len(due) > max_repos:
+            for _deadline, r in due[max_repos:]:
+                logger.debug(_('%s: refresh postponed to the next run.'), r.id)
+            due = due[:max_repos]
+        return [r for _deadline, r in due]
+
+    def update_cache(self, timer=False, max_repos=None):
         # :api
 
         period = self.conf.metadata_timer_sync
@@ -344,10 +360,6 @@ class Base(object):
                 msg = _('Metadata timer caching disabled.')
                 logger.info(msg)
                 return False
-            since_last_makecache = persistor.since_last_makecache()
-            if since_last_makecache is not None and since_last_makecache < period:
-                logger.info(_('Metadata cache refreshed recently.'))
-                return False
             for repo in self.repos.values():
                 repo._repo.setMaxMirrorTries(1)
 
@@ -356,8 +368,18 @@ class Base(object):
                 '", "'.join(self.conf.reposdir)))
             return False
 
-        for r in self.repos.iter_enabled():
-            (is_cache, expires_in) = r._metadata_expire_in()
+        enabled = list(self.repos.iter_enabled())
+        expiry = dict((r.id, r._metadata_expire_in()) for r in enabled)
+        if timer:
+            refresh = self._timer_due_repos(period, expiry, max_repos)
+            if not refresh:
+                logger.info(_('Metadata cache refreshed recently.'))
+                return False
+        else:
+            refresh = enabled
+
+        for r in refresh:
+            (is_cache, expires_in) = expiry[r.id]
             if expires_in is None:
                 logger.info(_('%s: will never be expired and will not be refreshed.'), r.id)
             elif not is_cache or expires_in <= 0:
@@ -372,9 +394,24 @@ class Base(object):
                 logger.debug(_('%s: will expire after %d seconds.'), r.id,
                              expires_in)
 
+        # repos not due yet are left out of this run entirely
+        skipped = [r for r in enabled if r not in refresh]
+        for r in skipped:
+            r.disable()
         if timer:
             persistor.reset_last_makecache = True
-        self.fill_sack(load_system_repo=False, load_available_repos=True)  # performs the md sync
+        try:
+            self.fill_sack(load_system_repo=False, load_available_repos=True)  # performs the md sync
+        finally:
+            for r in skipped:
+                r.enable()
+        if timer:
+            # fill_sack() disables the repos it failed to load, they stay due
+            # and the next run retries them
+            now = time.time()
+            for r in refresh:
+                if r.enabled:
+                    persistor.refresh_to_set[r.id] = now + period
         logger.info(_('Metadata cache created.'))
         return True
 
@@ -384,6 +421,7 @@ class Base(object):
         timer = dnf.logging.Timer('sack setup')
         self.reset(sack=True, goal=True)
         self._sack = dnf.sack._build_sack(self)
+        system_loaded = False
         lock = dnf.lock.build_metadata_lock(self.conf.cachedir, self.conf.exit_on_lock)
         with lock:
             if load_system_repo is not False:
@@ -391,6 +429,7 @@ class Base(object):
                     # FIXME: If build_cache=True, @System.solv is incorrectly updated in install-
                     # remove loops
                     self._sack.load_system_repo(build_cache=False)
+                    system_loaded = True
                 except IOError:
                     if load_system_repo != 'auto':
                         raise
@@ -400,6 +439,7 @@ class Base(object):
                 age = time.time()
                 # Iterate over installed GPG keys and check their validity using DNSSEC
                 if self.conf.gpgkey_dns_verification:
+                    dnf.dnssec.DNSSECKeyVerification._set_cachedir(self.conf.cachedir)
                     dnf.dnssec.RpmImportedKeys.check_imported_keys_validity()
                 for r in self.repos.iter_enabled():
                     try:
@@ -430,6 +470,10 @@ class Base(object):
         conf = self.conf
         self._sack._configure(conf.installonlypkgs, conf.installonly_limit)
         self._setup_excludes_includes()
+        if self._update_name_index:
+            # keep the names for shell completion in sync with what was loaded
+            dnf.name_index.update(os.path.join(conf.cachedir, dnf.const.NAME_INDEX),
+                                  self, system_loaded, bool(load_available_repos))
         timer()
         self._goal = dnf.goal.Goal(self._sack)
         self._plugins.run_sack()
@@ -483,7 +527,9 @@ class Base(object):
         # :api
         """Read repositories from the main conf file and from .repo files."""
 
-        reader = dnf.conf.read.RepoReader(self.conf, opts)
+        snapshot = os.path.join(self.conf.cachedir,
+                                dnf.const.REPOCONF_SNAPSHOT)
+        reader = dnf.conf.read.RepoReader(self.conf, opts, snapshot)
         for repo in reader:
             try:
                 self.repos.add(repo)
@@ -508,6 +554,7 @@ class Base(object):
                 self.history.close()
             self._comps_trans = dnf.comps.TransactionBunch()
             self._transaction = None
+            self._resolved_entry = None
 
     def _closeRpmDB(self):
         """Closes down the instances of rpmdb that could be open."""
@@ -734,11 +781,96 @@ class Base(object):
             goal.write_debugdata('./debugdata/rpms')
         return ret
 
+    def _resolve_key(self, allow_erasing):
+        """Return a digest of everything resolving the goal depends on.
+
+        None is returned when the result must not be reused: when jobs were
+        added to the goal bypassing dnf.goal.Goal, with packages given as
+        local files or when the metadata of an enabled repo can not be
+        fingerprinted.
+
+        """
+        if self.conf.debug_solver:
+            return None
+        jobs = self._goal._job_key()
+        if jobs is None:
+            return None
+        if self.sack.query().filterm(reponame=hawkey.CMDLINE_REPO_NAME):
+            return None
+        repos = []
+        for repo in sorted(self.repos.iter_enabled(), key=lambda r: r.id):
+            repomd = os.path.join(repo._repo.getCachedir(), 'repodata', 'repomd.xml')
+            try:
+                with open(repomd, 'rb') as f:
+                    repos.append([repo.id, hashlib.sha256(f.read()).hexdigest()])
+            except (IOError, OSError):
+                return None
+        last = self.history.last()
+        modules = [sorted(self._moduleContainer.getEnabledStreams().items()),
+                   sorted(self._moduleContainer.getDisabledModules())]
+        excludes = [[repo.id, list(repo.excludepkgs), list(repo.includepkgs)]
+                    for repo in sorted(self.repos.iter_enabled(), key=lambda r: r.id)]
+        # also covers what plugins like versionlock exclude from the sack
+        hidden = self.sack.query(flags=hawkey.IGNORE_EXCLUDES).difference(self.sack.query())
+        excludes.append(sorted(dnf.goal._pkg_id(pkg) for pkg in hidden))
+        data = [jobs, allow_erasing, self.conf.dump(), repos,
+                self.sack._rpmdb_version(), last.tid if last is not None else None,
+                modules, sorted(plugin.name for plugin in self._plugins.plugins), excludes]
+        return hashlib.sha256(json.dumps(data).encode('utf-8')).hexdigest()
+
+    def _load_resolved(self, key):
+        path = os.path.join(self.conf.cachedir, dnf.const.RESOLVE_CACHE)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('key') != key:
+            return None
+        try:
+            solved = dnf.goal._ResolvedGoal.load(self.sack, data['goal'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if solved is not None:
+            self._resolved_entry = data
+        return solved
+
+    def _save_resolved(self, entry):
+        self._resolved_entry = entry
+        self._write_cache_json(os.path.join(self.conf.cachedir, dnf.const.RESOLVE_CACHE), entry)
+
+    def _cached_skipped(self):
+        """Return the stored Output._skipped_packages() result of the goal or None."""
+        entry = self._resolved_entry
+        if entry is None or 'skipped' not in entry:
+            return None
+        try:
+            return dnf.goal._load_skipped(self.sack, entry['skipped'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _cache_skipped(self, conflicts, broken, problems):
+        """Store the Output._skipped_packages() result with the resolved goal."""
+        if self._resolved_entry is not None:
+            self._resolved_entry['skipped'] = dnf.goal._dump_skipped(conflicts, broken, problems)
+            self._save_resolved(self._resolved_entry)
+
+    def _write_cache_json(self, path, data):
+        try:
+            with dnf.util._atomic_write(path) as f:
+                json.dump(data, f)
+        except (IOError, OSError) as e:
+            logger.debug('Cannot write the cache file %s: %s', path, e)
+
     def resolve(self, allow_erasing=False):
         # :api
         """Build the transaction set."""
         exc = None
         self._finalize_comps_trans()
+        # the jobs added below follow from the rpmdb and the history
+        key = self._resolve_key(allow_erasing) if self._resolve_cache else None
+
+        self._resolved_entry = None
 
         timer = dnf.logging.Timer('depsolve')
         self._ds_callback.start()
@@ -758,13 +890,22 @@ class Base(object):
 
         goal.add_protected(self.sack.query().filterm(
             name=self.conf.protected_packages))
-        if not self._run_hawkey_goal(goal, allow_erasing):
+        solved = self._load_resolved(key) if key is not None else None
+        if solved is not None:
+            # the goal itself stays unsolved, Output._skipped_packages() takes
+            # its result from the cache entry as well
+            logger.debug('Reusing the cached result of resolving the goal.')
+            self._transaction = self._goal2transaction(solved)
+        elif not self._run_hawkey_goal(goal, allow_erasing):
             if self.conf.debuglevel >= 6:
                 goal.log_decisions()
             msg = dnf.util._format_resolve_problems(goal.problem_rules())
             exc = dnf.exceptions.DepsolveError(msg)
         else:
+            solved = goal
             self._transaction = self._goal2transaction(goal)
+            if key is not None:
+                self._save_resolved({'key': key, 'goal': dnf.goal._ResolvedGoal.dump(goal)})
 
         self._ds_callback.end()
         timer()
@@ -782,10 +923,10 @@ class Base(object):
         self._plugins.run_resolved()
 
         # auto-enable module streams based on installed RPMs
-        new_pkgs = self._goal.list_installs()
-        new_pkgs += self._goal.list_upgrades()
-        new_pkgs += self._goal.list_downgrades()
-        new_pkgs += self._goal.list_reinstalls()
+        new_pkgs = solved.list_installs()
+        new_pkgs += solved.list_upgrades()
+        new_pkgs += solved.list_downgrades()
+        new_pkgs += solved.list_reinstalls()
         self.sack.set_modules_enabled_by_pkgset(self._moduleContainer, new_pkgs)
 
         return got_transaction
@@ -849,7 +990,10 @@ class Base(object):
             self._ts.clean()  # release memory not needed beyond this point
 
             testcb = dnf.yum.rpmtrans.RPMTransaction(self, test=True)
-            tserrors = self._ts.test(testcb)
+            try:
+                tserrors = self._ts.test(testcb)
+            finally:
+                testcb._shutdownOutputLogging()
             del testcb
 
             if len(tserrors) > 0:
@@ -967,7 +1111,12 @@ class Base(object):
                     onice = 0
 
         logger.log(dnf.logging.DDEBUG, 'RPM transaction start.')
-        errors = self._ts.run(cb.callback, '')
+        try:
+            errors = self._ts.run(cb.callback, '')
+            # the scriptlets run after the last callback, like %posttrans
+            cb._scriptout()
+        finally:
+            cb._shutdownOutputLogging()
         logger.log(dnf.logging.DDEBUG, 'RPM transaction over.')
         # ts.run() exit codes are, hmm, "creative": None means all ok, empty
         # list means some errors happened in the transaction and non-empty
@@ -1159,12 +1308,31 @@ class Base(object):
                                               dnf.repo.RPMPayload)
                         for pkg in remote_pkgs]
             self._download_remote_payloads(payloads, drpm, progress, callback_total)
+            if self._cache_budget is not None:
+                self._enforce_cache_budget(pkglist)
 
         if self.conf.destdir:
             for pkg in local_repository_pkgs:
                 location = os.path.join(pkg.repo.pkgdir, pkg.location.lstrip("/"))
                 shutil.copy(location, self.conf.destdir)
 
+    def _enforce_cache_budget(self, pkglist):
+        """Evict the least recently used data over the cache budget.
+
+        The packages of pkglist and the metadata of the enabled repos are kept.
+
+        """
+        cachedir = self.conf.cachedir
+        max_size, max_age = self._cache_budget
+        keep = [os.path.relpath(pkg.localPkg(), cachedir) for pkg in pkglist]
+        active = set(repo.id for repo in self.repos.iter_enabled())
+        md_lock = dnf.lock.build_metadata_lock(cachedir, self.conf.exit_on_lock)
+        download_lock = dnf.lock.build_download_lock(cachedir, self.conf.exit_on_lock)
+        with md_lock, download_lock:
+            count = dnf.cache_manager.enforce_budget(cachedir, max_size, max_age, keep, active)
+        if count:
+            logger.debug(_('Cache budget: %d files removed.'), count)
+
     def add_remote_rpms(self, path_list, strict=True, progress=None):
         # :api
         pkgs = []
@@ -1411,7 +1579,7 @@ class Base(object):
 
         # packages to be removed by autoremove
         elif pkgnarrow == 'autoremove':
-            autoremove_q = query_for_repo(q)._unneeded(self.history.swdb)
+            autoremove_q = self._unneeded(query_for_repo(q))
             autoremove = autoremove_q.run()
 
         # not in a repo but installed
@@ -1456,6 +1624,46 @@ class Base(object):
         self._comps_trans += trans
         return len(trans)
 
+    def _unneeded_key(self):
+        # besides the rpmdb and the reasons, the set depends on the
+        # installonly, exclude and module settings
+        last = self.history.last()
+        excludes = [[repo.id, list(repo.excludepkgs), list(repo.includepkgs)]
+                    for repo in sorted(self.repos.iter_enabled(), key=lambda r: r.id)]
+        modules = [sorted([name, stream] for name, stream in
+                          self._moduleContainer.getEnabledStreams().items()),
+                   sorted(self._moduleContainer.getDisabledModules())]
+        return [self.sack._rpmdb_version(), last.tid if last is not None else None,
+                self.conf.dump(), excludes, modules]
+
+    def _unneeded(self, query):
+        """Return the installed packages of query not needed by any user
+        installed package.
+
+        Finding them takes a solver run over the whole rpmdb, the result is
+        kept in the cachedir for as long as the rpmdb and the history stay the
+        same.
+
+        """
+        if self.conf.debug_solver:
+            return query._unneeded(self.history.swdb, debug_solver=True)
+        path = os.path.join(self.conf.cachedir, dnf.const.UNNEEDED_CACHE)
+        key = self._unneeded_key()
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            data = None
+        if isinstance(data, dict) and data.get('key') == key:
+            nevras = data['nevras']
+        else:
+            unneeded = self.sack.query()._unneeded(self.history.swdb)
+            nevras = [str(pkg) for pkg in unneeded]
+            self._write_cache_json(path, {'key': key, 'nevras': nevras})
+        if not nevras:
+            return query.filter(empty=True)
+        return query.installed().filterm(nevra_strict=nevras)
+
     def _remove_if_unneeded(self, query):
         """
         Mark to remove packages that are not required by any user installed package (reason group
@@ -2077,8 +2285,7 @@ class Base(object):
                 logger.warning(_('No packages marked for removal.'))
 
         else:
-            pkgs = self.sack.query()._unneeded(self.history.swdb,
-                                               debug_solver=self.conf.debug_solver)
+            pkgs = self._unneeded(self.sack.query())
             for pkg in pkgs:
                 self.package_remove(pkg)
 
@@ -2314,9 +2521,7 @@ class Base(object):
 
         user_cb_fail = False
         self._repo_set_imported_gpg_keys.add(repo.id)
-        for keyurl in keyurls:
-            keys = dnf.crypto.retrieve(keyurl, repo)
-
+        for keyurl, keys in zip(keyurls, dnf.crypto.retrieve_all(keyurls, repo)):
             for info in keys:
                 # Check if key is already installed
                 if misc.keyInstalled(self._ts, info.rpm_id, info.timestamp) >= 0:
@@ -2329,6 +2534,7 @@ class Base(object):
                 if self.conf.gpgkey_dns_verification:
                     dns_input_key = dnf.dnssec.KeyInfo.from_rpm_key_object(info.userid,
                                                                            info.raw_key)
+                    dnf.dnssec.DNSSECKeyVerification._set_cachedir(self.conf.cachedir)
                     dns_result = dnf.dnssec.DNSSECKeyVerification.verify(dns_input_key)
                     logger.info(dnf.dnssec.nice_user_msg(dns_input_key, dns_result))
 
@@ -2451,12 +2657,10 @@ class Base(object):
         """
         def _verification_of_packages(pkg_list, logger_msg):
             all_packages_verified = True
-            for pkg in pkg_list:
-                pkg_successfully_verified = False
-                try:
-                    pkg_successfully_verified = pkg.verifyLocalPkg()
-                except Exception as e:
-                    logger.critical(str(e))
+            results = dnf.package._verify_local_pkgs(pkg_list)
+            for pkg, pkg_successfully_verified in zip(pkg_list, results):
+                if isinstance(pkg_successfully_verified, Exception):
+                    logger.critical(str(pkg_successfully_verified))
                 if pkg_successfully_verified is not True:
                     logger.critical(logger_msg.format(pkg, pkg.reponame))
                     all_packages_verified = False
@@ -2491,6 +2695,48 @@ class Base(object):
         for pkg in packages:
             _msg_installed(pkg)
 
+class _PatternMatcher(object):
+    """Match include/exclude patterns against the sack, each one only once.
+
+    Patterns that can only be read as a package name are matched all together
+    by a single name filter, the rest are resolved by Subject and cached.
+
+    """
+
+    _NEVRA_SEPARATORS = frozenset('-.:')
+
+    def __init__(self, sack):
+        self._sack = sack
+        self._queries = {}
+
+    def _subject_query(self, pattern):
+        query = self._queries.get(pattern)
+        if query is None:
+            subj = dnf.subject.Subject(pattern)
+            query = subj.get_best_query(
+                self._sack, with_nevra=True, with_provides=False, with_filenames=False)
+            self._queries[pattern] = query
+        return query
+
+    def query(self, patterns):
+        """Return a query of the packages matching any of the patterns."""
+        names = []
+        globs = []
+        query = self._sack.query().filterm(empty=True)
+        for pattern in set(patterns):
+            if self._NEVRA_SEPARATORS.intersection(pattern):
+                query = query.union(self._subject_query(pattern))
+            elif dnf.util.is_glob_pattern(pattern):
+                globs.append(pattern)
+            else:
+                names.append(pattern)
+        if names:
+            query = query.union(self._sack.query().filterm(name=names))
+        if globs:
+            query = query.union(self._sack.query().filterm(name__glob=globs))
+        return query
+
+
 def _msg_installed(pkg):
     name = ucd(pkg)
     msg = _('Package %s is already installed.')
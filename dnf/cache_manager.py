@@ -0,0 +1,215 @@
+# cache_manager.py
+# Accounting and eviction of the data kept in the cachedir.
+#
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from dnf.i18n import _
+from dnf.yum.misc import unlink_f
+
+import collections
+import dnf.logging
+import dnf.repo
+import logging
+import multiprocessing.pool
+import os
+import re
+import time
+
+logger = logging.getLogger("dnf")
+
+CacheEntry = collections.namedtuple('CacheEntry',
+                                    ['path', 'type', 'repoid', 'size', 'used'])
+
+_REPO_CACHEDIR = re.compile(r'^%s/' % dnf.repo._CACHEDIR_RE)
+_matcher = None
+
+
+def _match(path):
+    """Return the cache type of path relative to the cachedir or None."""
+    global _matcher
+    if _matcher is None:
+        # one pattern with a named group per type, the repoid groups of the
+        # type patterns would clash
+        _matcher = re.compile('|'.join(
+            '(?P<%s>%s)' % (type_, pattern.replace('(?P<repoid>', '(?:'))
+            for type_, pattern in sorted(dnf.repo.CACHE_FILES.items())))
+    match = _matcher.match(path)
+    return match.lastgroup if match else None
+
+
+def _repoid(path, type_):
+    match = _REPO_CACHEDIR.match(path)
+    if match:
+        return match.group('repoid')
+    if type_ == 'dbcache' and os.sep not in path:
+        # <repoid>.solv and <repoid>-<type>.solvx
+        root, ext = os.path.splitext(path)
+        return root.rsplit('-', 1)[0] if ext == '.solvx' else root
+    return None
+
+
+def usage(entries):
+    """Return the number and size of entries by their repo and type."""
+    result = collections.defaultdict(lambda: [0, 0])
+    for entry in entries:
+        counts = result[(entry.repoid, entry.type)]
+        counts[0] += 1
+        counts[1] += entry.size
+    return dict(result)
+
+
+def last_used(entries):
+    """Return when the metadata of each repo were used the last time."""
+    result = {}
+    for entry in entries:
+        if entry.type == 'metadata' and entry.repoid is not None:
+            result[entry.repoid] = max(result.get(entry.repoid, 0), entry.used)
+    return result
+
+
+def _units(entries, repo_used):
+    """Group entries into the units evicted together, with their last use.
+
+    The metadata of a repo only work as a whole and are one unit, like for
+    clean metadata. Packages and solv files are units on their own. The
+    metadata and solv files of a repo count as used whenever any of its
+    metadata files was, so that one recent access or refresh keeps them all.
+
+    """
+    units = collections.OrderedDict()
+    for entry in entries:
+        if entry.type == 'metadata':
+            key = (entry.type, entry.path.split(os.sep, 1)[0])
+        else:
+            key = (entry.type, entry.path)
+        units.setdefault(key, []).append(entry)
+    result = []
+    for (type_, _path), unit in units.items():
+        used = max(entry.used for entry in unit)
+        if type_ in ('metadata', 'dbcache'):
+            used = max(used, repo_used.get(unit[0].repoid, 0))
+        result.append((used, unit))
+    return result
+
+
+def over_budget(entries, max_size=None, max_age=None, now=None, repo_used=None):
+    """Return entries to remove so that the rest fits the budget.
+
+    Entries not used for more than max_age seconds are removed first, then the
+    least recently used ones until the rest takes at most max_size bytes. The
+    metadata of a repo are removed all at once. repo_used is the result of
+    last_used() for all the cached data, by default it is computed from
+    entries.
+
+    """
+    if now is None:
+        now = time.time()
+    if repo_used is None:
+        repo_used = last_used(entries)
+    units = sorted(_units(entries, repo_used), key=lambda unit: unit[0])
+    evict = []
+    keep = []
+    for used, unit in units:
+        if max_age is not None and now - used > max_age:
+            evict.extend(unit)
+        else:
+            keep.append(unit)
+    if max_size is not None:
+        total = sum(entry.size for unit in keep for entry in unit)
+        for unit in keep:
+            if total <= max_size:
+                break
+            evict.extend(unit)
+            total -= sum(entry.size for entry in unit)
+    return evict
+
+
+def enforce_budget(cachedir, max_size=None, max_age=None, keep=(), active_repos=()):
+    """Remove the data in cachedir over the budget, see over_budget().
+
+    The files in keep, paths relative to cachedir, and the metadata and solv
+    files of the active repos are never removed but count against max_size.
+    Returns the number of removed files.
+
+    """
+    manager = CacheManager(cachedir)
+    entries = list(manager.scan())
+    repo_used = last_used(entries)
+    keep = set(os.path.normpath(path) for path in keep)
+    evictable = []
+    reserved = 0
+    for entry in entries:
+        if entry.path in keep or (entry.type != 'packages' and entry.repoid in active_repos):
+            reserved += entry.size
+        else:
+            evictable.append(entry)
+    if max_size is not None:
+        max_size = max(max_size - reserved, 0)
+    return manager.remove(over_budget(evictable, max_size, max_age, repo_used=repo_used))
+
+
+class CacheManager(object):
+    """The repo data in a cachedir, classified by type and repo."""
+
+    def __init__(self, cachedir):
+        self.cachedir = cachedir
+
+    def scan(self):
+        """Yield a CacheEntry for every file of a known cache type."""
+        for root, dirs, files in os.walk(self.cachedir):
+            base = os.path.relpath(root, self.cachedir)
+            for fn in files:
+                path = os.path.normpath(os.path.join(base, fn))
+                type_ = _match(path)
+                if type_ is None:
+                    continue
+                try:
+                    st = os.lstat(os.path.join(self.cachedir, path))
+                except OSError:
+                    continue
+                yield CacheEntry(path, type_, _repoid(path, type_), st.st_size,
+                                 max(st.st_atime, st.st_mtime))
+
+    def remove(self, entries, workers=4):
+        """Remove the files of entries, several at a time.
+
+        Returns the number of removed files.
+
+        """
+        def _remove(entry):
+            path = os.path.join(self.cachedir, entry.path)
+            logger.log(dnf.logging.DDEBUG, _('Removing file %s'), path)
+            try:
+                unlink_f(path)
+            except OSError as e:
+                logger.warning(_('Cannot remove %s: %s'), path, e)
+                return 0
+            return 1
+
+        entries = list(entries)
+        if len(entries) < 2 * workers:
+            return sum(_remove(entry) for entry in entries)
+        pool = multiprocessing.pool.ThreadPool(workers)
+        try:
+            return sum(pool.map(_remove, entries))
+        finally:
+            pool.close()
+            pool.join()
@@ -30,6 +30,7 @@ try:
 except ImportError:
     from collections import Sequence
 import datetime
+import itertools
 import logging
 import operator
 import os
@@ -410,19 +411,28 @@ class BaseCli(dnf.Base):
         if cnt <= 0:
             raise dnf.exceptions.Error(_('No packages marked for downgrade.'))
 
-    def output_packages(self, basecmd, pkgnarrow='all', patterns=(), reponame=None):
-        """Output selection *pkgnarrow* of packages matching *patterns* and *repoid*."""
+    def output_packages(self, basecmd, pkgnarrow='all', patterns=(), reponame=None,
+                        json_output=None):
+        """Output selection *pkgnarrow* of packages matching *patterns* and *repoid*.
+
+        *json_output* set to 'json' or 'jsonl' writes the packages as a JSON
+        array or as JSON lines instead of the human readable format.
+        """
         try:
-            highlight = self.output.term.MODE['bold']
+            highlight = self.output.term.MODE['bold'] and not json_output
             ypl = self.returnPkgLists(
                 pkgnarrow, patterns, installed_available=highlight, reponame=reponame)
         except dnf.exceptions.Error as e:
             return 1, [str(e)]
+        if json_output:
+            self._output_packages_json(basecmd, ypl, patterns, json_output == 'jsonl')
         else:
             update_pkgs = {}
             inst_pkgs = {}
             local_pkgs = {}
 
+            self.output._prefetch_history(itertools.chain(
+                ypl.installed, ypl.extras, ypl.autoremove, ypl.recent))
             columns = None
             if basecmd == 'list':
                 # Dynamically size the columns
@@ -500,6 +510,28 @@ class BaseCli(dnf.Base):
                 raep[0] and rip[0]:
                 raise dnf.exceptions.Error(_('No matching Packages to list'))
 
+    def _output_packages_json(self, basecmd, ypl, patterns, lines):
+        attrs = output.JSON_LIST_ATTRS if basecmd == 'list' \
+            else output.JSON_INFO_ATTRS
+        listed = False
+        self.output._prefetch_history(itertools.chain(
+            ypl.installed, ypl.extras, ypl.autoremove, ypl.recent))
+        with output.JSONWriter(lines) as writer:
+            for list_name, pkgs in (('installed', ypl.installed),
+                                    ('available', ypl.available),
+                                    ('autoremove', ypl.autoremove),
+                                    ('extras', ypl.extras),
+                                    ('upgrades', ypl.updates),
+                                    ('obsoletes', ypl.obsoletes),
+                                    ('recent', ypl.recent)):
+                for pkg in sorted(set(pkgs)):
+                    data = self.output.pkg_json_dict(pkg, attrs)
+                    data['list'] = list_name
+                    writer.write(data)
+                    listed = True
+        if len(patterns) and not listed:
+            raise dnf.exceptions.Error(_('No matching Packages to list'))
+
     def returnPkgLists(self, pkgnarrow='all', patterns=None,
                        installed_available=False, reponame=None):
         """Return a :class:`dnf.yum.misc.GenericHolder` object containing
@@ -937,6 +969,14 @@ class Cli(object):
             self.demands.freshest_metadata = opts.freshest_metadata
         if opts.debugsolver:
             self.base.conf.debug_solver = True
+        if opts.resolve_cache:
+            self.base._resolve_cache = True
+        if opts.cache_max_size is not None or opts.cache_max_age is not None:
+            max_age = opts.cache_max_age
+            self.base._cache_budget = (opts.cache_max_size,
+                                       max_age * 24 * 3600 if max_age is not None else None)
+        # API users do not get names.json written into their cachedir
+        self.base._update_name_index = True
         if opts.obsoletes:
             self.base.conf.obsoletes = True
         self.command.pre_configure()
@@ -101,6 +101,16 @@ def _checkEnabledRepo(base, possible_local_files=()):
     raise dnf.cli.CliError(msg)
 
 
+def _add_json_arguments(group):
+    """Add the mutually exclusive --json and --jsonl switches to *group*."""
+    group.add_argument('--json', dest='json_output', action='store_const',
+                       const='json', default=None,
+                       help=_('write packages as a JSON array'))
+    group.add_argument('--jsonl', dest='json_output', action='store_const',
+                       const='jsonl',
+                       help=_('write packages as JSON lines, one object per package'))
+
+
 class Command(object):
     """Abstract base class for CLI commands."""
 
@@ -195,6 +205,7 @@ class InfoCommand(Command):
         parser.add_argument('packages', nargs='*', metavar=_('PACKAGE'),
                             choices=cls.pkgnarrows, default=cls.DEFAULT_PKGNARROW,
                             action=OptionParser.PkgNarrowCallback)
+        _add_json_arguments(parser.add_mutually_exclusive_group())
 
     def configure(self):
         demands = self.cli.demands
@@ -214,7 +225,8 @@ class InfoCommand(Command):
     def run(self):
         self.cli._populate_update_security_filter(self.opts, self.base.sack.query())
         return self.base.output_packages('info', self.opts.packages_action,
-                                         self.opts.packages)
+                                         self.opts.packages,
+                                         json_output=self.opts.json_output)
 
 class ListCommand(InfoCommand):
     """A class containing methods needed by the cli to execute the
@@ -227,7 +239,8 @@ class ListCommand(InfoCommand):
     def run(self):
         self.cli._populate_update_security_filter(self.opts, self.base.sack.query())
         return self.base.output_packages('list', self.opts.packages_action,
-                                         self.opts.packages)
+                                         self.opts.packages,
+                                         json_output=self.opts.json_output)
 
 
 class ProvidesCommand(Command):
@@ -21,17 +21,15 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 from dnf.cli import commands
+from dnf.cli.format import format_number
+from dnf.cli.option_parser import _size
 from dnf.i18n import _, P_
-from dnf.yum import misc
 
+import dnf.cache_manager
 import dnf.cli
 import dnf.exceptions
 import dnf.lock
-import dnf.logging
-import dnf.repo
 import logging
-import os
-import re
 import time
 
 logger = logging.getLogger("dnf")
@@ -46,36 +44,16 @@ _CACHE_TYPES = {
 }
 
 
-def _tree(dirpath):
-    """Traverse dirpath recursively and yield relative filenames."""
-    for root, dirs, files in os.walk(dirpath):
-        base = os.path.relpath(root, dirpath)
-        for f in files:
-            path = os.path.join(base, f)
-            yield os.path.normpath(path)
-
-
-def _filter(files, patterns):
-    """Yield those filenames that match any of the patterns."""
-    return (f for f in files for p in patterns if re.match(p, f))
-
-
-def _clean(dirpath, files):
-    """Remove the given filenames from dirpath."""
-    count = 0
-    for f in files:
-        path = os.path.join(dirpath, f)
-        logger.log(dnf.logging.DDEBUG, _('Removing file %s'), path)
-        misc.unlink_f(path)
-        count += 1
-    return count
-
-
-def _cached_repos(files):
-    """Return the repo IDs that have some cached metadata around."""
-    metapat = dnf.repo.CACHE_FILES['metadata']
-    matches = (re.match(metapat, f) for f in files)
-    return set(m.group('repoid') for m in matches if m)
+def _report(entries):
+    """Log what removing entries reclaims, per repo and type."""
+    for (repoid, type_), (count, size) in sorted(
+            dnf.cache_manager.usage(entries).items(),
+            key=lambda item: (item[0][0] or '', item[0][1])):
+        logger.info(_('%s %s: %d files, %s'), repoid or '-', type_, count,
+                    format_number(size).strip())
+    count = len(entries)
+    logger.info(P_('%d file would be removed, %s', '%d files would be removed, %s',
+                   count) % (count, format_number(sum(e.size for e in entries)).strip()))
 
 
 class CleanCommand(commands.Command):
@@ -91,6 +69,13 @@ class CleanCommand(commands.Command):
         parser.add_argument('type', nargs='+',
                            choices=_CACHE_TYPES.keys(),
                            help=_('Metadata type to clean'))
+        parser.add_argument('--max-size', type=_size, metavar=_('SIZE'),
+                            help=_('only remove the least recently used files until '
+                                   'the data of the given types take at most SIZE'))
+        parser.add_argument('--max-age', type=int, metavar=_('DAYS'),
+                            help=_('only remove files not used for more than DAYS days'))
+        parser.add_argument('--dry-run', action='store_true',
+                            help=_('only report what would be removed'))
 
     def run(self):
         cachedir = self.base.conf.cachedir
@@ -101,17 +86,29 @@ class CleanCommand(commands.Command):
             try:
                 with md_lock and download_lock and rpmdb_lock:
                     types = set(t for c in self.opts.type for t in _CACHE_TYPES[c])
-                    files = list(_tree(cachedir))
+                    manager = dnf.cache_manager.CacheManager(cachedir)
+                    entries = list(manager.scan())
                     logger.debug(_('Cleaning data: ' + ' '.join(types)))
 
                     if 'expire-cache' in types:
-                        expired = _cached_repos(files)
-                        self.base._repo_persistor.expired_to_add.update(expired)
+                        expired = set(e.repoid for e in entries if e.type == 'metadata')
+                        if not self.opts.dry_run:
+                            self.base._repo_persistor.expired_to_add.update(expired)
+                            logger.info(_('Cache was expired'))
                         types.remove('expire-cache')
-                        logger.info(_('Cache was expired'))
 
-                    patterns = [dnf.repo.CACHE_FILES[t] for t in types]
-                    count = _clean(cachedir, _filter(files, patterns))
+                    repo_used = dnf.cache_manager.last_used(entries)
+                    entries = [e for e in entries if e.type in types]
+                    if self.opts.max_size is not None or self.opts.max_age is not None:
+                        max_age = self.opts.max_age
+                        entries = dnf.cache_manager.over_budget(
+                            entries, self.opts.max_size,
+                            max_age * 24 * 3600 if max_age is not None else None,
+                            repo_used=repo_used)
+                    if self.opts.dry_run:
+                        _report(entries)
+                        return
+                    count = manager.remove(entries)
                     logger.info(P_('%d file removed', '%d files removed', count) % count)
                     return
             except dnf.exceptions.LockError as e:
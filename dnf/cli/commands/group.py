@@ -25,6 +25,7 @@ from dnf.cli import commands
 from dnf.i18n import _, ucd
 
 import dnf.cli
+import dnf.comps
 import dnf.exceptions
 import dnf.util
 import logging
@@ -72,24 +73,22 @@ class GroupCommand(commands.Command):
             raise dnf.exceptions.CompsError(msg)
 
     def _environment_lists(self, patterns):
+        installed_ids = self.base.history.env.installed_ids()
+
         def available_pred(env):
-            env_found = self.base.history.env.get(env.id)
-            return not(env_found)
+            return env.id not in installed_ids
 
         self._assert_comps()
         if patterns is None:
             envs = self.base.comps.environments
         else:
-            envs = self.base.comps.environments_by_pattern(",".join(patterns))
+            matches = self.base.comps._environments_by_patterns(patterns)
+            envs = self._merge_matches(patterns, matches)
 
         return dnf.util.mapall(list, dnf.util.partition(available_pred, envs))
 
     def _group_lists(self, uservisible, patterns):
-        def installed_pred(group):
-            group_found = self.base.history.group.get(group.id)
-            if group_found:
-                return True
-            return False
+        installed_ids = self.base.history.group.installed_ids()
         installed = []
         available = []
 
@@ -98,16 +97,29 @@ class GroupCommand(commands.Command):
         if patterns is None:
             grps = self.base.comps.groups
         else:
-            grps = self.base.comps.groups_by_pattern(",".join(patterns))
+            matches = self.base.comps._groups_by_patterns(patterns)
+            grps = self._merge_matches(patterns, matches)
         for grp in grps:
             tgt_list = available
-            if installed_pred(grp):
+            if grp.id in installed_ids:
                 tgt_list = installed
             if not uservisible or grp.uservisible:
                 tgt_list.append(grp)
 
         return installed, available
 
+    @staticmethod
+    def _merge_matches(patterns, matches):
+        # keep display order, drop objects matched by more than one pattern
+        merged = []
+        seen = set()
+        for pattern in patterns:
+            for obj in matches[pattern]:
+                if obj.id not in seen:
+                    seen.add(obj.id)
+                    merged.append(obj)
+        return sorted(merged, key=dnf.comps._fn_display_order)
+
     def _grp_setup(self):
         self.base.read_comps(arch_filter=True)
 
@@ -153,11 +165,10 @@ class GroupCommand(commands.Command):
 
         errs = False
         if userlist is not None:
+            grp_matches = self.base.comps._groups_by_patterns(userlist)
+            env_matches = self.base.comps._environments_by_patterns(userlist)
             for group in userlist:
-                comps = self.base.comps
-                in_group = len(comps.groups_by_pattern(group)) > 0
-                in_environment = len(comps.environments_by_pattern(group)) > 0
-                if not in_group and not in_environment:
+                if not grp_matches[group] and not env_matches[group]:
                     logger.error(_('Warning: No groups match:') + '\n   %s',
                                  group)
                     errs = True
@@ -39,6 +39,9 @@ class MakeCacheCommand(commands.Command):
     @staticmethod
     def set_argparser(parser):
         parser.add_argument('--timer', action='store_true', dest="timer_opt")
+        parser.add_argument('--max-repos', type=int, default=None, metavar=_('NUMBER'),
+                            help=_('refresh at most this number of repositories '
+                                   'in one timer run'))
         # compatibility with dnf < 2.0
         parser.add_argument('timer', nargs='?', choices=['timer'],
                             metavar='timer', help=argparse.SUPPRESS)
@@ -47,4 +50,4 @@ class MakeCacheCommand(commands.Command):
         timer = self.opts.timer is not None or self.opts.timer_opt
         msg = _("Making cache files for all metadata files.")
         logger.debug(msg)
-        return self.base.update_cache(timer)
+        return self.base.update_cache(timer, self.opts.max_repos)
@@ -27,7 +27,7 @@ from dnf.i18n import _
 from dnf.cli import commands
 
 import dnf
-import functools
+import dnf.util
 import logging
 
 logger = logging.getLogger("dnf")
@@ -44,17 +44,42 @@ class MarkCommand(commands.Command):
                             metavar='[ install | remove | group ]')
         parser.add_argument('package', nargs='+')
 
-    def _mark_install(self, pkg):
-        self.base.history.set_reason(pkg, libdnf.transaction.TransactionItemReason_USER)
-        logger.info(_('%s marked as user installed.'), str(pkg))
-
-    def _mark_remove(self, pkg):
-        self.base.history.set_reason(pkg, libdnf.transaction.TransactionItemReason_DEPENDENCY)
-        logger.info(_('%s unmarked as user installed.'), str(pkg))
-
-    def _mark_group(self, pkg):
-        self.base.history.set_reason(pkg, libdnf.transaction.TransactionItemReason_GROUP)
-        logger.info(_('%s marked as group installed.'), str(pkg))
+    _REASONS = {
+        'install': (libdnf.transaction.TransactionItemReason_USER,
+                    _('%s marked as user installed.')),
+        'remove': (libdnf.transaction.TransactionItemReason_DEPENDENCY,
+                   _('%s unmarked as user installed.')),
+        'group': (libdnf.transaction.TransactionItemReason_GROUP,
+                  _('%s marked as group installed.')),
+    }
+
+    def _mark(self, cmd, pkgs):
+        reason, msg = self._REASONS[cmd]
+        self.base.history.set_reasons(pkgs, reason)
+        for pkg in pkgs:
+            logger.info(msg, str(pkg))
+
+    def _resolve(self, specs):
+        """Return the installed packages matching specs and the unmatched specs."""
+        # specs that can only be package names are looked up by one query,
+        # only the rest and the names not found need a Subject each
+        names = [spec for spec in specs
+                 if not dnf.util.is_glob_pattern(spec) and not set(spec) & set('-.:/')]
+        by_name = {}
+        if names:
+            for pkg in self.base.sack.query().filterm(name=names):
+                by_name.setdefault(pkg.name, []).append(pkg)
+        pkgs = []
+        notfound = []
+        for spec in specs:
+            q = by_name.get(spec)
+            if q is None:
+                subj = dnf.subject.Subject(spec)
+                q = subj.get_best_query(self.base.sack)
+            pkgs.extend(q)
+            if len(q) == 0:
+                notfound.append(spec)
+        return pkgs, notfound
 
     def configure(self):
         demands = self.cli.demands
@@ -67,16 +92,8 @@ class MarkCommand(commands.Command):
         cmd = self.opts.mark[0]
         pkgs = self.opts.package
 
-        mark_func = functools.partial(getattr(self, '_mark_' + cmd))
-
-        notfound = []
-        for pkg in pkgs:
-            subj = dnf.subject.Subject(pkg)
-            q = subj.get_best_query(self.base.sack)
-            for pkg in q:
-                mark_func(pkg)
-            if len(q) == 0:
-                notfound.append(pkg)
+        marked, notfound = self._resolve(pkgs)
+        self._mark(cmd, marked)
 
         if notfound:
             logger.error(_('Error:'))
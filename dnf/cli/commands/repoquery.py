@@ -31,6 +31,7 @@ import sys
 
 import dnf
 import dnf.cli
+import dnf.cli.output
 import dnf.exceptions
 import dnf.subject
 import dnf.util
@@ -198,6 +199,7 @@ class RepoQueryCommand(commands.Command):
                                     'displaying found packages'))
         outform.add_argument('--groupmember', action="store_true", help=_(
             'Display in which comps groups are presented selected packages'))
+        commands._add_json_arguments(outform)
         pkgfilter = parser.add_mutually_exclusive_group()
         pkgfilter.add_argument("--duplicates", dest='pkgfilter',
                                const='duplicated', action='store_const',
@@ -270,6 +272,11 @@ class RepoQueryCommand(commands.Command):
         if self.opts.querytags:
             return
 
+        if self.opts.json_output:
+            for opt in ('deplist', 'tree', 'location'):
+                if getattr(self.opts, opt):
+                    self.cli._option_conflict("--" + self.opts.json_output, "--" + opt)
+
         if self.opts.resolve and not self.opts.packageatr:
             raise dnf.cli.CliError(
                 _("Option '--resolve' has to be used together with one of the "
@@ -413,7 +420,7 @@ class RepoQueryCommand(commands.Command):
                 raise dnf.exceptions.Error(_("argument {}: not allowed with argument {}".format(
                     "--available", "--" + self.opts.list)))
         elif self.opts.list == "unneeded":
-            q = q._unneeded(self.base.history.swdb)
+            q = self.base._unneeded(q)
         elif self.opts.list and self.opts.list != 'userinstalled':
             q = getattr(q, self.opts.list)()
 
@@ -525,9 +532,17 @@ class RepoQueryCommand(commands.Command):
                 if self.opts.recursive:
                     providers = providers.union(
                         self._get_recursive_providers_query(query, providers))
+                if self.opts.json_output:
+                    self._output_json(providers.latest().run())
+                    return
                 pkgs = set()
                 for pkg in providers.latest().run():
                     pkgs.add(self.build_format_fn(self.opts, pkg))
+            elif self.opts.json_output:
+                with dnf.cli.output.JSONWriter(self.opts.json_output == 'jsonl') as writer:
+                    for rel in sorted({str(rel) for rel in rels}):
+                        writer.write(rel)
+                return
             else:
                 pkgs.update(str(rel) for rel in rels)
         elif self.opts.location:
@@ -559,6 +574,11 @@ class RepoQueryCommand(commands.Command):
             self._group_member_report(q)
             return
 
+        elif self.opts.json_output:
+            self._output_json(
+                pkg for pkg in q.run()
+                if self.opts.list != 'userinstalled' or self.base.history.user_installed(pkg))
+            return
         else:
             for pkg in q.run():
                 if self.opts.list != 'userinstalled' or self.base.history.user_installed(pkg):
@@ -570,6 +590,14 @@ class RepoQueryCommand(commands.Command):
             else:
                 print("\n".join(sorted(pkgs)))
 
+    def _output_json(self, pkgs):
+        """Write *pkgs* in NEVRA order as JSON, skipping all text formatting."""
+        pkgs = sorted(set(pkgs))
+        self.base.output._prefetch_history(pkgs)
+        with dnf.cli.output.JSONWriter(self.opts.json_output == 'jsonl') as writer:
+            for pkg in pkgs:
+                writer.write(self.base.output.pkg_json_dict(pkg))
+
     def _group_member_report(self, query):
         self.base.read_comps(arch_filter=True)
         package_conf_dict = {}
@@ -85,14 +85,10 @@ class SearchCommand(commands.Command):
             print(ucd(formatted))
 
         counter = dnf.match_counter.MatchCounter()
-        for arg in args:
-            self._search_counted(counter, 'name', arg)
-            self._search_counted(counter, 'summary', arg)
+        self._search_counted_all(counter, ('name', 'summary'), args)
 
         if self.opts.all:
-            for arg in args:
-                self._search_counted(counter, 'description', arg)
-                self._search_counted(counter, 'url', arg)
+            self._search_counted_all(counter, ('description', 'url'), args)
         else:
             needles = len(args)
             pkgs = list(counter.keys())
@@ -134,6 +130,42 @@ class SearchCommand(commands.Command):
             counter.add(pkg, attr, needle)
         return counter
 
+    def _search_counted_all(self, counter, attrs, needles):
+        """Same as _search_counted() for every needle and each of attrs.
+
+        Plain ASCII needles are looked up with a single scan of the sack per
+        attribute, which needles a found package matches is then told from the
+        attribute itself.
+
+        """
+        found = {}
+        for attr in attrs:
+            found[attr] = self._search_plain(attr, needles)
+        for needle in needles:
+            for attr in attrs:
+                pkgs = found[attr].get(needle)
+                if pkgs is None:
+                    self._search_counted(counter, attr, needle)
+                    continue
+                for pkg in pkgs:
+                    counter.add(pkg, attr, needle)
+        return counter
+
+    def _search_plain(self, attr, needles):
+        plain = [needle for needle in needles
+                 if not dnf.util.is_glob_pattern(needle) and _is_ascii(needle)]
+        if len(plain) < 2:
+            return {}
+        found = dict((needle, []) for needle in plain)
+        fdict = {'%s__substr' % attr: plain}
+        q = self.base.sack.query().filterm(hawkey.ICASE, **fdict)
+        for pkg in q.run():
+            haystack = (getattr(pkg, attr) or '').lower()
+            for needle in found:
+                if needle.lower() in haystack:
+                    found[needle].append(pkg)
+        return found
+
     def pre_configure(self):
         if not self.opts.verbose and not self.opts.quiet:
             self.cli.redirect_logger(stdout=logging.WARNING, stderr=logging.INFO)
@@ -150,3 +182,11 @@ class SearchCommand(commands.Command):
     def run(self):
         logger.debug(_('Searching Packages: '))
         return self._search(self.opts.query_string)
+
+
+def _is_ascii(text):
+    try:
+        text.encode('ascii')
+    except UnicodeError:
+        return False
+    return True
@@ -25,13 +25,85 @@ from dnf.i18n import _
 import cmd
 import copy
 import dnf
+import dnf.pycomp
+import dnf.yum.misc
+import json
 import logging
+import os
 import shlex
+import socket
+import stat
+import struct
 import sys
 
 
 logger = logging.getLogger('dnf')
 
+# frames of the socket protocol: payload length followed by UTF-8 encoded JSON
+_FRAME_HEADER = struct.Struct('!I')
+# a request is a single shell line, anything bigger is a broken client
+_MAX_REQUEST = 4 * 1024 * 1024
+
+
+class _FrameTooLarge(Exception):
+    pass
+
+
+def _send_frame(sock, data):
+    payload = json.dumps(data).encode('utf-8')
+    sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _recv_frame(sock, max_size=None):
+    header = _recv_exactly(sock, _FRAME_HEADER.size)
+    if header is None:
+        return None
+    size = _FRAME_HEADER.unpack(header)[0]
+    if max_size is not None and size > max_size:
+        raise _FrameTooLarge(size)
+    payload = _recv_exactly(sock, size)
+    if payload is None:
+        return None
+    return json.loads(payload.decode('utf-8'))
+
+
+def shell_request(path, line):
+    """Run a shell line by the server listening on path.
+
+    Returns a tuple of the exit status and the output of the line.
+
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        _send_frame(sock, {'command': line})
+        response = _recv_frame(sock)
+    finally:
+        sock.close()
+    if response is None:
+        raise dnf.exceptions.Error(_('No response from the DNF shell on %s') % path)
+    return response['status'], response['output']
+
+
+class _ErrorSeen(logging.Handler):
+    def __init__(self):
+        super(_ErrorSeen, self).__init__(logging.ERROR)
+        self.seen = False
+
+    def emit(self, record):
+        self.seen = True
+
 
 # only demands we'd like to override
 class ShellDemandSheet(object):
@@ -67,6 +139,8 @@ class ShellCommand(commands.Command, cmd.Cmd):
     def set_argparser(parser):
         parser.add_argument('script', nargs='?', metavar=_('SCRIPT'),
                             help=_('Script to run in DNF shell'))
+        parser.add_argument('--socket', metavar=_('PATH'),
+                            help=_('serve the shell on a UNIX socket'))
 
     def configure(self):
         # append to ShellDemandSheet missing demands from
@@ -82,11 +156,114 @@ class ShellCommand(commands.Command, cmd.Cmd):
                 setattr(self.cli.demands, attr, getattr(default_demands, attr))
 
     def run(self):
-        if self.opts.script:
+        if self.opts.socket:
+            self._serve(self.opts.socket)
+        elif self.opts.script:
             self._run_script(self.opts.script)
         else:
             self.cmdloop()
 
+    def _serve(self, path):
+        """Run the shell lines received on a UNIX socket until asked to quit.
+
+        Requests are handled one at a time, so lines changing the state of the
+        session never run concurrently with other lines.
+
+        """
+        try:
+            mode = os.lstat(path).st_mode
+        except OSError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise dnf.exceptions.Error(_('%s exists and is not a socket') % path)
+            os.unlink(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        bound = False
+        try:
+            # no other user may connect between bind() and chmod()
+            umask = os.umask(0o177)
+            try:
+                server.bind(path)
+            finally:
+                os.umask(umask)
+            bound = True
+            os.chmod(path, 0o600)
+            server.listen(5)
+            logger.info(_('Serving the DNF shell on %s'), path)
+            serving = True
+            while serving:
+                conn = server.accept()[0]
+                try:
+                    serving = self._serve_connection(conn)
+                finally:
+                    conn.close()
+        finally:
+            server.close()
+            if bound:
+                dnf.yum.misc.unlink_f(path)
+
+    def _serve_connection(self, conn):
+        """Run the lines sent by one client, return False when asked to quit.
+
+        A misbehaving client only loses its own connection, the session goes
+        on serving others.
+
+        """
+        try:
+            while True:
+                try:
+                    request = _recv_frame(conn, _MAX_REQUEST)
+                except _FrameTooLarge as e:
+                    # the payload is left unread, the stream can not be resumed
+                    _send_frame(conn, {'status': 1,
+                                       'output': _('Request too large: %d bytes\n') % e.args[0]})
+                    return True
+                except ValueError as e:
+                    # the whole frame was read, the next one can follow
+                    _send_frame(conn, {'status': 1,
+                                       'output': _('Invalid request: %s\n') % e})
+                    continue
+                if request is None:
+                    return True
+                line = request.get('command', '') if isinstance(request, dict) else None
+                if not isinstance(line, dnf.pycomp.basestring):
+                    _send_frame(conn, {'status': 1,
+                                       'output': _('Invalid request: %s\n') % request})
+                    continue
+                status, output, quit = self._captured_cmd(line)
+                _send_frame(conn, {'status': status, 'output': output})
+                if quit:
+                    return False
+        except (IOError, OSError) as e:
+            logger.warning(_('Connection to the DNF shell closed: %s'), e)
+            return True
+
+    def _captured_cmd(self, line):
+        """Run a line, returning its exit status, output and whether to quit."""
+        out = dnf.pycomp.StringIO()
+        logger_dnf = logging.getLogger('dnf')
+        streams = [(handler, handler.stream) for handler in logger_dnf.handlers
+                   if isinstance(handler, logging.StreamHandler)
+                   and handler.stream in (sys.stdout, sys.stderr)]
+        errors = _ErrorSeen()
+        logger_dnf.addHandler(errors)
+        stdout = sys.stdout
+        sys.stdout = out
+        for handler, _stream in streams:
+            handler.stream = out
+        quit = False
+        try:
+            self.onecmd(line)
+        except SystemExit:
+            quit = True
+        finally:
+            sys.stdout = stdout
+            for handler, stream in streams:
+                handler.stream = stream
+            logger_dnf.removeHandler(errors)
+        return 1 if errors.seen else 0, out.getvalue(), quit
+
     def _clean(self):
         self.base._finalize_base()
         self.base._transaction = None
@@ -114,7 +291,7 @@ class ShellCommand(commands.Command, cmd.Cmd):
                 cmd = cmd_cls(self.cli)
                 try:
                     opts = self.cli.optparser.parse_command_args(cmd, s_line)
-                    cmd.cli.demands = copy.deepcopy(self.cli.demands)
+                    cmd.cli.demands = copy.copy(self.cli.demands)
                     cmd.configure()
                     cmd.run()
                 except dnf.exceptions.Error as e:
@@ -33,6 +33,17 @@ import sys
 
 logger = logging.getLogger("dnf")
 
+_SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
+
+
+def _size(value):
+    """Parse a size in bytes with an optional k, M, G or T suffix."""
+    match = re.match(r'^(\d+)([kmgt]?)$', value.strip().lower())
+    if not match:
+        raise argparse.ArgumentTypeError(_('invalid size: %s') % value)
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2)]
+
+
 class OptionParser(argparse.ArgumentParser):
     """ArgumentParser like class to do things the "yum way"."""
 
@@ -281,6 +292,19 @@ class OptionParser(argparse.ArgumentParser):
                                  action="store_true",
                                  help=_("set metadata as expired before running"
                                         " the command"))
+        main_parser.add_argument("--resolve-cache", dest="resolve_cache",
+                                 action="store_true", default=None,
+                                 help=_("reuse the result of the last identical"
+                                        " dependency resolution"))
+        main_parser.add_argument("--cache-max-size", dest="cache_max_size", type=_size,
+                                 default=None, metavar=_("SIZE"),
+                                 help=_("after downloading packages, remove the least"
+                                        " recently used cached data until the cache"
+                                        " takes at most SIZE"))
+        main_parser.add_argument("--cache-max-age", dest="cache_max_age", type=int,
+                                 default=None, metavar=_("DAYS"),
+                                 help=_("after downloading packages, remove the cached"
+                                        " data not used for more than DAYS days"))
         main_parser.add_argument("-4", dest="ip_resolve", default=None,
                                  help=_("resolve to IPv4 addresses only"),
                                  action="store_const", const='ipv4')
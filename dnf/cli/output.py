@@ -22,9 +22,11 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from copy import deepcopy
+import bisect
 import fnmatch
 import hawkey
 import itertools
+import json
 import libdnf.transaction
 import logging
 import operator
@@ -109,10 +111,54 @@ def _spread_in_columns(cols_count, label, lst):
     return list(zip(left, *[lst_iter] * right_count))
 
 
+# package attributes written by --json and --jsonl
+JSON_LIST_ATTRS = ('name', 'epoch', 'version', 'release', 'arch', 'repoid')
+JSON_INFO_ATTRS = JSON_LIST_ATTRS + (
+    'downloadsize', 'installsize', 'sourcerpm', 'packager', 'buildtime',
+    'installtime', 'summary', 'url', 'license', 'description')
+
+
+class JSONWriter(object):
+    """Write objects to stdout either as a JSON array or as JSON lines.
+
+    Every object is written as soon as it is given, so the output can be
+    consumed incrementally and nothing is collected in memory.
+    """
+
+    def __init__(self, lines=False, stream=None):
+        self.lines = lines
+        self.stream = stream
+        self._count = 0
+        if not self.lines:
+            self._write("[")
+
+    def _write(self, text):
+        (self.stream or sys.stdout).write(text)
+
+    def write(self, obj):
+        text = json.dumps(obj, sort_keys=True)
+        if self.lines:
+            self._write(text + "\n")
+        else:
+            self._write((",\n" if self._count else "\n") + text)
+        self._count += 1
+
+    def close(self):
+        if not self.lines:
+            self._write("\n]\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 class Output(object):
     """Main output class for the yum command line."""
 
     GRP_PACKAGE_INDENT = ' ' * 3
+    LIST_CHUNK_SIZE = 1000
     FILE_PROVIDE_RE = re.compile(r'^\*{0,2}/')
 
     def __init__(self, base, conf):
@@ -172,19 +218,32 @@ class Output(object):
         return self.term.sub(haystack, hibeg, hiend, needles, **kwds)
 
     @staticmethod
-    def _calc_columns_spaces_helps(current, data_tups, left):
-        """ Spaces left on the current field will help how many pkgs? """
-        ret = 0
-        for tup in data_tups:
-            if left < (tup[0] - current):
-                break
-            ret += tup[1]
-        return ret
+    def _calc_columns_histogram(col):
+        """ Return ascending field lengths of a column and the running totals
+            of their package counts, starting with 0. """
+        lengths = sorted(col)
+        totals = [0]
+        for length in lengths:
+            totals.append(totals[-1] + col[length])
+        return lengths, totals
 
     @property
     def history(self):
         return self.base.history
 
+    def pkg_json_dict(self, pkg, attrs=JSON_INFO_ATTRS):
+        """Return the *attrs* of *pkg* as a dict suitable for json.dumps()."""
+        data = {attr: getattr(pkg, attr) for attr in attrs}
+        if pkg._from_system:
+            data['from_repo'] = self.history.repo(pkg) or None
+        return data
+
+    def _prefetch_history(self, pkgs):
+        """Load history data of all installed packages in *pkgs* at once."""
+        installed = [pkg for pkg in pkgs if pkg._from_system]
+        if installed:
+            self.history.package_origins(installed)
+
     @property
     def sack(self):
         return self.base.sack
@@ -215,11 +274,12 @@ class Output(object):
            in data should be placed into for output
         """
         cols = len(data)
-        # Convert the data to ascending list of tuples, (field_length, pkgs)
-        pdata = data
-        data = [None] * cols # Don't modify the passed in data
-        for d in range(0, cols):
-            data[d] = sorted(pdata[d].items())
+        #  Convert the data to ascending lists of field lengths with running
+        # totals of pkgs, so that the number of pkgs a given width helps is
+        # a single bisect instead of a walk over the column.
+        hists = [self._calc_columns_histogram(col) for col in data]
+        # index of the first length in each column not allocated yet
+        starts = [0] * cols
 
         if total_width is None:
             total_width = self.term.real_columns
@@ -229,9 +289,9 @@ class Output(object):
         # avoid splitting lines to enable filtering output
         if not total_width:
             full_columns = []
-            for col in data:
-                if col:
-                    full_columns.append(col[-1][0])
+            for lengths, _totals in hists:
+                if lengths:
+                    full_columns.append(lengths[-1])
                 else:
                     full_columns.append(0)
             full_columns[0] += len(indent)
@@ -264,8 +324,10 @@ class Output(object):
             helps = 0
             val = 0
             for d in xrange(0, cols):
-                thelps = self._calc_columns_spaces_helps(columns[d], data[d],
-                                                         total_width)
+                lengths, totals = hists[d]
+                start = starts[d]
+                end = bisect.bisect_right(lengths, columns[d] + total_width, start)
+                thelps = totals[end] - totals[start]
                 if not thelps:
                     continue
                 #  We prefer to overflow: the last column, and then earlier
@@ -281,7 +343,8 @@ class Output(object):
             #  If we found a column to expand, move up to the next level with
             # that column and start again with any remaining space.
             if helps:
-                diff = data[val].pop(0)[0] - columns[val]
+                diff = hists[val][0][starts[val]] - columns[val]
+                starts[val] += 1
                 if not columns[val] and (val == (cols - 1)):
                     #  If we are going from 0 => N on the last column, take 1
                     # for the space before the column.
@@ -292,7 +355,7 @@ class Output(object):
 
             overflowed_columns = 0
             for d in xrange(0, cols):
-                if not data[d]:
+                if starts[d] == len(hists[d][0]):
                     continue
                 overflowed_columns += 1
             if overflowed_columns:
@@ -300,7 +363,7 @@ class Output(object):
                 # equally
                 norm = total_width // overflowed_columns
                 for d in xrange(0, cols):
-                    if not data[d]:
+                    if starts[d] == len(hists[d][0]):
                         continue
                     columns[d] += norm
                     total_width -= norm
@@ -394,13 +457,29 @@ class Output(object):
            column of output.  The columns are the package name, version,
            and repository
         """
+        print(self._fmt_simple_list(pkg, indent, highlight, columns))
+
+    @staticmethod
+    def _stream_listing():
+        """Whether package listings are written out while they are formatted.
+
+        Streamed listings are in NEVRA order and never hold more than a chunk
+        of formatted output. This is the default when stdout is not a terminal.
+        """
+        try:
+            return not sys.stdout.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    def _fmt_simple_list(self, pkg, indent='', highlight=False, columns=None):
+        """Return the line printed by simpleList()."""
         if columns is None:
             columns = (-40, -22, -16) # Old default
         na = '%s%s.%s' % (indent, pkg.name, pkg.arch)
         hi_cols = [highlight, 'normal', 'normal']
 
         columns = zip((na, pkg.evr, pkg._from_repo), columns, hi_cols)
-        print(self.fmtColumns(columns))
+        return self.fmtColumns(columns)
 
     def simpleEnvraList(self, pkg, ui_overflow=False,
                         indent='', highlight=False, columns=None):
@@ -537,12 +616,8 @@ class Output(object):
             # Translators: This message should be no longer than 12 characters.
                 output_list.append(format_key_val(_("Install time"),
                                                   dnf.util.normalize_time(pkg.installtime)))
-            history_pkg = self.history.package_data(pkg)
-            if history_pkg:
-                try:
-                    uid = int(history_pkg._item.getInstalledBy())
-                except ValueError: # In case int() fails
-                    uid = None
+            uid = self.history.installed_by(pkg)
+            if uid is not None:
                 # Translators: This message should be no longer than 12 chars.
                 output_list.append(format_key_val(_("Installed by"), self._pwd_ui_username(uid)))
         # Translators: This is abbreviated 'Summary'. Should be no longer
@@ -636,6 +711,10 @@ class Output(object):
                        number
                  '>' - highlighting used when the package has a higher version
                        number
+
+        When stdout is not a terminal the packages are written out one by
+        one in NEVRA order instead of being collected first.
+
         :return: (exit_code, [errors])
 
         exit_code is::
@@ -649,15 +728,33 @@ class Output(object):
             if len(lst) > 0:
                 thingslisted = 1
                 print('%s' % description)
+                self._prefetch_history(lst)
                 info_set = set()
-                if outputType == 'list':
+                stream = self._stream_listing()
+                if outputType == 'list' and not stream:
                     unique_item_dict = {}
                     for pkg in lst:
                         unique_item_dict[str(pkg) + str(pkg._from_repo)] = pkg
 
                     lst = unique_item_dict.values()
 
+                # lines are written in chunks, not one print() per package
+                lines = []
+                #  When streaming, duplicates are dropped as they come: packages
+                # with the same NEVRA are adjacent once sorted, so only the repos
+                # of the current NEVRA need to be remembered.
+                last_nevra = None
+                nevra_repos = set()
                 for pkg in sorted(lst):
+                    if stream and outputType in ('list', 'info'):
+                        nevra = str(pkg)
+                        if nevra != last_nevra:
+                            last_nevra = nevra
+                            nevra_repos = set()
+                        if pkg._from_repo in nevra_repos:
+                            continue
+                        nevra_repos.add(pkg._from_repo)
+
                     key = (pkg.name, pkg.arch)
                     highlight = False
                     if key not in highlight_na:
@@ -670,17 +767,26 @@ class Output(object):
                         highlight = highlight_modes.get('<', 'normal')
 
                     if outputType == 'list':
-                        self.simpleList(pkg, ui_overflow=True,
-                                        highlight=highlight, columns=columns)
+                        lines.append(self._fmt_simple_list(
+                            pkg, highlight=highlight, columns=columns))
                     elif outputType == 'info':
-                        info_set.add(self.infoOutput(pkg, highlight=highlight) + "\n")
+                        info = self.infoOutput(pkg, highlight=highlight) + "\n"
+                        if stream:
+                            lines.append(info)
+                        else:
+                            info_set.add(info)
                     elif outputType == 'name':
-                        self.simple_name_list(pkg)
+                        lines.append(ucd(pkg.name))
                     elif outputType == 'nevra':
-                        self.simple_nevra_list(pkg)
+                        lines.append(ucd(pkg))
                     else:
                         pass
+                    if len(lines) >= self.LIST_CHUNK_SIZE:
+                        print("\n".join(lines))
+                        lines = []
 
+                if lines:
+                    print("\n".join(lines))
                 if info_set:
                     print("\n".join(sorted(info_set)))
 
@@ -1052,20 +1158,26 @@ class Output(object):
     def _skipped_packages(self, report_problems):
         """returns set of conflicting packages and set of packages with broken dependency that would
         be additionally installed when --best and --allowerasing"""
-        if self.base._goal.actions & (hawkey.INSTALL | hawkey.UPGRADE | hawkey.UPGRADE_ALL):
-            best = True
+        cached = self.base._cached_skipped()
+        if cached is not None:
+            problem_conflicts, problem_dependency, msg = cached
         else:
-            best = False
-        ng = deepcopy(self.base._goal)
-        params = {"allow_uninstall": self.base._allow_erasing,
-                  "force_best": best,
-                  "ignore_weak": True}
-        ret = ng.run(**params)
-        if not ret and report_problems:
-            msg = dnf.util._format_resolve_problems(ng.problem_rules())
+            if self.base._goal.actions & (hawkey.INSTALL | hawkey.UPGRADE | hawkey.UPGRADE_ALL):
+                best = True
+            else:
+                best = False
+            ng = deepcopy(self.base._goal)
+            params = {"allow_uninstall": self.base._allow_erasing,
+                      "force_best": best,
+                      "ignore_weak": True}
+            ret = ng.run(**params)
+            msg = None if ret else dnf.util._format_resolve_problems(ng.problem_rules())
+            problem_conflicts = set(ng.problem_conflicts(available=True))
+            problem_dependency = \
+                set(ng.problem_broken_dependency(available=True)) - problem_conflicts
+            self.base._cache_skipped(problem_conflicts, problem_dependency, msg)
+        if msg and report_problems:
             logger.warning(msg)
-        problem_conflicts = set(ng.problem_conflicts(available=True))
-        problem_dependency = set(ng.problem_broken_dependency(available=True)) - problem_conflicts
         return problem_conflicts, problem_dependency
 
     def list_transaction(self, transaction):
@@ -1083,6 +1195,7 @@ class Output(object):
             transaction = []
 
         list_bunch = _make_lists(transaction, self.base._goal)
+        self._prefetch_history(tsi.pkg for tsi in transaction)
         pkglist_lines = []
         data = {'n' : {}, 'v' : {}, 'r' : {}}
         a_wid = 0 # Arch can't get "that big" ... so always use the max.
@@ -1443,6 +1556,7 @@ Transaction Summary
 
         out = ''
         list_bunch = _make_lists(transaction, self.base._goal)
+        self._prefetch_history(tsi.pkg for tsi in transaction)
         skipped_conflicts, skipped_broken = self._skipped_packages(report_problems=False)
         skipped = skipped_conflicts.union(skipped_broken)
         skipped = sorted(set([str(pkg) for pkg in skipped]))
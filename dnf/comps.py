@@ -64,18 +64,41 @@ def _first_if_iterable(seq):
 
 def _by_pattern(pattern, case_sensitive, sqn):
     """Return items from sqn matching either exactly or glob-wise."""
+    return _by_patterns([pattern], case_sensitive, sqn)[pattern]
+
+
+def _by_patterns(patterns, case_sensitive, sqn):
+    """Return a dict mapping every pattern to the items from sqn it matches.
+
+    Exact matches take precedence over glob matches like in _by_pattern(), but
+    all patterns are compiled up front and sqn is traversed only once.
+    """
+    flags = 0 if case_sensitive else re.I
+    compiled = []
+    for pattern in patterns:
+        upattern = dnf.i18n.ucd(pattern)
+        match = re.compile(fnmatch.translate(upattern), flags=flags).match
+        compiled.append((pattern, upattern, match))
+    exact = {pattern: set() for pattern in patterns}
+    globbed = {pattern: set() for pattern in patterns}
+
+    for g in sqn:
+        name = g.name
+        id_ = g.id
+        ui_name = None
+        for pattern, upattern, match in compiled:
+            if name == upattern or id_ == upattern:
+                exact[pattern].add(g)
+                continue
+            if match(name) or match(id_):
+                globbed[pattern].add(g)
+                continue
+            if ui_name is None:
+                ui_name = g.ui_name
+            if match(ui_name):
+                globbed[pattern].add(g)
 
-    pattern = dnf.i18n.ucd(pattern)
-    exact = {g for g in sqn if g.name == pattern or g.id == pattern}
-    if exact:
-        return exact
-
-    if case_sensitive:
-        match = re.compile(fnmatch.translate(pattern)).match
-    else:
-        match = re.compile(fnmatch.translate(pattern), flags=re.I).match
-
-    return {g for g in sqn if match(g.name) or match(g.id) or match(g.ui_name)}
+    return {pattern: exact[pattern] or globbed[pattern] for pattern in patterns}
 
 
 def _fn_display_order(group):
@@ -406,6 +429,11 @@ class Comps(object):
         found_envs = _by_pattern(pattern, case_sensitive, envs)
         return sorted(found_envs, key=_fn_display_order)
 
+    def _environments_by_patterns(self, patterns, case_sensitive=False):
+        envs = _by_patterns(patterns, case_sensitive, self.environments_iter())
+        return {pattern: sorted(found_envs, key=_fn_display_order)
+                for pattern, found_envs in envs.items()}
+
     def environments_iter(self):
         # :api
         return (self._build_environment(e) for e in self._i.environments)
@@ -431,6 +459,11 @@ class Comps(object):
         grps = _by_pattern(pattern, case_sensitive, list(self.groups_iter()))
         return sorted(grps, key=_fn_display_order)
 
+    def _groups_by_patterns(self, patterns, case_sensitive=False):
+        grps = _by_patterns(patterns, case_sensitive, self.groups_iter())
+        return {pattern: sorted(found_grps, key=_fn_display_order)
+                for pattern, found_grps in grps.items()}
+
     def groups_iter(self):
         # :api
         return (self._build_group(g) for g in self._i.groups)
@@ -21,22 +21,98 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 from dnf.i18n import _, ucd
+import collections
 import dnf.conf
 import libdnf.conf
 import dnf.exceptions
 import dnf.repo
+import dnf.util
 import glob
+import json
 import logging
+import os
 
 logger = logging.getLogger('dnf')
 
+_SNAPSHOT_VERSION = 1
+
+
+class _ParsedConfig(object):
+    """Options of a config file with their raw and substituted values.
+
+    Stands in for libdnf.conf.ConfigParser when a file is taken from the
+    snapshot. It only offers the read access the repos are built with, the
+    repos of such a file get it as their cfg instead of a parser.
+
+    """
+
+    def __init__(self, sections):
+        # section -> OrderedDict(name -> (raw, substituted))
+        self._sections = sections
+
+    @classmethod
+    def from_parser(cls, parser):
+        sections = collections.OrderedDict()
+        for section in parser.getData():
+            options = collections.OrderedDict()
+            for name in parser.options(section):
+                options[name] = (parser.getValue(section, name),
+                                 parser.getSubstitutedValue(section, name))
+            sections[section] = options
+        return cls(sections)
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(collections.OrderedDict(
+            (section, collections.OrderedDict(
+                (name, (raw, value)) for name, raw, value in options))
+            for section, options in data))
+
+    def to_data(self):
+        return [[section, [[name, raw, value]
+                           for name, (raw, value) in options.items()]]
+                for section, options in self._sections.items()]
+
+    def getData(self):
+        return self._sections
+
+    def hasSection(self, section):
+        return section in self._sections
+
+    def options(self, section):
+        return list(self._sections[section])
+
+    def getValue(self, section, name):
+        return self._sections[section][name][0]
+
+    def getSubstitutedValue(self, section, name):
+        return self._sections[section][name][1]
+
 
 class RepoReader(object):
-    def __init__(self, conf, opts):
+    def __init__(self, conf, opts, snapshot_path=None):
+        """Read repositories from the main config and the .repo files.
+
+        With snapshot_path set the parsed and substituted files are stored
+        there. A file is taken from the snapshot as long as neither the file
+        nor the substitutions changed, the cfg of its repos is a
+        _ParsedConfig then. Otherwise it is the libdnf.conf.ConfigParser of
+        the file as usual.
+
+        """
         self.conf = conf
         self.opts = opts
+        self.snapshot_path = snapshot_path
+        self._snapshot = {}
+        self._parsed = {}
 
     def __iter__(self):
+        key = None
+        if self.snapshot_path:
+            key = sorted([name, value]
+                         for name, value in self.conf.substitutions.items())
+            self._snapshot = self._load_snapshot(key)
+
         # get the repos from the main yum.conf file
         for r in self._get_repos(self.conf.config_file_path):
             yield r
@@ -51,6 +127,38 @@ class RepoReader(object):
                 logger.warning(_("Warning: failed loading '%s', skipping."),
                                repofn)
 
+        if key is not None and self._parsed != self._snapshot:
+            self._save_snapshot(key)
+
+    @staticmethod
+    def _file_stamp(filename):
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+        return [st.st_dev, st.st_ino, st.st_size, st.st_mtime]
+
+    def _load_snapshot(self, key):
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+        if not isinstance(snapshot, dict) \
+                or snapshot.get('version') != _SNAPSHOT_VERSION \
+                or snapshot.get('key') != key:
+            return {}
+        return snapshot['files']
+
+    def _save_snapshot(self, key):
+        snapshot = {'version': _SNAPSHOT_VERSION, 'key': key,
+                    'files': self._parsed}
+        try:
+            with dnf.util._atomic_write(self.snapshot_path) as f:
+                json.dump(snapshot, f)
+        except (IOError, OSError) as e:
+            logger.debug('Cannot write %s: %s', self.snapshot_path, e)
+
     def _build_repo(self, parser, id_, repofn):
         """Build a repository using the parsed data."""
 
@@ -74,15 +182,30 @@ class RepoReader(object):
     def _get_repos(self, repofn):
         """Parse and yield all repositories from a config file."""
 
-        substs = self.conf.substitutions
-        parser = libdnf.conf.ConfigParser()
-        parser.setSubstitutions(substs)
-        try:
-            parser.read(repofn)
-        except RuntimeError as e:
-            raise dnf.exceptions.ConfigError(_('Parsing file "%s" failed: %s') % (repofn, e))
-        except IOError as e:
-            logger.warning(e)
+        stamp = None
+        if self.snapshot_path:
+            stamp = self._file_stamp(repofn)
+        cached = self._snapshot.get(repofn)
+        if stamp is not None and cached is not None and cached[0] == stamp:
+            self._parsed[repofn] = cached
+            parser = cfg = _ParsedConfig.from_data(cached[1])
+        else:
+            substs = self.conf.substitutions
+            parser = libdnf.conf.ConfigParser()
+            parser.setSubstitutions(substs)
+            try:
+                parser.read(repofn)
+            except RuntimeError as e:
+                raise dnf.exceptions.ConfigError(_('Parsing file "%s" failed: %s') % (repofn, e))
+            except IOError as e:
+                logger.warning(e)
+                return
+            # the repos keep the real parser for plugins using repo.cfg
+            cfg = parser
+            if stamp is not None:
+                # substitute once, for both the snapshot and the repos
+                parser = _ParsedConfig.from_parser(parser)
+                self._parsed[repofn] = [stamp, parser.to_data()]
 
         # Check sections in the .repo file that was just slurped up
         for section in parser.getData():
@@ -104,6 +227,7 @@ class RepoReader(object):
                 continue
             else:
                 thisrepo.repofile = repofn
+                thisrepo.cfg = cfg
 
             thisrepo._configure_from_options(self.opts)
 
@@ -22,13 +22,18 @@ from __future__ import print_function
 from __future__ import absolute_import
 from __future__ import unicode_literals
 from dnf.i18n import _
+import collections
 import contextlib
 import dnf.pycomp
 import dnf.util
 import dnf.yum.misc
+import hashlib
 import io
+import json
 import logging
+import multiprocessing.pool
 import os
+import struct
 import tempfile
 
 try:
@@ -38,9 +43,14 @@ except ImportError:
     import gpgme
 
 
+    _ImportStatus = collections.namedtuple('_ImportStatus', ['fpr', 'result', 'status'])
+    _ImportResult = collections.namedtuple('_ImportResult', ['imports'])
+
+
     class Context(object):
         def __init__(self):
             self.__dict__["ctx"] = gpgme.Context()
+            self.__dict__["import_result"] = None
 
         def __enter__(self):
             return self
@@ -59,7 +69,13 @@ except ImportError:
         def op_import(self, key_fo):
             if isinstance(key_fo, basestring):
                 key_fo = io.BytesIO(key_fo)
-            self.ctx.import_(key_fo)
+            self.__dict__["import_result"] = self.ctx.import_(key_fo)
+
+        def op_import_result(self):
+            result = self.import_result
+            if result is None:
+                return None
+            return _ImportResult([_ImportStatus(*status) for status in result.imports])
 
         def op_export(self, pattern, mode, keydata):
             self.ctx.export(pattern, keydata)
@@ -86,8 +102,14 @@ except ImportError:
 
 
 GPG_HOME_ENV = 'GNUPGHOME'
+KEYINFO_CACHE = 'gpgkeys.json'
 logger = logging.getLogger('dnf')
 
+# keys parsed by this process by the sha256 of the key file, and the key ids
+# of pubrings by the path and the state of the files in it
+_keyinfos_by_digest = {}
+_pubring_keyids = {}
+
 
 def _extract_signing_subkey(key):
     return dnf.util.first(subkey for subkey in key.subkeys if subkey.can_sign)
@@ -101,8 +123,8 @@ def _printable_fingerprint(fpr_hex):
 def import_repo_keys(repo):
     gpgdir = repo._pubring_dir
     known_keys = keyids_from_pubring(gpgdir)
-    for keyurl in repo.gpgkey:
-        for keyinfo in retrieve(keyurl, repo):
+    for keyinfos in retrieve_all(repo.gpgkey, repo):
+        for keyinfo in keyinfos:
             keyid = keyinfo.id_
             if keyid in known_keys:
                 logger.debug(_('repo %s: 0x%s already imported'), repo.id, keyid)
@@ -115,17 +137,39 @@ def import_repo_keys(repo):
             logger.debug(_('repo %s: imported key 0x%s.'), repo.id, keyid)
 
 
+def _pubring_stamp(gpgdir):
+    try:
+        names = sorted(os.listdir(gpgdir))
+    except OSError:
+        return None
+    stamp = []
+    for name in names:
+        try:
+            st = os.stat(os.path.join(gpgdir, name))
+        except OSError:
+            continue
+        stamp.append((name, st.st_size, st.st_mtime))
+    return tuple(stamp)
+
+
 def keyids_from_pubring(gpgdir):
     if not os.path.exists(gpgdir):
         return []
 
+    stamp = _pubring_stamp(gpgdir)
+    cached = _pubring_keyids.get(gpgdir)
+    if stamp is not None and cached is not None and cached[0] == stamp:
+        return list(cached[1])
+
     with pubring_dir(gpgdir), Context() as ctx:
         keyids = []
         for k in ctx.keylist():
             subkey = _extract_signing_subkey(k)
             if subkey is not None:
                 keyids.append(subkey.keyid)
-        return keyids
+    if stamp is not None:
+        _pubring_keyids[gpgdir] = (stamp, list(keyids))
+    return keyids
 
 
 def log_key_import(keyinfo):
@@ -152,32 +196,216 @@ def pubring_dir(pubring_dir):
             os.environ[GPG_HOME_ENV] = orig
 
 
-def rawkey2infos(key_fo):
+def _imported_keys(ctx, rawkey):
+    """Import rawkey into ctx and return the keys it contained."""
+    ctx.op_import(rawkey)
+    result = ctx.op_import_result()
+    fprs = []
+    for status in (result.imports if result is not None else []):
+        if status.fpr and status.fpr not in fprs:
+            fprs.append(status.fpr)
+    return [ctx.get_key(fpr) for fpr in fprs]
+
+
+def _rawkeys2infos(rawkeys):
+    """Parse the contents of several key files in one temporary keyring.
+
+    Returns a list of Key lists, one for each item of rawkeys.
+
+    """
     pb_dir = tempfile.mkdtemp()
-    keyinfos = []
-    with pubring_dir(pb_dir), Context() as ctx:
-        ctx.op_import(key_fo)
-        for key in ctx.keylist():
-            subkey = _extract_signing_subkey(key)
-            if subkey is None:
-                continue
-            keyinfos.append(Key(key, subkey))
-        ctx.armor = True
-        for info in keyinfos:
-            with Data() as sink:
-                ctx.op_export(info.id_, 0, sink)
-                sink.seek(0, os.SEEK_SET)
-                info.raw_key = sink.read()
-    dnf.util.rm_rf(pb_dir)
-    return keyinfos
+    result = []
+    try:
+        with pubring_dir(pb_dir), Context() as ctx:
+            for rawkey in rawkeys:
+                keyinfos = []
+                for key in _imported_keys(ctx, rawkey):
+                    subkey = _extract_signing_subkey(key)
+                    if subkey is None:
+                        continue
+                    keyinfos.append(Key(key, subkey))
+                result.append(keyinfos)
+            ctx.armor = True
+            for keyinfos in result:
+                for info in keyinfos:
+                    with Data() as sink:
+                        ctx.op_export(info.id_, 0, sink)
+                        sink.seek(0, os.SEEK_SET)
+                        info.raw_key = sink.read()
+    finally:
+        dnf.util.rm_rf(pb_dir)
+    return result
+
+
+def _parse_rawkeys(rawkeys):
+    """Like _rawkeys2infos() but skip the keyring for already parsed files."""
+    digests = [hashlib.sha256(rawkey).hexdigest() for rawkey in rawkeys]
+    missing = [(digest, rawkey) for digest, rawkey in zip(digests, rawkeys)
+               if digest not in _keyinfos_by_digest]
+    if missing:
+        parsed = _rawkeys2infos([rawkey for _digest, rawkey in missing])
+        for (digest, _rawkey), keyinfos in zip(missing, parsed):
+            _keyinfos_by_digest[digest] = [info._to_dict() for info in keyinfos]
+    return [[Key._from_dict(data) for data in _keyinfos_by_digest[digest]]
+            for digest in digests]
+
+
+def rawkey2infos(key_fo):
+    return _parse_rawkeys([key_fo.read()])[0]
+
+
+def _pgp_packets(data):
+    """Return the (tag, body) of the OpenPGP packets in data, armored or not."""
+    if data.lstrip().startswith(b'-----BEGIN PGP'):
+        data = dnf.yum.misc.procgpgkey(data)
+    data = bytearray(data)
+    packets = []
+    pos = 0
+    while pos < len(data):
+        header = data[pos]
+        pos += 1
+        if not header & 0x80:
+            raise ValueError('Not an OpenPGP packet')
+        if header & 0x40:
+            tag = header & 0x3f
+            first = data[pos]
+            pos += 1
+            if first < 192:
+                length = first
+            elif first < 224:
+                length = ((first - 192) << 8) + data[pos] + 192
+                pos += 1
+            elif first == 255:
+                length = struct.unpack('>I', bytes(data[pos:pos + 4]))[0]
+                pos += 4
+            else:
+                raise ValueError('Partial OpenPGP packet')
+        else:
+            tag = (header >> 2) & 0x0f
+            size = header & 0x03
+            if size == 3:
+                raise ValueError('Indeterminate OpenPGP packet')
+            size = 1 << size
+            length = 0
+            for byte in data[pos:pos + size]:
+                length = (length << 8) + byte
+            pos += size
+        body = bytes(data[pos:pos + length])
+        if len(body) != length:
+            raise ValueError('Truncated OpenPGP packet')
+        packets.append((tag, body))
+        pos += length
+    return packets
+
+
+def _verify_keyinfo(file_packets, data):
+    """Check a cached key against the packets of the key file.
+
+    Every packet of the key material has to come from the file, and the key
+    id, fingerprint, timestamp and user id have to be those of the key
+    material, so an entry can only describe a key the file contains.
+
+    """
+    packets = _pgp_packets(data['raw_key'].encode('ascii'))
+    if not packets or packets[0][0] != 6 or not set(packets) <= set(file_packets):
+        return False
+    uids = [body for tag, body in packets if tag == 13]
+    for tag, body in packets:
+        # version 4 keys only, anything else is parsed again
+        if tag not in (6, 14) or body[:1] != b'\x04':
+            continue
+        fpr = hashlib.sha1(b'\x99' + struct.pack('>H', len(body)) + body).hexdigest().upper()
+        if fpr == data['fingerprint']:
+            return (data['id'] == fpr[-16:]
+                    and data['timestamp'] == struct.unpack('>I', body[1:5])[0]
+                    and bool(uids) and data['userid'] == uids[0].decode('utf-8'))
+    return False
+
+
+def _load_keyinfo_cache(path, keyurls, rawkeys):
+    """Seed the parsed keys with the cache entries that match the key files."""
+    try:
+        with open(path, 'r') as f:
+            cache = json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    for keyurl, rawkey in zip(keyurls, rawkeys):
+        digest = hashlib.sha256(rawkey).hexdigest()
+        entry = cache.get(keyurl)
+        if digest in _keyinfos_by_digest or not isinstance(entry, dict) \
+                or entry.get('sha256') != digest:
+            continue
+        try:
+            file_packets = _pgp_packets(rawkey)
+            keys = entry['keys']
+            if all(_verify_keyinfo(file_packets, data) for data in keys):
+                _keyinfos_by_digest[digest] = [dict(data) for data in keys]
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError,
+                UnicodeError, struct.error):
+            logger.debug(_('Ignoring the cached keys of %s.'), keyurl)
+    return cache
+
+
+def _download(keyurl, repo):
+    try:
+        with dnf.util._urlopen(keyurl, repo=repo) as handle:
+            return handle.read()
+    except IOError as e:
+        return e
+
+
+def retrieve_all(keyurls, repo=None, workers=4):
+    """Retrieve the keys of several key files.
+
+    The files are downloaded concurrently and parsed in one keyring, files
+    already parsed by this process are not parsed again. With a repo, the
+    keys are also remembered in its cachedir by the URL and the sha256 of
+    the file, and taken from there as long as they check out against the
+    packets of the file. Returns a list of Key lists in the order of keyurls.
+
+    """
+    keyurls = list(keyurls)
+    if len(keyurls) > 1:
+        pool = multiprocessing.pool.ThreadPool(min(workers, len(keyurls)))
+        try:
+            rawkeys = pool.map(lambda keyurl: _download(keyurl, repo), keyurls)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        rawkeys = [_download(keyurl, repo) for keyurl in keyurls]
+    for rawkey in rawkeys:
+        if isinstance(rawkey, IOError):
+            raise rawkey
+
+    cache_path = cache = None
+    if repo is not None:
+        cache_path = os.path.join(repo._repo.getCachedir(), KEYINFO_CACHE)
+        cache = _load_keyinfo_cache(cache_path, keyurls, rawkeys)
+
+    result = _parse_rawkeys(rawkeys)
+    for keyurl, keyinfos in zip(keyurls, result):
+        for keyinfo in keyinfos:
+            keyinfo.url = keyurl
+
+    if cache is not None:
+        updated = dict(cache)
+        for keyurl, rawkey, keyinfos in zip(keyurls, rawkeys, result):
+            updated[keyurl] = {'sha256': hashlib.sha256(rawkey).hexdigest(),
+                               'keys': [info._to_dict() for info in keyinfos]}
+        if updated != cache:
+            try:
+                with dnf.util._atomic_write(cache_path) as f:
+                    json.dump(updated, f)
+            except (IOError, OSError) as e:
+                logger.debug('Cannot write the key cache %s: %s', cache_path, e)
+    return result
 
 
 def retrieve(keyurl, repo=None):
-    with dnf.util._urlopen(keyurl, repo=repo) as handle:
-        keyinfos = rawkey2infos(handle)
-    for keyinfo in keyinfos:
-        keyinfo.url = keyurl
-    return keyinfos
+    return retrieve_all([keyurl], repo)[0]
 
 
 class Key(object):
@@ -189,6 +417,25 @@ class Key(object):
         self.url = None
         self.userid = key.uids[0].uid
 
+    @classmethod
+    def _from_dict(cls, data):
+        info = cls.__new__(cls)
+        info.id_ = data['id']
+        info.fingerprint = data['fingerprint']
+        info.raw_key = data['raw_key'].encode('ascii')
+        info.timestamp = data['timestamp']
+        info.url = None
+        info.userid = data['userid']
+        return info
+
+    def _to_dict(self):
+        raw_key = self.raw_key
+        if isinstance(raw_key, bytes):
+            raw_key = raw_key.decode('ascii')
+        return {'id': self.id_, 'fingerprint': self.fingerprint,
+                'raw_key': raw_key, 'timestamp': self.timestamp,
+                'userid': self.userid}
+
     @property
     def short_id(self):
         rj = '0' if dnf.pycomp.PY3 else b'0'
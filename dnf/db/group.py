@@ -32,6 +32,7 @@ class PersistorBase(object):
         self._installed = {}
         self._removed = {}
         self._upgraded = {}
+        self._installed_ids = None
 
     def __len__(self):
         return len(self._installed) + len(self._removed) + len(self._upgraded)
@@ -40,10 +41,26 @@ class PersistorBase(object):
         self._installed = {}
         self._removed = {}
         self._upgraded = {}
+        self._installed_ids = None
 
     def _get_obj_id(self, obj):
         raise NotImplementedError
 
+    def _get_comps_item(self, transaction_item):
+        raise NotImplementedError
+
+    def installed_ids(self):
+        """Return a set of ids of all installed objects.
+
+        The ids are loaded from swdb in one lookup on the first call and kept
+        for the lifetime of the persistor.
+        """
+        if self._installed_ids is None:
+            # '%' is the SQL LIKE wildcard matching every stored id
+            items = (self._get_comps_item(i) for i in self.search_by_pattern("%"))
+            self._installed_ids = {self._get_obj_id(i) for i in items if i}
+        return self._installed_ids
+
     def install(self, obj):
         self._installed[self._get_obj_id(obj)] = obj
 
@@ -73,6 +90,9 @@ class GroupPersistor(PersistorBase):
     def _get_obj_id(self, obj):
         return obj.getGroupId()
 
+    def _get_comps_item(self, transaction_item):
+        return transaction_item.getCompsGroupItem()
+
     def new(self, obj_id, name, translated_name, pkg_types):
         swdb_group = self.history.swdb.createCompsGroupItem()
         swdb_group.setGroupId(obj_id)
@@ -131,6 +151,9 @@ class EnvironmentPersistor(PersistorBase):
     def _get_obj_id(self, obj):
         return obj.getEnvironmentId()
 
+    def _get_comps_item(self, transaction_item):
+        return transaction_item.getCompsEnvironmentItem()
+
     def new(self, obj_id, name, translated_name, pkg_types):
         swdb_env = self.history.swdb.createCompsEnvironmentItem()
         swdb_env.setEnvironmentId(obj_id)
@@ -18,7 +18,9 @@
 #
 
 import calendar
+import logging
 import os
+import sqlite3
 import time
 
 import libdnf.transaction
@@ -29,6 +31,44 @@ from dnf.yum import misc
 
 from .group import GroupPersistor, EnvironmentPersistor, RPMTransaction
 
+logger = logging.getLogger("dnf")
+
+# actions which do not describe the currently installed version of a package
+_INACTIVE_ACTIONS = (
+    libdnf.transaction.TransactionItemAction_DOWNGRADED,
+    libdnf.transaction.TransactionItemAction_OBSOLETED,
+    libdnf.transaction.TransactionItemAction_UPGRADED,
+    libdnf.transaction.TransactionItemAction_REINSTALLED,
+)
+
+# the rows libdnf's getRPMRepo() and getRPMTransactionItem() choose from,
+# for the packages of the given names
+_RPM_ORIGINS_SQL = """
+    SELECT
+        rpm.name, rpm.epoch, rpm.version, rpm.release, rpm.arch,
+        repo.repoid, trans.state, trans.user_id, trans_item.trans_id, trans_item.id
+    FROM
+        trans_item
+    JOIN
+        rpm USING (item_id)
+    LEFT JOIN
+        repo ON trans_item.repo_id == repo.id
+    JOIN
+        trans ON trans_item.trans_id == trans.id
+    WHERE
+        trans_item.action NOT IN (%s)
+        AND rpm.name IN (%%s)
+""" % ", ".join(str(int(action)) for action in _INACTIVE_ACTIONS)
+# stay below the default SQLITE_MAX_VARIABLE_NUMBER
+_SQL_CHUNK = 500
+
+
+def _nevra(name, epoch, version, release, arch):
+    # the same format as str(hawkey.Package), zero epoch is omitted
+    if epoch:
+        return "%s-%s:%s-%s.%s" % (name, epoch, version, release, arch)
+    return "%s-%s-%s.%s" % (name, version, release, arch)
+
 
 class RPMTransactionItemWrapper(object):
     def __init__(self, swdb, item):
@@ -244,6 +284,14 @@ class MergedTransactionWrapper(TransactionWrapper):
     def output(self):
         return [i[1] for i in self._trans.getConsoleOutput()]
 
+
+def _uid_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
 class SwdbInterface(object):
 
     def __init__(self, db_dir, releasever=""):
@@ -257,6 +305,8 @@ class SwdbInterface(object):
         self._swdb = None
         self._db_dir = db_dir
         self._output = []
+        self._pkg_repos = {}
+        self._pkg_installed_by = {}
 
     def __del__(self):
         self.close()
@@ -310,6 +360,8 @@ class SwdbInterface(object):
             self._swdb.closeDatabase()
         self._swdb = None
         self._output = []
+        self._pkg_repos = {}
+        self._pkg_installed_by = {}
 
     @property
     def path(self):
@@ -357,6 +409,12 @@ class SwdbInterface(object):
         ti.setState(libdnf.transaction.TransactionItemState_DONE)
         return ti
 
+    def set_reasons(self, pkgs, reason):
+        """Set the same reason for many packages"""
+        # look up the repositories of all the packages at once
+        self.package_origins(pkgs)
+        return [self.set_reason(pkg, reason) for pkg in pkgs]
+
     '''
     def package(self, pkg):
         """Get SwdbPackage from package"""
@@ -365,7 +423,79 @@ class SwdbInterface(object):
 
     def repo(self, pkg):
         """Get repository of package"""
-        return self.swdb.getRPMRepo(str(pkg))
+        nevra = str(pkg)
+        if nevra in self._pkg_repos:
+            return self._pkg_repos[nevra]
+        return self.swdb.getRPMRepo(nevra)
+
+    def installed_by(self, pkg):
+        """Get uid of the user who installed the package or None"""
+        nevra = str(pkg)
+        if nevra in self._pkg_installed_by:
+            return self._pkg_installed_by[nevra]
+        history_pkg = self.package_data(pkg)
+        if history_pkg is None:
+            return None
+        return _uid_or_none(history_pkg._item.getInstalledBy())
+
+    def package_origins(self, pkgs):
+        """Look up repositories and installing users of many packages at once.
+
+        Return a tuple of two dicts mapping NEVRA strings of *pkgs* to the
+        repoid each package was installed from and to the uid of the user
+        who installed it. The results are remembered, so that subsequent
+        repo() and installed_by() calls for the packages need no query.
+        """
+        names = {str(pkg): pkg.name for pkg in pkgs}
+        nevras = set(names)
+        missing = nevras.difference(self._pkg_repos)
+        if missing:
+            self._load_package_origins({nevra: names[nevra] for nevra in missing})
+        repos = {nevra: self._pkg_repos[nevra] for nevra in nevras}
+        installed_by = {nevra: self._pkg_installed_by[nevra] for nevra in nevras}
+        return repos, installed_by
+
+    def _load_package_origins(self, nevras):
+        # nevras maps NEVRA strings to the package names
+        repos = {}
+        installed_by = {}
+        try:
+            # read the rows of all the packages in a few queries instead of
+            # asking libdnf separately for every package, the rows are picked
+            # the way libdnf does: the repo of the latest item, the user of
+            # the latest item of a finished transaction
+            if os.path.exists(self.dbpath):
+                conn = sqlite3.connect(self.dbpath)
+                try:
+                    names = sorted(set(nevras.values()))
+                    for i in range(0, len(names), _SQL_CHUNK):
+                        chunk = names[i:i + _SQL_CHUNK]
+                        sql = _RPM_ORIGINS_SQL % ", ".join("?" * len(chunk))
+                        for row in conn.execute(sql, chunk):
+                            nevra = _nevra(*row[:5])
+                            if nevra not in nevras:
+                                continue
+                            repoid, state, user_id, trans_id, item_id = row[5:]
+                            if repoid is not None and \
+                                    item_id > repos.get(nevra, (-1, None))[0]:
+                                repos[nevra] = (item_id, repoid)
+                            order = (trans_id, item_id)
+                            if state == libdnf.transaction.TransactionState_DONE and \
+                                    order > installed_by.get(nevra, ((-1, -1), None))[0]:
+                                installed_by[nevra] = (order, user_id)
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            logger.debug("Bulk history lookup failed: %s", e)
+            for nevra in nevras:
+                self._pkg_repos[nevra] = self.swdb.getRPMRepo(nevra)
+                history_pkg = self.swdb.getRPMTransactionItem(nevra)
+                self._pkg_installed_by[nevra] = _uid_or_none(
+                    history_pkg.getInstalledBy() if history_pkg else None)
+            return
+        for nevra in nevras:
+            self._pkg_repos[nevra] = repos.get(nevra, (None, ""))[1]
+            self._pkg_installed_by[nevra] = _uid_or_none(installed_by.get(nevra, (None, None))[1])
 
     def package_data(self, pkg):
         """Get package data for package"""
@@ -503,6 +633,9 @@ class SwdbInterface(object):
             str(end_rpmdb_version),
             bool(return_code)
         )
+        # the origins of installed packages have changed
+        self._pkg_repos = {}
+        self._pkg_installed_by = {}
 
         # Closing and cleanup is done in the close() method.
         # It is important to keep data around after the transaction ends
@@ -25,17 +25,25 @@ from __future__ import unicode_literals
 from enum import Enum
 import base64
 import hashlib
+import json
 import logging
+import os
 import re
+import threading
+import time
 
 from dnf.i18n import _
 import dnf.rpm.transaction
 import dnf.exceptions
+import dnf.util
 
 logger = logging.getLogger("dnf")
 
 
 RR_TYPE_OPENPGPKEY = 61
+CACHE_FILENAME = 'dnssec.json'
+# used when the resolver does not report the TTL of the answer
+DEFAULT_TTL = 3600
 
 
 class DnssecError(dnf.exceptions.Error):
@@ -135,9 +143,66 @@ class DNSSECKeyVerification:
     already obtained results.
     """
 
-    # Mapping from email address to b64 encoded public key or NoKey in case of proven nonexistence
+    # Mapping from email address to a tuple of b64 encoded public key or NoKey in case of proven
+    # nonexistence and the time the result expires
     _cache = {}
-    # type: Dict[str, Union[str, NoKey]]
+    # type: Dict[str, Tuple[Union[str, NoKey], float]]
+    # File the cache is persisted to, see _set_cachedir()
+    _cache_file = None
+    # type: Optional[str]
+    # Unbound context shared by all the verifications of the process
+    _ctx = None
+    _ctx_lock = threading.Lock()
+
+    @staticmethod
+    def _set_cachedir(cachedir):
+        # type: (str) -> None
+        """
+        Persist the verification results in cachedir and load the ones stored there before.
+        """
+        cache_file = os.path.join(cachedir, CACHE_FILENAME)
+        if cache_file == DNSSECKeyVerification._cache_file:
+            return
+        DNSSECKeyVerification._cache_file = cache_file
+        try:
+            with open(cache_file) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return
+        now = time.time()
+        for email, (key, expires) in data.items():
+            if expires > now and email not in DNSSECKeyVerification._cache:
+                key_union = NoKey if key is None else key.encode('ascii')
+                DNSSECKeyVerification._cache[email] = (key_union, expires)
+
+    @staticmethod
+    def _save_cache():
+        cache_file = DNSSECKeyVerification._cache_file
+        if cache_file is None:
+            return
+        now = time.time()
+        data = {}
+        for email, (key_union, expires) in DNSSECKeyVerification._cache.items():
+            if expires > now:
+                key = None if key_union is NoKey else key_union.decode('ascii')
+                data[email] = [key, expires]
+        try:
+            with dnf.util._atomic_write(cache_file) as f:
+                json.dump(data, f)
+        except (IOError, OSError) as e:
+            logger.debug("Cannot write DNSSEC cache {}: {}".format(cache_file, e))
+
+    @staticmethod
+    def _cache_get(email):
+        # type: (str) -> Union[str, NoKey, None]
+        entry = DNSSECKeyVerification._cache.get(email)
+        if entry is None:
+            return None
+        key_union, expires = entry
+        if expires <= time.time():
+            del DNSSECKeyVerification._cache[email]
+            return None
+        return key_union
 
     @staticmethod
     def _cache_hit(key_union, input_key_string):
@@ -157,11 +222,9 @@ class DNSSECKeyVerification:
             return Validity.REVOKED
 
     @staticmethod
-    def _cache_miss(input_key):
-        # type: (KeyInfo) -> Validity
+    def _context():
         """
-        In case the key was not found in the cache, create an Unbound context and contact the DNS
-        system
+        Return the unbound module and the Unbound context of the process, created on first use.
         """
         try:
             import unbound
@@ -169,21 +232,29 @@ class DNSSECKeyVerification:
             raise RuntimeError("Configuration option 'gpgkey_dns_verification' requires\
             libunbound ({})".format(e))
 
-        ctx = unbound.ub_ctx()
-        if ctx.set_option("verbosity:", "0") != 0:
-            logger.debug("Unbound context: Failed to set verbosity")
+        with DNSSECKeyVerification._ctx_lock:
+            if DNSSECKeyVerification._ctx is None:
+                ctx = unbound.ub_ctx()
+                if ctx.set_option("verbosity:", "0") != 0:
+                    logger.debug("Unbound context: Failed to set verbosity")
 
-        if ctx.set_option("qname-minimisation:", "yes") != 0:
-            logger.debug("Unbound context: Failed to set qname minimisation")
+                if ctx.set_option("qname-minimisation:", "yes") != 0:
+                    logger.debug("Unbound context: Failed to set qname minimisation")
 
-        if ctx.resolvconf() != 0:
-            logger.debug("Unbound context: Failed to read resolv.conf")
+                if ctx.resolvconf() != 0:
+                    logger.debug("Unbound context: Failed to read resolv.conf")
 
-        if ctx.add_ta_file("/var/lib/unbound/root.key") != 0:
-            logger.debug("Unbound context: Failed to add trust anchor file")
+                if ctx.add_ta_file("/var/lib/unbound/root.key") != 0:
+                    logger.debug("Unbound context: Failed to add trust anchor file")
+                DNSSECKeyVerification._ctx = ctx
+        return unbound, DNSSECKeyVerification._ctx
 
-        status, result = ctx.resolve(email2location(input_key.email),
-                                     RR_TYPE_OPENPGPKEY, unbound.RR_CLASS_IN)
+    @staticmethod
+    def _evaluate(input_key, status, result):
+        # type: (KeyInfo, int, Any) -> Validity
+        """
+        Turn the answer of the DNS system into a Validity and remember it if it can be cached.
+        """
         if status != 0:
             logger.debug("Communication with DNS servers failed")
             return Validity.ERROR
@@ -193,8 +264,11 @@ class DNSSECKeyVerification:
         if not result.secure:
             logger.debug("Result is not secured with DNSSEC")
             return Validity.RESULT_NOT_SECURE
+        ttl = getattr(result, 'ttl', None) or DEFAULT_TTL
+        expires = time.time() + ttl
         if result.nxdomain:
             logger.debug("Non-existence of this record was proven by DNSSEC")
+            DNSSECKeyVerification._cache[input_key.email] = (NoKey, expires)
             return Validity.PROVEN_NONEXISTENCE
         if not result.havedata:
             # TODO: This is weird result, but there is no way to perform validation, so just return
@@ -204,6 +278,7 @@ class DNSSECKeyVerification:
         else:
             data = result.data.as_raw_data()[0]
             dns_data_b64 = base64.b64encode(data)
+            DNSSECKeyVerification._cache[input_key.email] = (dns_data_b64, expires)
             if dns_data_b64 == input_key.key:
                 return Validity.VALID
             else:
@@ -212,6 +287,17 @@ class DNSSECKeyVerification:
                 logger.debug("Input key   : {}".format(input_key.key))
                 return Validity.REVOKED
 
+    @staticmethod
+    def _cache_miss(input_key):
+        # type: (KeyInfo) -> Validity
+        """
+        In case the key was not found in the cache, contact the DNS system
+        """
+        unbound, ctx = DNSSECKeyVerification._context()
+        status, result = ctx.resolve(email2location(input_key.email),
+                                     RR_TYPE_OPENPGPKEY, unbound.RR_CLASS_IN)
+        return DNSSECKeyVerification._evaluate(input_key, status, result)
+
     @staticmethod
     def verify(input_key):
         # type: (KeyInfo) -> Validity
@@ -219,16 +305,54 @@ class DNSSECKeyVerification:
         Public API. Use this method to verify a KeyInfo object.
         """
         logger.debug("Running verification for key with id: {}".format(input_key.email))
-        key_union = DNSSECKeyVerification._cache.get(input_key.email)
+        key_union = DNSSECKeyVerification._cache_get(input_key.email)
         if key_union is not None:
             return DNSSECKeyVerification._cache_hit(key_union, input_key.key)
-        else:
-            result = DNSSECKeyVerification._cache_miss(input_key)
-            if result == Validity.VALID:
-                DNSSECKeyVerification._cache[input_key.email] = input_key.key
-            elif result == Validity.PROVEN_NONEXISTENCE:
-                DNSSECKeyVerification._cache[input_key.email] = NoKey()
-            return result
+        result = DNSSECKeyVerification._cache_miss(input_key)
+        DNSSECKeyVerification._save_cache()
+        return result
+
+    @staticmethod
+    def verify_all(input_keys):
+        # type: (List[KeyInfo]) -> List[Validity]
+        """
+        Verify several KeyInfo objects, the DNS queries of the ones not cached are run
+        concurrently.
+        """
+        results = [None] * len(input_keys)
+        misses = []
+        for i, input_key in enumerate(input_keys):
+            logger.debug("Running verification for key with id: {}".format(input_key.email))
+            key_union = DNSSECKeyVerification._cache_get(input_key.email)
+            if key_union is not None:
+                results[i] = DNSSECKeyVerification._cache_hit(key_union, input_key.key)
+            else:
+                misses.append(i)
+        if not misses:
+            return results
+
+        unbound, ctx = DNSSECKeyVerification._context()
+
+        def callback(i, status, result):
+            results[i] = DNSSECKeyVerification._evaluate(input_keys[i], status, result)
+
+        for i in misses:
+            try:
+                location = email2location(input_keys[i].email)
+            except DnssecError as e:
+                # Errors in this exception should not be fatal, print it and just continue
+                logger.exception("Exception raised in DNSSEC extension: email={}, exception={}"
+                                 .format(input_keys[i].email, repr(e)))
+                results[i] = Validity.ERROR
+                continue
+            status, _async_id = ctx.resolve_async(location, i, callback, RR_TYPE_OPENPGPKEY,
+                                                  unbound.RR_CLASS_IN)
+            if status != 0:
+                logger.debug("Communication with DNS servers failed")
+                results[i] = Validity.ERROR
+        ctx.wait()
+        DNSSECKeyVerification._save_cache()
+        return [Validity.ERROR if result is None else result for result in results]
 
 
 def nice_user_msg(ki, v):
@@ -281,14 +405,8 @@ class RpmImportedKeys:
     def check_imported_keys_validity():
         keys = RpmImportedKeys._query_db_for_gpg_keys()
         logger.info(any_msg(_("Testing already imported keys for their validity.")))
-        for key in keys:
-            try:
-                result = DNSSECKeyVerification.verify(key)
-            except DnssecError as e:
-                # Errors in this exception should not be fatal, print it and just continue
-                logger.exception("Exception raised in DNSSEC extension: email={}, exception={}"
-                                 .format(key.email, repr(e)))
-                continue
+        results = DNSSECKeyVerification.verify_all(keys)
+        for key, result in zip(keys, results):
             # TODO: remove revoked keys automatically and possibly ask user to confirm
             if result == Validity.VALID:
                 logger.debug(any_msg("GPG Key {} is valid".format(key.email)))
@@ -26,11 +26,13 @@ from dnf.i18n import _
 
 import dnf.callback
 import dnf.logging
+import dnf.pycomp
 import dnf.repo
 import hawkey
 import logging
 import libdnf.repo
 import os
+import threading
 
 APPLYDELTA = '/usr/bin/applydeltarpm'
 
@@ -105,6 +107,22 @@ class DeltaInfo(object):
         self.queue = []
         self.jobs = {}
         self.err = {}
+        # (name, arch) -> installed packages, built on the first lookup
+        self._installed = None
+        # pids of running rebuilds, guarded by _lock together with queue
+        # and jobs as the reaper threads start queued jobs on their own
+        self._running = set()
+        # payloads whose rebuild could not be started, with the error
+        self._failed = []
+        self._lock = threading.Lock()
+        self._done = dnf.pycomp.Queue()
+
+    def _installed_by_na(self, name, arch):
+        if self._installed is None:
+            self._installed = {}
+            for ipo in self.query:
+                self._installed.setdefault((ipo.name, ipo.arch), []).append(ipo)
+        return self._installed.get((name, arch), ())
 
     def delta_factory(self, po, progress):
         '''Turn a po to Delta RPM po, if possible'''
@@ -123,7 +141,7 @@ class DeltaInfo(object):
 
         best = po._size * self.deltarpm_percentage / 100
         best_delta = None
-        for ipo in self.query.filter(name=po.name, arch=po.arch):
+        for ipo in self._installed_by_na(po.name, po.arch):
             delta = po.get_delta_from_evr(ipo.evr)
             if delta and delta.downloadsize < best:
                 best = delta.downloadsize
@@ -137,7 +155,8 @@ class DeltaInfo(object):
         logger.log(dnf.logging.SUBDEBUG, 'drpm: %d: return code: %d, %d', pid,
                    code >> 8, code & 0xff)
 
-        pload = self.jobs.pop(pid)
+        with self._lock:
+            pload = self.jobs.pop(pid)
         pkg = pload.pkg
         if code != 0:
             unlink_f(pload.pkg.localPkg())
@@ -149,7 +168,7 @@ class DeltaInfo(object):
             self.progress.end(pload, dnf.callback.STATUS_DRPM, _('done'))
 
     def start_job(self, pload):
-        # spawn a delta rebuild job
+        # spawn a delta rebuild job, called with _lock held
         spawn_args = [APPLYDELTA, APPLYDELTA,
                       '-a', pload.pkg.arch,
                       pload.localPkg(), pload.pkg.localPkg()]
@@ -157,24 +176,65 @@ class DeltaInfo(object):
         logger.log(dnf.logging.SUBDEBUG, 'drpm: spawned %d: %s', pid,
                    ' '.join(spawn_args[1:]))
         self.jobs[pid] = pload
+        self._running.add(pid)
+        reaper = threading.Thread(target=self._reap, args=(pid,))
+        reaper.daemon = True
+        reaper.start()
+
+    def _start_queued(self):
+        # fill the free job slots, called with _lock held
+        while self.queue and len(self._running) < self.deltarpm_jobs:
+            pload = self.queue.pop(0)
+            try:
+                self.start_job(pload)
+            except OSError as e:
+                self._failed.append((pload, e))
+
+    def _reap(self, pid):
+        # Every job is waited for by its own thread, so a job is reaped as
+        # soon as it exits and its slot is reused right away, no matter how
+        # long the other jobs take.
+        try:
+            code = os.waitpid(pid, 0)[1]
+        except OSError:
+            # reaped by somebody else, the checksum tells if it succeeded
+            code = 0
+        try:
+            with self._lock:
+                self._running.discard(pid)
+                self._start_queued()
+        finally:
+            # wait() relies on every job being reported
+            self._done.put((pid, code))
+
+    def _process_failed(self):
+        with self._lock:
+            failed = self._failed
+            self._failed = []
+        for pload, e in failed:
+            logger.log(dnf.logging.SUBDEBUG, 'drpm: cannot spawn: %s', e)
+            self.err[pload.pkg] = [_('Delta RPM rebuild failed')]
+
+    def _process_done(self):
+        # handle the rebuilds finished so far, never blocks
+        while not self._done.empty():
+            pid, code = self._done.get()
+            self.job_done(pid, code)
+        self._process_failed()
 
     def enqueue(self, pload):
         # process finished jobs, start new ones
-        while self.jobs:
-            pid, code = os.waitpid(-1, os.WNOHANG)
-            if not pid:
-                break
-            self.job_done(pid, code)
-        self.queue.append(pload)
-        while len(self.jobs) < self.deltarpm_jobs:
-            self.start_job(self.queue.pop(0))
-            if not self.queue:
-                break
+        self._process_done()
+        with self._lock:
+            self.queue.append(pload)
+            self._start_queued()
 
     def wait(self):
         '''Wait until all jobs have finished'''
-        while self.jobs:
-            pid, code = os.wait()
+        while True:
+            with self._lock:
+                if not self.jobs:
+                    break
+            pid, code = self._done.get()
             self.job_done(pid, code)
-            if self.queue:
-                self.start_job(self.queue.pop(0))
+        self._process_failed()
@@ -21,4 +21,171 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
-from hawkey import Goal
+from dnf.pycomp import basestring, long
+
+import hawkey
+
+
+def _pkg_id(pkg):
+    return [str(pkg), pkg.reponame]
+
+
+def _pkgs_by_id(sack, ids):
+    """Return the packages of the ids by id or None if one is missing."""
+    ids = set(tuple(pkg_id) for pkg_id in ids)
+    pkgs = {}
+    if ids:
+        query = sack.query().filterm(nevra_strict=list(set(nevra for nevra, _repo in ids)))
+        for pkg in query:
+            pkgs[(str(pkg), pkg.reponame)] = pkg
+    if not ids.issubset(pkgs):
+        return None
+    return pkgs
+
+
+def _dump_skipped(conflicts, broken, problems):
+    """Return the result of Output._skipped_packages() as JSON serializable data."""
+    return {'conflicts': [_pkg_id(pkg) for pkg in conflicts],
+            'broken': [_pkg_id(pkg) for pkg in broken],
+            'problems': problems}
+
+
+def _load_skipped(sack, data):
+    """Return the (conflicts, broken, problems) in data or None if a package is missing."""
+    pkgs = _pkgs_by_id(sack, data['conflicts'] + data['broken'])
+    if pkgs is None:
+        return None
+    return (set(pkgs[tuple(pkg_id)] for pkg_id in data['conflicts']),
+            set(pkgs[tuple(pkg_id)] for pkg_id in data['broken']),
+            data['problems'])
+
+
+def _job_arg(arg):
+    if isinstance(arg, hawkey.Package):
+        return _pkg_id(arg)
+    if isinstance(arg, hawkey.Selector):
+        return sorted((_pkg_id(pkg) for pkg in arg.matches()), key=repr)
+    if isinstance(arg, (hawkey.Query, list, tuple, set, frozenset)):
+        return sorted((_job_arg(item) for item in arg), key=repr)
+    if arg is None or isinstance(arg, (bool, int, long, float, basestring)):
+        return arg
+    return repr(arg)
+
+
+class Goal(hawkey.Goal):
+    """hawkey.Goal keeping a description of the jobs added to it.
+
+    The description stands for the jobs when deciding whether a goal was
+    resolved before, see Base._resolve_key().
+
+    """
+
+    def __init__(self, sack):
+        super(Goal, self).__init__(sack)
+        self._jobs = []
+
+    def _add_job(self, action, args, kwargs):
+        self._jobs.append([action, [_job_arg(arg) for arg in args],
+                           sorted([key, _job_arg(value)] for key, value in kwargs.items())])
+
+    def distupgrade(self, *args, **kwargs):
+        self._add_job('distupgrade', args, kwargs)
+        return super(Goal, self).distupgrade(*args, **kwargs)
+
+    def distupgrade_all(self, *args, **kwargs):
+        self._add_job('distupgrade_all', args, kwargs)
+        return super(Goal, self).distupgrade_all(*args, **kwargs)
+
+    def erase(self, *args, **kwargs):
+        self._add_job('erase', args, kwargs)
+        return super(Goal, self).erase(*args, **kwargs)
+
+    def install(self, *args, **kwargs):
+        self._add_job('install', args, kwargs)
+        return super(Goal, self).install(*args, **kwargs)
+
+    def upgrade(self, *args, **kwargs):
+        self._add_job('upgrade', args, kwargs)
+        return super(Goal, self).upgrade(*args, **kwargs)
+
+    def upgrade_all(self, *args, **kwargs):
+        self._add_job('upgrade_all', args, kwargs)
+        return super(Goal, self).upgrade_all(*args, **kwargs)
+
+    def _job_key(self):
+        """Return the description of the jobs or None if it is incomplete."""
+        if len(self._jobs) != self.req_length():
+            # jobs were added some other way
+            return None
+        return [self._jobs, sorted(self.group_members)]
+
+
+class _ResolvedGoal(object):
+    """What Base._goal2transaction() needs of a solved Goal, restored from
+    its dump() without running the solver."""
+
+    _LISTS = ('installs', 'upgrades', 'downgrades', 'reinstalls', 'erasures',
+              'obsoleted')
+
+    def __init__(self, lists, obsoleted_by, reasons):
+        self._lists = lists
+        self._obsoleted_by = obsoleted_by
+        self._reasons = reasons
+
+    @classmethod
+    def dump(cls, goal):
+        """Return the result of the solved goal as JSON serializable data."""
+        lists = dict((name, getattr(goal, 'list_' + name)()) for name in cls._LISTS)
+        obsoleted_by = []
+        for name in ('installs', 'upgrades', 'downgrades', 'reinstalls'):
+            for pkg in lists[name]:
+                obsoleted_by.append([_pkg_id(pkg), [_pkg_id(obs) for obs in
+                                                    goal.obsoleted_by_package(pkg)]])
+        reasons = [[_pkg_id(pkg), goal.get_reason(pkg)]
+                   for pkg in lists['installs'] + lists['erasures']]
+        return {'lists': dict((name, [_pkg_id(pkg) for pkg in pkgs])
+                              for name, pkgs in lists.items()),
+                'obsoleted_by': obsoleted_by,
+                'reasons': reasons}
+
+    @classmethod
+    def load(cls, sack, data):
+        """Return the goal result in data or None if a package is missing."""
+        ids = []
+        for pkg_ids in data['lists'].values():
+            ids.extend(pkg_ids)
+        for pkg_id, obs_ids in data['obsoleted_by']:
+            ids.extend(obs_ids)
+        pkgs = _pkgs_by_id(sack, ids)
+        if pkgs is None:
+            return None
+        lists = dict((name, [pkgs[tuple(pkg_id)] for pkg_id in data['lists'].get(name, [])])
+                     for name in cls._LISTS)
+        obsoleted_by = dict((pkgs[tuple(pkg_id)], [pkgs[tuple(obs_id)] for obs_id in obs_ids])
+                            for pkg_id, obs_ids in data['obsoleted_by'])
+        reasons = dict((pkgs[tuple(pkg_id)], reason) for pkg_id, reason in data['reasons'])
+        return cls(lists, obsoleted_by, reasons)
+
+    def list_installs(self):
+        return list(self._lists['installs'])
+
+    def list_upgrades(self):
+        return list(self._lists['upgrades'])
+
+    def list_downgrades(self):
+        return list(self._lists['downgrades'])
+
+    def list_reinstalls(self):
+        return list(self._lists['reinstalls'])
+
+    def list_erasures(self):
+        return list(self._lists['erasures'])
+
+    def list_obsoleted(self):
+        return list(self._lists['obsoleted'])
+
+    def obsoleted_by_package(self, pkg):
+        return list(self._obsoleted_by.get(pkg, []))
+
+    def get_reason(self, pkg):
+        return self._reasons[pkg]
@@ -24,6 +24,7 @@ from dnf.pycomp import unicode
 import dnf
 import locale
 import os
+import re
 import signal
 import sys
 import unicodedata
@@ -153,6 +154,21 @@ def _exact_width_char(uchar):
     return 2 if unicodedata.east_asian_width(uchar) in ('W', 'F') else 1
 
 
+if hasattr(str, 'isascii'):
+    def _is_ascii(msg):
+        return msg.isascii()
+else:
+    _NON_ASCII_RE = re.compile('[^\x00-\x7f]')
+
+    def _is_ascii(msg):
+        return not _NON_ASCII_RE.search(msg)
+
+# widths of non-ASCII strings, they tend to repeat (translated labels,
+# summaries shown in several places) and are expensive to measure
+_WIDTH_CACHE = {}
+_WIDTH_CACHE_SIZE = 4096
+
+
 def chop_str(msg, chop=None):
     """ Return the textual width of a Unicode string, chopping it to
         a specified value. This is what you want to use instead of %.*s, as it
@@ -162,6 +178,10 @@ def chop_str(msg, chop=None):
     if chop is None:
         return exact_width(msg), msg
 
+    if _is_ascii(msg):
+        chopped_msg = msg[:max(chop, 0)]
+        return len(chopped_msg), chopped_msg
+
     width = 0
     chopped_msg = ""
     for char in msg:
@@ -176,7 +196,15 @@ def chop_str(msg, chop=None):
 def exact_width(msg):
     """ Calculates width of char at terminal screen
         (Asian char counts for two) """
-    return sum(_exact_width_char(c) for c in msg)
+    if _is_ascii(msg):
+        return len(msg)
+    width = _WIDTH_CACHE.get(msg)
+    if width is None:
+        width = sum(_exact_width_char(c) for c in msg)
+        if len(_WIDTH_CACHE) >= _WIDTH_CACHE_SIZE:
+            _WIDTH_CACHE.clear()
+        _WIDTH_CACHE[msg] = width
+    return width
 
 
 def fill_exact_width(msg, fill, chop=None, left=True, prefix='', suffix=''):
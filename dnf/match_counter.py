@@ -46,17 +46,51 @@ class MatchCounter(dict):
 
     """
 
+    def __init__(self, *args, **kwargs):
+        super(MatchCounter, self).__init__(*args, **kwargs)
+        # package -> (matches, (weights_sum, needles, -distance)), see _rank()
+        self._ranks = {}
+        # package -> (matches, set of the matched haystacks)
+        self._haystacks = {}
+
+    def __delitem__(self, pkg):
+        super(MatchCounter, self).__delitem__(pkg)
+        self._forget(pkg)
+
+    def __setitem__(self, pkg, matches):
+        super(MatchCounter, self).__setitem__(pkg, matches)
+        self._forget(pkg)
+
+    def clear(self):
+        super(MatchCounter, self).clear()
+        self._ranks.clear()
+        self._haystacks.clear()
+
+    def pop(self, pkg, *default):
+        self._forget(pkg)
+        return super(MatchCounter, self).pop(pkg, *default)
+
+    def popitem(self):
+        item = super(MatchCounter, self).popitem()
+        self._forget(item[0])
+        return item
+
+    def update(self, *args, **kwargs):
+        super(MatchCounter, self).update(*args, **kwargs)
+        self._ranks.clear()
+        self._haystacks.clear()
+
     @staticmethod
     def _eval_weights(pkg, matches):
         # how much is each match worth and return their sum:
-        def weight(match):
-            key = match[0]
-            needle = match[1]
-            haystack = getattr(pkg, key)
-            coef = 2 if haystack == needle else 1
-            return coef * WEIGHTS[key]
-
-        return sum(map(weight, matches))
+        haystacks = {}
+        total = 0
+        for (key, needle) in matches:
+            if key not in haystacks:
+                haystacks[key] = getattr(pkg, key)
+            coef = 2 if haystacks[key] == needle else 1
+            total += coef * WEIGHTS[key]
+        return total
 
     @staticmethod
     def _eval_distance(pkg, matches):
@@ -66,6 +100,33 @@ class MatchCounter(dict):
             dist += len(haystack) - len(needle)
         return dist
 
+    def _forget(self, pkg):
+        self._ranks.pop(pkg, None)
+        self._haystacks.pop(pkg, None)
+
+    def _cached(self, cache, pkg):
+        """Return the cached value for pkg, None if its matches changed since.
+
+        The match lists are plain lists and can be changed in place, so every
+        entry keeps a copy of the matches it was evaluated for.
+
+        """
+        entry = cache.get(pkg)
+        if entry is not None and entry[0] == self[pkg]:
+            return entry[1]
+        return None
+
+    def _rank(self, pkg):
+        """Return the ranking data of pkg, evaluated once for its matches."""
+        rank = self._cached(self._ranks, pkg)
+        if rank is None:
+            matches = self[pkg]
+            rank = (self._eval_weights(pkg, matches),
+                    frozenset(m[1] for m in matches),
+                    -self._eval_distance(pkg, matches))
+            self._ranks[pkg] = (list(matches), rank)
+        return rank
+
     def _key_func(self):
         """Get the key function used for sorting matches.
 
@@ -80,26 +141,31 @@ class MatchCounter(dict):
         """
         max_length = self._max_needles()
         def get_key(pkg):
-            return (self._eval_weights(pkg, self[pkg]),
-                    _canonize_string_set(self.matched_needles(pkg), max_length),
-                    -self._eval_distance(pkg, self[pkg]))
+            weights, needles, distance = self._rank(pkg)
+            return (weights, _canonize_string_set(needles, max_length),
+                    distance)
         return get_key
 
     def _max_needles(self):
         """Return the max count of needles of all packages."""
         if self:
-            return max(len(self.matched_needles(pkg)) for pkg in self)
+            return max(len(self._rank(pkg)[1]) for pkg in self)
         return 0
 
     def add(self, pkg, key, needle):
         self.setdefault(pkg, []).append((key, needle))
+        self._forget(pkg)
 
     def dump(self):
         for pkg in self:
             print('%s\t%s' % (pkg, self[pkg]))
 
     def matched_haystacks(self, pkg):
-        return set(getattr(pkg, m[0]) for m in self[pkg])
+        haystacks = self._cached(self._haystacks, pkg)
+        if haystacks is None:
+            haystacks = set(getattr(pkg, key) for key in self.matched_keys(pkg))
+            self._haystacks[pkg] = (list(self[pkg]), haystacks)
+        return haystacks
 
     def matched_keys(self, pkg):
         # return keys in the same order they appear in the list
@@ -111,7 +177,7 @@ class MatchCounter(dict):
         return result
 
     def matched_needles(self, pkg):
-        return set(m[1] for m in self[pkg])
+        return self._rank(pkg)[1]
 
     def sorted(self, reverse=False, limit_to=None):
         keys = limit_to if limit_to else self.keys()
@@ -0,0 +1,137 @@
+# name_index.py
+# Sorted index of installed and available package names for completion.
+#
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+# The index file has two lines. The first one is a small JSON header with what
+# the installed and available parts were built from, so that checking whether
+# the index is current does not need to parse the rest. The second line holds
+# the sorted (name, nevra) pairs of both parts. Excludes are ignored, the index
+# must not depend on the options of the run which happened to build it.
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import bisect
+import dnf.util
+import hawkey
+import json
+import logging
+import os
+
+logger = logging.getLogger("dnf")
+
+_VERSION = 2
+PARTS = ('installed', 'available')
+
+
+def _repo_stamp(repo):
+    repomd = os.path.join(repo._repo.getCachedir(), 'repodata', 'repomd.xml')
+    try:
+        st = os.stat(repomd)
+    except OSError:
+        return None
+    return [repo.id, st.st_size, st.st_mtime]
+
+
+def _keys(installroot, repos):
+    """Return what the parts of an index for the current state are built from."""
+    available = [_repo_stamp(repo) for repo in sorted(repos.iter_enabled(),
+                                                      key=lambda r: r.id)]
+    return {'installed': dnf.util._rpmdb_stamp(installroot),
+            'available': None if None in available else available}
+
+
+def _read_header(path):
+    try:
+        with open(path, 'r') as f:
+            header = json.loads(f.readline())
+    except (IOError, OSError, ValueError):
+        return None
+    if not isinstance(header, dict) or header.get('version') != _VERSION:
+        return None
+    return header
+
+
+class NameIndex(object):
+    """Installed and available packages sorted by name."""
+
+    def __init__(self, parts):
+        self._parts = {}
+        for part, pairs in parts.items():
+            self._parts[part] = ([name for name, _nevra in pairs],
+                                 [nevra for _name, nevra in pairs])
+
+    @classmethod
+    def load(cls, path, installroot, repos, parts=PARTS):
+        """Return the index in path if the given parts are current, else None."""
+        header = _read_header(path)
+        if header is None:
+            return None
+        keys = _keys(installroot, repos)
+        for part in parts:
+            if keys[part] is None or header.get(part) != keys[part]:
+                return None
+        try:
+            with open(path, 'r') as f:
+                f.readline()
+                data = json.loads(f.readline())
+        except (IOError, OSError, ValueError):
+            return None
+        return cls(dict((part, data[part]) for part in parts))
+
+    def lookup(self, part, prefix):
+        """Return NEVRAs of the packages in part whose name starts with prefix."""
+        names, nevras = self._parts[part]
+        start = bisect.bisect_left(names, prefix)
+        end = start
+        while end < len(names) and names[end].startswith(prefix):
+            end += 1
+        return nevras[start:end]
+
+
+def update(path, base, installed, available):
+    """Rebuild the parts of the index in path the sack of base has loaded."""
+    keys = _keys(base.conf.installroot, base.repos)
+    header = _read_header(path) or {'version': _VERSION}
+    rebuild = []
+    if installed and keys['installed'] != header.get('installed'):
+        rebuild.append('installed')
+    if available and keys['available'] != header.get('available'):
+        rebuild.append('available')
+    if not rebuild:
+        return
+    data = dict((part, []) for part in PARTS)
+    if len(rebuild) < len(PARTS):
+        try:
+            with open(path, 'r') as f:
+                f.readline()
+                data.update(json.loads(f.readline()))
+        except (IOError, OSError, ValueError):
+            # the other part can not be kept
+            header = {'version': _VERSION}
+    for part in rebuild:
+        q = getattr(base.sack.query(flags=hawkey.IGNORE_EXCLUDES), part)()
+        data[part] = sorted([pkg.name, str(pkg)] for pkg in q)
+        header[part] = keys[part]
+    try:
+        with dnf.util._atomic_write(path) as f:
+            f.write(json.dumps(header) + '\n')
+            f.write(json.dumps(data, separators=(',', ':')) + '\n')
+    except (IOError, OSError) as e:
+        logger.debug('Cannot write the name index %s: %s', path, e)
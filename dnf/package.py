@@ -269,8 +269,41 @@ class Package(hawkey.Package):
         (chksum_type, chksum) = self.returnIdSum()
         real_sum = dnf.yum.misc.checksum(chksum_type, self.localPkg(),
                                          datasize=self._size)
+        return self._verify_sum(chksum_type, chksum, real_sum)
+
+    def _verify_sum(self, chksum_type, chksum, real_sum):
         if real_sum != chksum:
             logger.debug(_('%s: %s check failed: %s vs %s'),
                          self, chksum_type, real_sum, chksum)
             return False
         return True
+
+
+def _verify_local_pkgs(pkgs):
+    """Same as calling verifyLocalPkg() of every package, but the checksums are
+    computed in parallel. An exception raised by a verification is returned in
+    place of its result.
+    """
+    results = [None] * len(pkgs)
+    jobs = []
+    sums = []
+    for idx, pkg in enumerate(pkgs):
+        if pkg._from_system:
+            results[idx] = ValueError("Can not verify an installed package.")
+        elif pkg._from_cmdline:
+            results[idx] = True
+        else:
+            try:
+                (chksum_type, chksum) = pkg.returnIdSum()
+                jobs.append((chksum_type, pkg.localPkg(), pkg._size))
+            except Exception as e:
+                results[idx] = e
+                continue
+            sums.append((idx, chksum))
+    real_sums = dnf.yum.misc.checksum_files(jobs)
+    for (idx, chksum), (chksum_type, _path, _size), real_sum in zip(sums, jobs, real_sums):
+        if isinstance(real_sum, Exception):
+            results[idx] = real_sum
+        else:
+            results[idx] = pkgs[idx]._verify_sum(chksum_type, chksum, real_sum)
+    return results
@@ -26,9 +26,12 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 from dnf.i18n import _
+from dnf.yum.misc import unlink_f
+import contextlib
 import distutils.version
 import dnf.util
 import errno
+import fcntl
 import fnmatch
 import json
 import logging
@@ -62,9 +65,23 @@ class JSONDB(object):
 
     @staticmethod
     def _write_json_db(json_path, content):
-        with open(json_path, 'w') as f:
+        # never leave a truncated file behind, readers see the old or the new
+        # content
+        with dnf.util._atomic_write(json_path, fsync=True) as f:
             json.dump(content, f)
 
+    @staticmethod
+    @contextlib.contextmanager
+    def _locked(json_path):
+        """Serialize read-modify-write of json_path among processes."""
+        dnf.util.ensure_dir(os.path.dirname(json_path))
+        fd = os.open(json_path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
 
 class RepoPersistor(JSONDB):
     """Persistent data kept for repositories.
@@ -78,6 +95,8 @@ class RepoPersistor(JSONDB):
         self.db_path = os.path.join(self.cachedir, "expired_repos.json")
         self.expired_to_add = set()
         self.reset_last_makecache = False
+        self.refresh_path = os.path.join(self.cachedir, "refresh_deadlines.json")
+        self.refresh_to_set = {}
 
     @property
     def _last_makecache_path(self):
@@ -87,9 +106,27 @@ class RepoPersistor(JSONDB):
         self._check_json_db(self.db_path)
         return set(self._get_json_db(self.db_path))
 
+    def get_refresh_deadlines(self):
+        """Return the times of the next timer refresh of the repos by repo id."""
+        if not os.path.isfile(self.refresh_path):
+            return {}
+        deadlines = self._get_json_db(self.refresh_path, {})
+        if not isinstance(deadlines, dict):
+            return {}
+        return deadlines
+
     def save(self):
-        self._check_json_db(self.db_path)
-        self._write_json_db(self.db_path, list(self.expired_to_add))
+        with self._locked(self.db_path):
+            if self.get_expired_repos() != self.expired_to_add:
+                self._write_json_db(self.db_path, list(self.expired_to_add))
+        if self.refresh_to_set:
+            try:
+                with self._locked(self.refresh_path):
+                    deadlines = self.get_refresh_deadlines()
+                    deadlines.update(self.refresh_to_set)
+                    self._write_json_db(self.refresh_path, deadlines)
+            except (IOError, OSError):
+                logger.info(_("Failed storing the metadata refresh schedule."))
         if self.reset_last_makecache:
             try:
                 dnf.util.touch(self._last_makecache_path)
@@ -107,27 +144,72 @@ class RepoPersistor(JSONDB):
 
 
 class TempfilePersistor(JSONDB):
+    """Packages kept in the cache until the next successful transaction.
+
+    New entries are appended to a journal, one JSON string per line, which is
+    merged into the JSON list only once it outgrows it. A save therefore costs
+    the number of added entries, not the number of all stored ones.
+
+    """
+
+    # merge the journal earlier than this only if it exceeds the list
+    JOURNAL_MIN_SIZE = 64 * 1024
 
     def __init__(self, cachedir):
         self.db_path = os.path.join(cachedir, "tempfiles.json")
+        self.journal_path = os.path.join(cachedir, "tempfiles.journal")
         self.tempfiles_to_add = set()
         self._empty = False
 
+    def _get_journal(self):
+        entries = []
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # the tail of an interrupted append
+                        continue
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                raise
+        return entries
+
+    def _append_journal(self, entries):
+        with open(self.journal_path, 'a') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _journal_too_big(self):
+        try:
+            journal_size = os.path.getsize(self.journal_path)
+        except OSError:
+            return False
+        return journal_size > max(self.JOURNAL_MIN_SIZE,
+                                  os.path.getsize(self.db_path))
+
     def get_saved_tempfiles(self):
         self._check_json_db(self.db_path)
-        return self._get_json_db(self.db_path)
+        data = set(self._get_json_db(self.db_path))
+        data.update(self._get_journal())
+        return list(data)
 
     def save(self):
         if not self._empty and not self.tempfiles_to_add:
             return
         self._check_json_db(self.db_path)
-        if self._empty:
-            self._write_json_db(self.db_path, [])
-            return
-        if self.tempfiles_to_add:
-            data = set(self._get_json_db(self.db_path))
-            data.update(self.tempfiles_to_add)
-            self._write_json_db(self.db_path, list(data))
+        with self._locked(self.db_path):
+            if self._empty:
+                self._write_json_db(self.db_path, [])
+                unlink_f(self.journal_path)
+                return
+            self._append_journal(sorted(self.tempfiles_to_add))
+            if self._journal_too_big():
+                self._write_json_db(self.db_path, self.get_saved_tempfiles())
+                unlink_f(self.journal_path)
 
     def empty(self):
         self._empty = True
@@ -26,6 +26,7 @@ import fnmatch
 import glob
 import importlib
 import inspect
+import json
 import logging
 import operator
 import os
@@ -33,6 +34,7 @@ import sys
 import traceback
 
 import libdnf
+import dnf.const
 import dnf.logging
 import dnf.pycomp
 import dnf.util
@@ -41,6 +43,9 @@ from dnf.i18n import _
 logger = logging.getLogger('dnf')
 
 DYNAMIC_PACKAGE = 'dnf.plugin.dynamic'
+HOOKS = ('pre_config', 'config', 'resolved', 'sack', 'pre_transaction',
+         'transaction')
+_MANIFEST_VERSION = 1
 
 
 class Plugin(object):
@@ -101,7 +106,13 @@ class Plugins(object):
     def _caller(self, method):
         for plugin in self.plugins:
             try:
-                getattr(plugin, method)()
+                if isinstance(plugin, _LazyPlugin):
+                    hook = plugin._hook(method)
+                    if hook is None:
+                        continue
+                else:
+                    hook = getattr(plugin, method)
+                hook()
             except dnf.exceptions.Error:
                 raise
             except Exception:
@@ -109,6 +120,14 @@ class Plugins(object):
                 except_list = traceback.format_exception(exc_type, exc_value, exc_traceback)
                 logger.critical(''.join(except_list))
 
+    @staticmethod
+    def _disabled(plug_cls, conf):
+        parser = plug_cls.read_config(conf)
+        # has it enabled = False?
+        return (parser.has_section('main')
+                and parser.has_option('main', 'enabled')
+                and not parser.getboolean('main', 'enabled'))
+
     def _check_enabled(self, conf, enable_plugins):
         """Checks whether plugins are enabled or disabled in configuration files
            and removes disabled plugins from list"""
@@ -116,16 +135,17 @@ class Plugins(object):
             name = plug_cls.name
             if any(fnmatch.fnmatch(name, pattern) for pattern in enable_plugins):
                 continue
-            parser = plug_cls.read_config(conf)
-            # has it enabled = False?
-            disabled = (parser.has_section('main')
-                        and parser.has_option('main', 'enabled')
-                        and not parser.getboolean('main', 'enabled'))
-            if disabled:
+            if self._disabled(plug_cls, conf):
                 self.plugin_cls.remove(plug_cls)
 
-    def _load(self, conf, skips, enable_plugins):
-        """Dynamically load relevant plugin modules."""
+    def _load(self, conf, skips, enable_plugins, manifest_path=None):
+        """Dynamically load relevant plugin modules.
+
+        With manifest_path set, what was learned about the plugin files is
+        stored there. Plugins which only implement hooks are then not imported
+        until one of their hooks is run.
+
+        """
 
         if DYNAMIC_PACKAGE in sys.modules:
             raise RuntimeError("load_plugins() called twice")
@@ -133,13 +153,64 @@ class Plugins(object):
         package.__path__ = []
 
         files = _get_plugins_files(conf.pluginpath, skips, enable_plugins)
-        _import_modules(package, files)
-        self.plugin_cls = _plugin_classes()[:]
-        self._check_enabled(conf, enable_plugins)
+        if manifest_path is None:
+            _import_modules(package, files)
+            self.plugin_cls = _plugin_classes()[:]
+            self._check_enabled(conf, enable_plugins)
+        else:
+            self._load_with_manifest(package, files, conf, enable_plugins,
+                                     manifest_path)
         if len(self.plugin_cls) > 0:
             names = sorted(plugin.name for plugin in self.plugin_cls)
             logger.debug(_('Loaded plugins: %s'), ', '.join(names))
 
+    def _load_with_manifest(self, package, files, conf, enable_plugins,
+                            manifest_path):
+        key = {'version': dnf.const.VERSION,
+               'pluginconfpath': list(conf.pluginconfpath)}
+        manifest = _read_manifest(manifest_path, key)
+        entries = {}
+        imported = []
+        for fn in files:
+            entry = manifest.get(fn)
+            if entry is not None and _manifest_entry_valid(fn, entry) \
+                    and all(plugin['lazy'] for plugin in entry['plugins']):
+                entries[fn] = entry
+            else:
+                imported.append(fn)
+        _import_modules(package, imported)
+
+        modules = dict((_module_name(package, fn), fn) for fn in files)
+        order = dict((fn, i) for i, fn in enumerate(files))
+        classes = {}
+        for plug_cls in _plugin_classes():
+            fn = modules.get(plug_cls.__module__)
+            if fn is not None and fn not in imported:
+                # left over from an earlier load
+                continue
+            classes.setdefault(fn, []).append(plug_cls)
+        for fn in imported:
+            if _module_name(package, fn) not in sys.modules:
+                # failed to import, try again next time
+                continue
+            entries[fn] = _manifest_entry(fn, classes.get(fn, []), conf,
+                                          self._disabled)
+
+        # outside of plugin files defined classes go first, as they would
+        self.plugin_cls = classes.pop(None, [])
+        for fn in sorted(set(entries) | set(classes), key=order.get):
+            if fn not in classes:
+                package.__path__.append(os.path.dirname(fn))
+                self.plugin_cls.extend(
+                    _LazyPluginClass(_module_name(package, fn), fn, plugin)
+                    for plugin in entries[fn]['plugins'])
+            else:
+                self.plugin_cls.extend(classes[fn])
+        self._check_enabled(conf, enable_plugins)
+
+        if entries != manifest:
+            _write_manifest(manifest_path, key, entries)
+
     def _run_pre_config(self):
         self._caller('pre_config')
 
@@ -179,10 +250,165 @@ class Plugins(object):
             if pkg.name in transaction_diff:
                 files_erased.update(pkg.files)
         for plugin in self.plugins[:]:
-            if inspect.getfile(plugin.__class__) in files_erased:
+            if isinstance(plugin, _LazyPlugin):
+                filename = plugin._filename
+            else:
+                filename = inspect.getfile(plugin.__class__)
+            if filename in files_erased:
                 self.plugins.remove(plugin)
 
 
+class _LazyPluginClass(object):
+    """Stands in for a plugin class known from the manifest."""
+
+    def __init__(self, module, filename, entry):
+        self.name = entry['name']
+        self.config_name = entry['config_name']
+        self._module = module
+        self._filename = filename
+        self._entry = entry
+
+    def __call__(self, base, cli):
+        return _LazyPlugin(self, base, cli)
+
+    def read_config(self, conf):
+        if not self._entry['enabled']:
+            # the manifest entry is only valid while the config is unchanged
+            return _DISABLED_CONFIG
+        return _ENABLED_CONFIG
+
+    def _import(self):
+        module = importlib.import_module(self._module)
+        return getattr(module, self._entry['class'])
+
+
+class _LazyPlugin(object):
+    """Imports and instantiates the plugin on the first hook it implements."""
+
+    def __init__(self, plug_cls, base, cli):
+        self.name = plug_cls.name
+        self.base = base
+        self.cli = cli
+        self._plug_cls = plug_cls
+        self._filename = plug_cls._filename
+        self._plugin = None
+
+    def _hook(self, method):
+        if method not in self._plug_cls._entry['hooks']:
+            return None
+        if self._plugin is None:
+            try:
+                cls = self._plug_cls._import()
+            except Exception as e:
+                logger.error(_('Failed loading plugin "%s": %s'), self.name, e)
+                logger.log(dnf.logging.SUBDEBUG, '', exc_info=True)
+                self._plug_cls._entry = dict(self._plug_cls._entry, hooks=[])
+                return None
+            self._plugin = cls(self.base, self.cli)
+        return getattr(self._plugin, method)
+
+
+class _ManifestConfig(object):
+    """Answers the enabled check of Plugins._check_enabled()."""
+
+    def __init__(self, enabled):
+        self._enabled = enabled
+
+    def has_section(self, section):
+        return section == 'main'
+
+    def has_option(self, section, option):
+        return option == 'enabled'
+
+    def getboolean(self, section, option):
+        return self._enabled
+
+
+_ENABLED_CONFIG = _ManifestConfig(True)
+_DISABLED_CONFIG = _ManifestConfig(False)
+
+
+def _overrides(cls, attr):
+    for klass in inspect.getmro(cls):
+        if attr in vars(klass):
+            return klass is not Plugin
+    return False
+
+
+def _file_stamp(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return [st.st_ino, st.st_size, st.st_mtime]
+
+
+def _config_files(plug_cls, conf):
+    name = plug_cls.config_name if plug_cls.config_name else plug_cls.name
+    return ['%s/%s.conf' % (path, name) for path in conf.pluginconfpath]
+
+
+def _manifest_entry(filename, classes, conf, disabled):
+    plugins = []
+    for plug_cls in classes:
+        # a custom __init__ or read_config may do anything, keep importing
+        # those plugins right away
+        lazy = not (_overrides(plug_cls, '__init__')
+                    or _overrides(plug_cls, 'read_config'))
+        config_files = _config_files(plug_cls, conf)
+        enabled = True
+        if lazy:
+            try:
+                enabled = not disabled(plug_cls, conf)
+            except dnf.exceptions.ConfigError:
+                lazy = False
+        plugins.append({
+            'class': plug_cls.__name__,
+            'name': plug_cls.name,
+            'config_name': plug_cls.config_name,
+            'hooks': [hook for hook in HOOKS if _overrides(plug_cls, hook)],
+            'lazy': lazy,
+            'enabled': enabled,
+            'configs': [[fn, _file_stamp(fn)] for fn in config_files],
+        })
+    return {'stamp': _file_stamp(filename), 'plugins': plugins}
+
+
+def _manifest_entry_valid(filename, entry):
+    if entry['stamp'] is None or entry['stamp'] != _file_stamp(filename):
+        return False
+    return all(_file_stamp(fn) == stamp
+               for plugin in entry['plugins']
+               for fn, stamp in plugin['configs'])
+
+
+def _read_manifest(path, key):
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) \
+            or manifest.get('manifest') != _MANIFEST_VERSION \
+            or manifest.get('key') != key:
+        return {}
+    return manifest['files']
+
+
+def _write_manifest(path, key, entries):
+    manifest = {'manifest': _MANIFEST_VERSION, 'key': key, 'files': entries}
+    try:
+        with dnf.util._atomic_write(path) as f:
+            json.dump(manifest, f)
+    except (IOError, OSError) as e:
+        logger.debug('Cannot write plugin manifest %s: %s', path, e)
+
+
+def _module_name(package, filename):
+    module = os.path.splitext(os.path.basename(filename))[0]
+    return '%s.%s' % (package.__name__, module)
+
+
 def _plugin_classes():
     return Plugin.__subclasses__()
 
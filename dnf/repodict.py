@@ -22,16 +22,79 @@ from __future__ import unicode_literals
 from dnf.exceptions import ConfigError
 from dnf.i18n import _
 
+import bisect
 import dnf.util
 import libdnf.conf
 import fnmatch
+import itertools
 import os
+import re
 
 logger = dnf.util.logger
 
+_GLOB_CHARS = re.compile(r'[*?[]')
+
 
 class RepoDict(dict):
     # :api
+    def __init__(self, *args, **kwargs):
+        super(RepoDict, self).__init__(*args, **kwargs)
+        # sorted repo ids for glob lookups and the insertion order of the repos,
+        # both kept up to date by the mutating methods below
+        self._sorted_ids = None
+        self._seq = dict((k, i) for i, k in enumerate(dict.keys(self)))
+        self._counter = itertools.count(len(self._seq))
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._seq[key] = next(self._counter)
+            self._sorted_ids = None
+        super(RepoDict, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super(RepoDict, self).__delitem__(key)
+        del self._seq[key]
+        self._sorted_ids = None
+
+    def pop(self, key, *args):
+        if key in self:
+            self._seq.pop(key)
+            self._sorted_ids = None
+        return super(RepoDict, self).pop(key, *args)
+
+    def popitem(self):
+        item = super(RepoDict, self).popitem()
+        del self._seq[item[0]]
+        self._sorted_ids = None
+        return item
+
+    def clear(self):
+        super(RepoDict, self).clear()
+        self._seq.clear()
+        self._sorted_ids = None
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def _ids_matching(self, pattern):
+        """Return ids of the repos matching a glob pattern."""
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(dict.keys(self))
+        ids = self._sorted_ids
+        # only ids starting with the literal prefix of the pattern can match
+        prefix = pattern[:_GLOB_CHARS.search(pattern).start()]
+        if prefix:
+            ids = ids[bisect.bisect_left(ids, prefix):]
+            ids = itertools.takewhile(lambda k: k.startswith(prefix), ids)
+        match = re.compile(fnmatch.translate(pattern)).match
+        return [k for k in ids if match(k)]
+
     def add(self, repo):
         # :api
         id_ = repo.id
@@ -52,11 +115,12 @@ class RepoDict(dict):
         return not dnf.util.empty(self.iter_enabled())
 
     def _enable_sub_repos(self, sub_name_fn):
-        for repo in self.iter_enabled():
-            for found in self.get_matching(sub_name_fn(repo.id)):
-                if not found.enabled:
-                    logger.info(_('enabling %s repository'), found.id)
-                    found.enable()
+        for repo in list(self.iter_enabled()):
+            # repo ids never contain glob characters, look the sibling up directly
+            found = dict.get(self, sub_name_fn(repo.id))
+            if found is not None and not found.enabled:
+                logger.info(_('enabling %s repository'), found.id)
+                found.enable()
 
     def add_new_repo(self, repoid, conf, baseurl=(), **kwargs):
         # :api
@@ -117,7 +181,9 @@ class RepoDict(dict):
     def get_matching(self, key):
         # :api
         if dnf.util.is_glob_pattern(key):
-            l = [self[k] for k in self if fnmatch.fnmatch(k, key)]
+            l = [self[k] for k in self._ids_matching(key)]
+            # in the order the repos were added, like iterating over the dict
+            l.sort(key=lambda r: self._seq[r.id])
             return dnf.util.MultiCallList(l)
         repo = self.get(key, None)
         if repo is None:
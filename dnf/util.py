@@ -29,13 +29,16 @@ import dnf
 import dnf.callback
 import dnf.const
 import dnf.pycomp
+import contextlib
 import errno
+import hashlib
 import itertools
 import locale
 import logging
 import os
 import pwd
 import shutil
+import socket
 import subprocess
 import sys
 import tempfile
@@ -142,6 +145,34 @@ def ensure_dir(dname):
         if e.errno != errno.EEXIST or not os.path.isdir(dname):
             raise e
 
+@contextlib.contextmanager
+def _atomic_write(path, mode=0o644, fsync=False):
+    """Yield a text file which replaces `path` once the block completes.
+
+    The file is created next to `path` under a unique name and renamed over it,
+    so readers see the old or the new content and concurrent writers do not
+    clobber each other's temporary file. On failure the temporary file is
+    removed and the exception is propagated.
+
+    """
+    dirname = os.path.dirname(path)
+    ensure_dir(dirname)
+    fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.%s.' % os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp, mode)
+        os.rename(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
 def empty(iterable):
     try:
         l = len(iterable)
@@ -254,6 +285,41 @@ def normalize_time(timestamp):
             t = t.decode(current_locale_setting)
     return t
 
+def _rpmdb_stamp(installroot):
+    """Return what changes whenever the rpmdb of the installroot does."""
+    dbpath = os.path.realpath(os.path.join(installroot, 'var/lib/rpm'))
+    try:
+        names = os.listdir(dbpath)
+    except OSError:
+        return None
+    stamp = []
+    for name in sorted(names):
+        try:
+            st = os.stat(os.path.join(dbpath, name))
+        except OSError:
+            continue
+        stamp.append([name, st.st_size, st.st_mtime])
+    return stamp
+
+
+def _host_offset(key, period):
+    """Return a number of seconds in [0, period) derived from key and the host.
+
+    The offset stays the same on one machine between runs but differs among
+    machines, it spreads periodic work of many hosts over the period.
+
+    """
+    try:
+        with open('/etc/machine-id') as f:
+            host = f.read().strip()
+    except (IOError, OSError):
+        host = ''
+    if not host:
+        host = socket.gethostname()
+    digest = hashlib.sha256(('%s:%s' % (host, key)).encode('utf-8')).hexdigest()
+    return int(digest[:12], 16) % max(int(period), 1)
+
+
 def on_ac_power():
     """Decide whether we are on line power.
 
@@ -34,6 +34,8 @@ import errno
 import glob
 import hashlib
 import io
+import multiprocessing
+import multiprocessing.pool
 import os
 import os.path
 import pwd
@@ -43,6 +45,8 @@ import tempfile
 
 _available_checksums = set(['md5', 'sha1', 'sha256', 'sha384', 'sha512'])
 _default_checksums = ['sha256']
+# hashlib releases the GIL for large updates, big reads keep it released longer
+_CHUNK = 2**20
 
 
 _re_compiled_glob_match = None
@@ -107,9 +111,9 @@ class Checksums(object):
     length = property(fget=lambda self: self._len)
 
     def update(self, data):
+        data = data.encode('utf-8') if isinstance(data, unicode) else data
         self._len += len(data)
         for sumalgo in self._sumalgos:
-            data = data.encode('utf-8') if isinstance(data, unicode) else data
             sumalgo.update(data)
 
     def read(self, fo, size=2**16):
@@ -117,6 +121,31 @@ class Checksums(object):
         self.update(data)
         return data
 
+    def update_from_file(self, fo, size=_CHUNK, datasize=None):
+        """Feed the whole content of a binary file object to all checksums.
+
+        Data are read into one reused buffer, which every hash object gets
+        without a copy. Reading stops once more than datasize bytes were read.
+
+        """
+        if not hasattr(fo, 'readinto'):
+            while self.read(fo, size):
+                if datasize is not None and self._len > datasize:
+                    break
+            return
+        buf = bytearray(size)
+        view = memoryview(buf)
+        while True:
+            count = fo.readinto(buf)
+            if not count:
+                break
+            data = view[:count] if count < size else view
+            self._len += count
+            for sumalgo in self._sumalgos:
+                sumalgo.update(data)
+            if datasize is not None and self._len > datasize:
+                break
+
     def hexdigests(self):
         ret = {}
         for sumtype, sumdata in zip(self._sumtypes, self._sumalgos):
@@ -147,20 +176,45 @@ class Checksums(object):
             checksum = 'sha1'
         return self.digests()[checksum]
 
+def checksum_files(jobs, workers=None):
+    """Compute checksum(sumtype, file, datasize=datasize) for every
+       (sumtype, file, datasize) tuple in jobs, several files at a time.
+
+       Results are returned in the order of jobs, a failed job gives its
+       MiscError in place of the checksum."""
+
+    def _checksum(job):
+        sumtype, file, datasize = job
+        try:
+            return checksum(sumtype, file, datasize=datasize)
+        except MiscError as e:
+            return e
+
+    jobs = list(jobs)
+    if workers is None:
+        workers = min(len(jobs), multiprocessing.cpu_count())
+    if workers <= 1:
+        return [_checksum(job) for job in jobs]
+    pool = multiprocessing.pool.ThreadPool(workers)
+    try:
+        return pool.map(_checksum, jobs)
+    finally:
+        pool.close()
+        pool.join()
+
 def get_default_chksum_type():
     return _default_checksums[0]
 
-def checksum(sumtype, file, CHUNK=2**16, datasize=None):
+def checksum(sumtype, file, CHUNK=_CHUNK, datasize=None):
     """takes filename, hand back Checksum of it
        sumtype = md5 or sha/sha1/sha256/sha512 (note sha == sha1)
        filename = /path/to/file
-       CHUNK=65536 by default"""
-
-    # chunking brazenly lifted from Ryan Tomayko
+       CHUNK=1048576 by default"""
 
     if isinstance(file, basestring):
         try:
-            with open(file, 'rb', CHUNK) as fo:
+            # unbuffered, the data are read straight into the checksum buffer
+            with open(file, 'rb', 0) as fo:
                 return checksum(sumtype, fo, CHUNK, datasize)
         except (IOError, OSError):
             raise MiscError('Error opening file for checksum: %s' % file)
@@ -168,9 +222,7 @@ def checksum(sumtype, file, CHUNK=2**16, datasize=None):
     try:
         # assumes file is a file-like-object
         data = Checksums([sumtype])
-        while data.read(file, CHUNK):
-            if datasize is not None and data.length > datasize:
-                break
+        data.update_from_file(file, CHUNK, datasize)
 
         # This screws up the length, but that shouldn't matter. We only care
         # if this checksum == what we expect.
@@ -24,10 +24,14 @@ import dnf.callback
 import dnf.transaction
 import dnf.util
 import rpm
+import collections
+import errno
+import fcntl
 import os
 import logging
+import select
 import sys
-import tempfile
+import threading
 import traceback
 import warnings
 
@@ -49,6 +53,115 @@ TS_REMOVE_STATES = [TS_ERASE, TS_OBSOLETED, TS_UPDATED]
 logger = logging.getLogger('dnf')
 
 
+class _OutputReader(object):
+    """Drain a pipe into a bounded buffer.
+
+    A thread keeps reading the pipe so that scriptlets never block on a full
+    pipe, the output is kept in memory until collected by read(). When more
+    than `limit` bytes pile up, the oldest data are dropped.
+
+    rpm holds its own copies of the write end, the end of the input can not be
+    relied on to stop the thread. close() wakes it up through a second pipe and
+    waits for it, the read end is only ever closed by the thread itself.
+
+    """
+
+    def __init__(self, fd, limit=1024 * 1024):
+        self._fd = fd
+        self._limit = limit
+        self._chunks = collections.deque()
+        self._size = 0
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._wake_r, self._wake_w = os.pipe()
+        flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+        fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _drain(self):
+        # called with the lock held, returns False at the end of the input
+        if self._fd is None:
+            return False
+        while True:
+            try:
+                chunk = os.read(self._fd, 65536)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                    return True
+                raise
+            if not chunk:
+                return False
+            self._chunks.append(chunk)
+            self._size += len(chunk)
+            while self._size > self._limit:
+                excess = self._size - self._limit
+                oldest = self._chunks.popleft()
+                if len(oldest) > excess:
+                    # keep the tail of the oldest chunk
+                    self._chunks.appendleft(oldest[excess:])
+                    dropped = excess
+                else:
+                    dropped = len(oldest)
+                self._size -= dropped
+                self._dropped += dropped
+
+    def _run(self):
+        try:
+            while True:
+                try:
+                    ready = select.select([self._fd, self._wake_r], [], [])[0]
+                except (OSError, select.error) as e:
+                    if e.args and e.args[0] == errno.EINTR:
+                        continue
+                    return
+                with self._lock:
+                    try:
+                        if not self._drain():
+                            return
+                    except OSError:
+                        return
+                if self._wake_r in ready:
+                    return
+        finally:
+            with self._lock:
+                os.close(self._fd)
+                self._fd = None
+            os.close(self._wake_r)
+
+    def read(self):
+        """Return all the output gathered since the last call or None."""
+        with self._lock:
+            try:
+                # whatever was written before the call is included
+                self._drain()
+            except OSError:
+                pass
+            if not self._chunks:
+                return None
+            out = b''.join(self._chunks)
+            if self._dropped:
+                out = (b'[%d bytes of output dropped]\n' % self._dropped) + out
+            self._chunks.clear()
+            self._size = 0
+            self._dropped = 0
+            return out
+
+    def close(self):
+        """Stop the thread and wait for it, the output read so far is kept."""
+        if self._wake_w is None:
+            return
+        try:
+            os.write(self._wake_w, b'\0')
+        except OSError:
+            # the thread has already seen the end of the input
+            pass
+        self._thread.join()
+        os.close(self._wake_w)
+        self._wake_w = None
+
+
 def _add_deprecated_action(name):
     """
     Wrapper to return a deprecated action constant
@@ -101,7 +214,12 @@ class TransactionDisplay(object):
         pass
 
     def scriptout(self, msgs):
-        """msgs is the messages that were output (if any)."""
+        """msgs is the messages that were output (if any).
+
+        The output is gathered in the background and handed over after a
+        package was processed or a scriptlet finished, not as it is written.
+
+        """
         pass
 
     def error(self, message):
@@ -169,10 +287,10 @@ class RPMTransaction(object):
         self._tsi_cache = None
 
     def _setupOutputLogging(self, rpmverbosity="info"):
-        # UGLY... set up the transaction to record output from scriptlets
-        io_r = tempfile.NamedTemporaryFile()
-        self._readpipe = io_r
-        self._writepipe = open(io_r.name, 'w+b')
+        # set up the transaction to record output from scriptlets
+        read_fd, write_fd = os.pipe()
+        self._readpipe = _OutputReader(read_fd)
+        self._writepipe = os.fdopen(write_fd, 'wb')
         self.base._ts.setScriptFd(self._writepipe)
         rpmverbosity = {'critical' : 'crit',
                         'emergency' : 'emerg',
@@ -187,28 +305,19 @@ class RPMTransaction(object):
 
     def _shutdownOutputLogging(self):
         # reset rpm bits from reording output
+        if self._writepipe is None:
+            return
         rpm.setVerbosity(rpm.RPMLOG_NOTICE)
         rpm.setLogFile(sys.stderr)
         try:
             self._writepipe.close()
         except:
             pass
+        self._writepipe = None
+        self._readpipe.close()
 
     def _scriptOutput(self):
-        try:
-            # XXX ugly workaround of problem which started after upgrading glibc
-            # from glibc-2.27-32.fc28.x86_64 to glibc-2.28-9.fc29.x86_64
-            # After this upgrade nothing is read from _readpipe, so every
-            # posttrans and postun scriptlet output is lost. The problem
-            # only occurs when using dnf-2, dnf-3 is OK.
-            # I did not find the root cause of this error yet.
-            self._readpipe.seek(self._readpipe.tell())
-            out = self._readpipe.read()
-            if not out:
-                return None
-            return out
-        except IOError:
-            pass
+        return self._readpipe.read()
 
     def _scriptout(self):
         msgs = self._scriptOutput()
@@ -217,6 +326,8 @@ class RPMTransaction(object):
         self.base.history.log_scriptlet_output(msgs)
 
     def __del__(self):
+        # Base shuts the output logging down once rpm is done with the
+        # transaction, this is only a fallback for other users
         self._shutdownOutputLogging()
 
     def _extract_cbkey(self, cbkey):
@@ -23,6 +23,7 @@ from __future__ import unicode_literals
 import dnf.automatic.main
 
 import tests.support
+from tests.support import mock
 
 
 FILE = tests.support.resource_path('etc/automatic.conf')
@@ -49,3 +50,58 @@ class TestConfig(tests.support.TestCase):
         conf = dnf.automatic.main.AutomaticConfig(FILE, downloadupdates=True, installupdates=False)
         self.assertTrue(conf.commands.download_updates)
         self.assertFalse(conf.commands.apply_updates)
+
+
+class TestRefreshSack(tests.support.TestCase):
+    def setUp(self):
+        self.base = mock.Mock()
+        self.repo = mock.Mock(id='r1')
+        self.repo._metadata_expire_in.return_value = (True, 100)
+        self.base.repos.iter_enabled.return_value = [self.repo]
+        patcher = mock.patch('dnf.automatic.main._rpmdb_stamp', return_value=['db'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('dnf.lock.build_metadata_lock')
+        self.lock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unchanged(self):
+        self.assertEqual(dnf.automatic.main._refresh_sack(self.base, ['db']), ['db'])
+        self.base.fill_sack.assert_not_called()
+        self.repo.load.assert_not_called()
+
+    def test_rpmdb_changed(self):
+        dnf.automatic.main._refresh_sack(self.base, ['old'])
+        self.base.fill_sack.assert_called_once_with()
+
+    def test_repo_expired(self):
+        self.repo._metadata_expire_in.return_value = (True, -1)
+        self.repo.load.return_value = False
+        dnf.automatic.main._refresh_sack(self.base, ['db'])
+        self.repo.load.assert_called_once_with()
+        self.base.fill_sack.assert_not_called()
+
+        self.repo.load.return_value = True
+        dnf.automatic.main._refresh_sack(self.base, ['db'])
+        self.base.fill_sack.assert_called_once_with()
+
+    def test_metadata_lock(self):
+        self.repo._metadata_expire_in.return_value = (True, -1)
+        self.repo.load.side_effect = lambda: self.lock.return_value.__enter__.called
+        dnf.automatic.main._refresh_sack(self.base, ['db'])
+        self.lock.assert_called_once_with(self.base.conf.cachedir, self.base.conf.exit_on_lock)
+        self.assertTrue(self.base.fill_sack.called)
+
+
+class TestRunDaemon(tests.support.TestCase):
+    @mock.patch('time.sleep', side_effect=[None, KeyboardInterrupt])
+    @mock.patch('dnf.automatic.main._check_updates')
+    @mock.patch('dnf.automatic.main._refresh_sack', side_effect=[OSError('disk'), None])
+    def test_survives_unexpected_error(self, refresh, check, _sleep):
+        base = mock.Mock()
+        conf = mock.Mock()
+        with mock.patch('dnf.automatic.main.logger'):
+            self.assertRaises(KeyboardInterrupt, dnf.automatic.main._run_daemon, base, conf)
+        self.assertEqual(refresh.call_count, 2)
+        check.assert_called_once_with(base, conf)
+        base.reset.assert_called_once_with(sack=True, goal=True)
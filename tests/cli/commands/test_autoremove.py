@@ -19,9 +19,13 @@
 
 from __future__ import absolute_import
 
+import json
+import os
+
 import libdnf.transaction
 
 import dnf.cli.commands.autoremove as autoremove
+import dnf.const
 from dnf.cli.option_parser import OptionParser
 
 import tests.support
@@ -52,3 +56,27 @@ class AutoRemoveCommandTest(tests.support.ResultTestCase):
                    'librita-1-1.x86_64',
                    'pepper-20-0.x86_64')
         self.assertCountEqual((map(str, pkgs)), removed)
+
+    def test_unneeded_cached(self):
+        path = os.path.join(self.base.conf.cachedir, dnf.const.UNNEEDED_CACHE)
+        q = self.base.sack.query()
+        unneeded = self.base._unneeded(q)
+        with open(path) as f:
+            data = json.load(f)
+        self.assertEqual(data['key'], self.base._unneeded_key())
+        self.assertCountEqual(data['nevras'], map(str, unneeded))
+
+        data['nevras'] = ['pepper-20-0.x86_64']
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        self.assertEqual([str(pkg) for pkg in self.base._unneeded(q)],
+                         ['pepper-20-0.x86_64'])
+
+        data['key'] = ['0:0', None]
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        self.assertCountEqual(self.base._unneeded(q), unneeded)
+
+        key = self.base._unneeded_key()
+        self.base.conf.installonly_limit += 1
+        self.assertNotEqual(self.base._unneeded_key(), key)
@@ -71,6 +71,11 @@ class GroupCommandTest(tests.support.DnfBaseTestCase):
         self.assertLength(env_avail, 1)
         self.assertEqual(env_avail[0].name, 'Sugar Desktop Environment')
 
+    def test_group_lists_multiple_patterns(self):
+        installed, available = self.cmd._group_lists(False, ['somerset', 'Peppers'])
+        self.assertEmpty(installed)
+        self.assertCountEqual([g.id for g in available], ['somerset', 'Peppers'])
+
     def test_configure(self):
         tests.support.command_configure(self.cmd, ['remove', 'crack'])
         demands = self.cmd.cli.demands
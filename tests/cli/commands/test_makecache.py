@@ -56,8 +56,10 @@ class MakeCacheCommandTest(tests.support.DnfBaseTestCase):
         self.assert_last_info(logger, u'Metadata timer caching disabled.')
 
         self.base.conf.metadata_timer_sync = 5  # resync after 5 seconds
-        self.base._repo_persistor.since_last_makecache = mock.Mock(return_value=3)
-        self.assertFalse(self._do_makecache(cmd))
+        self.base._repo_persistor.refresh_deadlines = {'main': 1003}
+        with mock.patch('dnf.repo.Repo._metadata_expire_in', return_value=(True, 100)), \
+                mock.patch('dnf.base.time.time', return_value=1000):
+            self.assertFalse(self._do_makecache(cmd))
         self.assert_last_info(logger, u'Metadata cache refreshed recently.')
 
     @mock.patch('dnf.base.logger',
@@ -78,3 +80,66 @@ class MakeCacheCommandTest(tests.support.DnfBaseTestCase):
         cmd = makecache.MakeCacheCommand(self.cli)
         self.base.conf.metadata_timer_sync = 5
         self.assertTrue(self._do_makecache(cmd))
+
+
+class TimerScheduleTest(tests.support.DnfBaseTestCase):
+
+    REPOS = ['main', 'third_party', 'updates']
+
+    def setUp(self):
+        super(TimerScheduleTest, self).setUp()
+        self.persistor = self.base._repo_persistor
+        self.expiry = dict((r, (True, 100)) for r in self.REPOS)
+
+    def _due(self, now, max_repos=None):
+        with mock.patch('dnf.base.time.time', return_value=now):
+            repos = self.base._timer_due_repos(3600, self.expiry, max_repos)
+        return [r.id for r in repos]
+
+    def test_first_run_staggered(self):
+        self.assertEqual(self._due(1000), [])
+        deadlines = self.persistor.refresh_to_set
+        self.assertCountEqual(deadlines, self.REPOS)
+        for deadline in deadlines.values():
+            self.assertGreaterEqual(deadline, 1000)
+            self.assertLess(deadline, 4600)
+        # the offsets are stable between runs on the same host
+        first = dict(deadlines)
+        self.persistor.refresh_to_set = {}
+        self._due(1000)
+        self.assertEqual(self.persistor.refresh_to_set, first)
+
+    def test_due_repos(self):
+        self.persistor.refresh_deadlines = {
+            'main': 900, 'third_party': 2000, 'updates': 500}
+        self.assertEqual(self._due(1000), ['updates', 'main'])
+        # moved only once the refresh succeeded
+        self.assertEqual(self.persistor.refresh_to_set, {})
+
+    def test_max_repos(self):
+        self.persistor.refresh_deadlines = {
+            'main': 900, 'third_party': 2000, 'updates': 500}
+        self.assertEqual(self._due(1000, max_repos=1), ['updates'])
+
+    def test_missing_cache_due(self):
+        self.persistor.refresh_deadlines = {
+            'main': 9000, 'third_party': 9000, 'updates': 9000}
+        self.expiry['third_party'] = (False, 0)
+        self.assertEqual(self._due(1000, max_repos=1), ['third_party'])
+
+    @mock.patch('dnf.util.on_ac_power', return_value=True)
+    @mock.patch('dnf.util.on_metered_connection', return_value=False)
+    def test_failed_repo_stays_due(self, _metered, _on_ac_power):
+        self.base.conf.metadata_timer_sync = 3600
+        self.persistor.refresh_deadlines = {
+            'main': 900, 'third_party': 2000, 'updates': 500}
+
+        def fill_sack(*args, **kwargs):
+            # as if updates failed and was skipped as unavailable
+            self.base.repos['updates'].disable()
+
+        with mock.patch('dnf.repo.Repo._metadata_expire_in', return_value=(True, 100)), \
+                mock.patch('dnf.base.time.time', return_value=1000), \
+                mock.patch('dnf.Base.fill_sack', side_effect=fill_sack):
+            self.assertTrue(self.base.update_cache(timer=True))
+        self.assertEqual(self.persistor.refresh_to_set, {'main': 4600})
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import dnf.cli.commands.mark as mark
+import libdnf.transaction
+
+import tests.support
+from tests.support import mock
+
+
+class MarkCommandTest(tests.support.DnfBaseTestCase):
+
+    REPOS = []
+    CLI = "mock"
+
+    def setUp(self):
+        super(MarkCommandTest, self).setUp()
+        self.cmd = mark.MarkCommand(self.cli)
+
+    def test_resolve(self):
+        pkgs, notfound = self.cmd._resolve(['pepper', 'librita.i686', 'hol*', 'nope'])
+        self.assertCountEqual([str(pkg) for pkg in pkgs],
+                              ['pepper-20-0.x86_64', 'librita-1-1.i686', 'hole-1-1.x86_64'])
+        self.assertEqual(notfound, ['nope'])
+
+    def test_mark(self):
+        pkgs = self.sack.query().installed().filter(name=['pepper', 'tour']).run()
+        with mock.patch.object(self.history, 'set_reasons') as set_reasons:
+            self.cmd._mark('install', pkgs)
+        set_reasons.assert_called_once_with(
+            pkgs, libdnf.transaction.TransactionItemReason_USER)
@@ -51,6 +51,16 @@ class SearchCountedTest(tests.support.DnfBaseTestCase):
         self.cmd._search_counted(counter, 'summary', '*invit*')
         self.assertEqual(len(counter), 1)
 
+    def test_search_counted_all(self):
+        needles = ['ation', 'RESERV', '*invit*', 'nothing']
+        expected = dnf.match_counter.MatchCounter()
+        for needle in needles:
+            self.cmd._search_counted(expected, 'name', needle)
+            self.cmd._search_counted(expected, 'summary', needle)
+        counter = dnf.match_counter.MatchCounter()
+        self.cmd._search_counted_all(counter, ('name', 'summary'), needles)
+        self.assertEqual(counter, expected)
+
 
 class SearchTest(tests.support.DnfBaseTestCase):
 
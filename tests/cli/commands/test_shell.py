@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import logging
+import os
+import socket
+import tempfile
+
+import dnf.cli.commands.shell as shell
+import dnf.exceptions
+import dnf.util
+
+import tests.support
+from tests.support import mock
+
+
+class ShellServerTest(tests.support.DnfBaseTestCase):
+
+    REPOS = []
+    CLI = "mock"
+
+    def setUp(self):
+        super(ShellServerTest, self).setUp()
+        self.cmd = shell.ShellCommand(self.cli)
+
+    def _onecmd(self, line):
+        if line == 'quit':
+            self.cmd._quit()
+        print('ran ' + line)
+        if line == 'fail':
+            logging.getLogger('dnf').error('failed')
+
+    def test_serve_connection(self):
+        server, client = socket.socketpair()
+        self.addCleanup(server.close)
+        self.addCleanup(client.close)
+        for line in ('list', 'fail', 'quit'):
+            shell._send_frame(client, {'command': line})
+        with mock.patch.object(self.cmd, 'onecmd', self._onecmd):
+            self.assertFalse(self.cmd._serve_connection(server))
+        self.assertEqual(shell._recv_frame(client),
+                         {'status': 0, 'output': 'ran list\n'})
+        self.assertEqual(shell._recv_frame(client)['status'], 1)
+        self.assertEqual(shell._recv_frame(client)['status'], 0)
+
+    def test_recv_frame_eof(self):
+        server, client = socket.socketpair()
+        self.addCleanup(server.close)
+        client.sendall(shell._FRAME_HEADER.pack(10) + b'{}')
+        client.close()
+        self.assertIsNone(shell._recv_frame(server))
+
+    def test_serve_connection_bad_requests(self):
+        server, client = socket.socketpair()
+        self.addCleanup(server.close)
+        self.addCleanup(client.close)
+        payload = b'not json'
+        client.sendall(shell._FRAME_HEADER.pack(len(payload)) + payload)
+        shell._send_frame(client, ['list'])
+        shell._send_frame(client, {'command': 'list'})
+        client.shutdown(socket.SHUT_WR)
+        with mock.patch.object(self.cmd, 'onecmd', self._onecmd):
+            self.assertTrue(self.cmd._serve_connection(server))
+        self.assertEqual(shell._recv_frame(client)['status'], 1)
+        self.assertEqual(shell._recv_frame(client)['status'], 1)
+        self.assertEqual(shell._recv_frame(client),
+                         {'status': 0, 'output': 'ran list\n'})
+
+    def test_serve_connection_too_large(self):
+        server, client = socket.socketpair()
+        self.addCleanup(server.close)
+        self.addCleanup(client.close)
+        client.sendall(shell._FRAME_HEADER.pack(shell._MAX_REQUEST + 1))
+        shell._send_frame(client, {'command': 'list'})
+        with mock.patch.object(self.cmd, 'onecmd') as onecmd:
+            self.assertTrue(self.cmd._serve_connection(server))
+        onecmd.assert_not_called()
+        self.assertEqual(shell._recv_frame(client)['status'], 1)
+
+    def test_serve_connection_client_gone(self):
+        server, client = socket.socketpair()
+        self.addCleanup(server.close)
+        shell._send_frame(client, {'command': 'list'})
+        client.close()
+        with mock.patch.object(self.cmd, 'onecmd', self._onecmd):
+            self.assertTrue(self.cmd._serve_connection(server))
+
+    def test_serve_not_a_socket(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(dnf.util.rm_rf, tmpdir)
+        path = os.path.join(tmpdir, 'file')
+        with open(path, 'w') as f:
+            f.write('keep')
+        self.assertRaises(dnf.exceptions.Error, self.cmd._serve, path)
+        with open(path) as f:
+            self.assertEqual(f.read(), 'keep')
@@ -20,6 +20,8 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import json
+
 import libdnf.transaction
 
 import dnf.cli.output
@@ -72,6 +74,25 @@ class OutputFunctionsTest(tests.support.TestCase):
         self.assertEqual([tsi._active for tsi in lists.installed],
                          ['pepper-2', 'pepper-3'])
 
+    def test_json_writer(self):
+        stream = dnf.pycomp.StringIO()
+        with dnf.cli.output.JSONWriter(stream=stream) as writer:
+            writer.write({'name': 'pepper'})
+            writer.write({'name': 'tour'})
+        self.assertEqual(json.loads(stream.getvalue()), [{'name': 'pepper'}, {'name': 'tour'}])
+
+        stream = dnf.pycomp.StringIO()
+        with dnf.cli.output.JSONWriter(stream=stream) as writer:
+            pass
+        self.assertEqual(json.loads(stream.getvalue()), [])
+
+        stream = dnf.pycomp.StringIO()
+        with dnf.cli.output.JSONWriter(lines=True, stream=stream) as writer:
+            writer.write({'name': 'pepper'})
+            writer.write('tour')
+        self.assertEqual([json.loads(line) for line in stream.getvalue().splitlines()],
+                         [{'name': 'pepper'}, 'tour'])
+
     def test_spread(self):
         fun = dnf.cli.output._spread_in_columns
         self.assertEqual(fun(3, "tour", list(range(3))),
@@ -103,6 +124,22 @@ class OutputTest(tests.support.DnfBaseTestCase):
                  '', 'lon', 'e'))
         self.assertCountEqual(self.output._col_widths(rows), (-38, -37, -1))
 
+    def test_calc_columns(self):
+        data = [{10: 3, 25: 1}, {5: 2, 7: 1}, {8: 4}]
+        self.assertEqual(self.output.calcColumns(data, remainder_column=1, total_width=50),
+                         [29, 11, 8])
+        self.assertEqual(self.output.calcColumns(data, remainder_column=1, total_width=40),
+                         [23, 7, 8])
+
+    @mock.patch('dnf.cli.output.Output._stream_listing', return_value=True)
+    def test_list_pkgs_stream(self, _stream_listing):
+        pkgs = self.base.sack.query().filter(name='pepper').run()
+        with tests.support.patch_std_streams() as (stdout, _):
+            self.output.listPkgs(pkgs + pkgs, 'Packages', 'list', columns=(-20, -10, -10))
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(lines[0], 'Packages')
+        self.assertLength(lines, len(pkgs) + 1)
+
     @mock.patch('dnf.cli.output._', dnf.pycomp.NullTranslations().ugettext)
     @mock.patch('dnf.cli.output.P_', dnf.pycomp.NullTranslations().ungettext)
     @mock.patch('dnf.cli.term._real_term_width', return_value=80)
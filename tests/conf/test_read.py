@@ -20,10 +20,15 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import os
+import shutil
+import tempfile
+
 import dnf.conf
 import dnf.conf.read
 
 import tests.support
+from tests.support import mock
 
 
 FN = tests.support.resource_path('etc/repos.conf')
@@ -45,3 +50,31 @@ class RepoReaderTest(tests.support.TestCase):
         r2 = all_repos[1]
         self.assertEqual(r2.id, 'rain')
         self.assertEqual(r2.mirrorlist, 'http://through.net')
+
+    def test_read_snapshot(self):
+        tmpdir = tempfile.mkdtemp(prefix="dnf-read-test-")
+        self.addCleanup(shutil.rmtree, tmpdir)
+        snapshot = os.path.join(tmpdir, 'repoconf.json')
+        conf = dnf.conf.Conf()
+        conf.config_file_path = FN
+        conf.reposdir = []
+
+        def read():
+            reader = dnf.conf.read.RepoReader(conf, {}, snapshot)
+            return [(r.id, r.baseurl, r.mirrorlist) for r in reader]
+
+        expected = read()
+        self.assertTrue(os.path.exists(snapshot))
+        # on a miss the repos keep the real parser
+        reader = dnf.conf.read.RepoReader(conf, {}, os.path.join(tmpdir, 'other.json'))
+        for repo in reader:
+            self.assertNotIsInstance(repo.cfg, dnf.conf.read._ParsedConfig)
+        with mock.patch('libdnf.conf.ConfigParser') as parser:
+            self.assertEqual(read(), expected)
+            self.assertFalse(parser.called)
+
+        # changed substitutions invalidate the snapshot
+        conf.substitutions['rain'] = 'snow'
+        self.assertEqual(read(), expected)
+        with open(snapshot) as f:
+            self.assertIn('snow', f.read())
@@ -516,9 +516,16 @@ class FakePersistor(object):
     reset_last_makecache = False
     expired_to_add = set()
 
+    def __init__(self):
+        self.refresh_deadlines = {}
+        self.refresh_to_set = {}
+
     def get_expired_repos(self):
         return set()
 
+    def get_refresh_deadlines(self):
+        return dict(self.refresh_deadlines)
+
     def since_last_makecache(self):
         return None
 
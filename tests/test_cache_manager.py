@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+import dnf.cache_manager
+
+import tests.support
+
+REPODIR = 'main-0123456789abcdef'
+
+
+def _entry(path, size, used):
+    return dnf.cache_manager.CacheEntry(path, 'packages', 'main', size, used)
+
+
+class CacheManagerTest(tests.support.TestCase):
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp(prefix='dnf-cache-manager-')
+        self.manager = dnf.cache_manager.CacheManager(self.cachedir)
+        for path, size in ((REPODIR + '/repodata/repomd.xml', 10),
+                           (REPODIR + '/packages/foo.rpm', 100),
+                           ('main.solv', 20),
+                           ('main-filenames.solvx', 30),
+                           ('expired_repos.json', 2)):
+            fn = os.path.join(self.cachedir, path)
+            if not os.path.isdir(os.path.dirname(fn)):
+                os.makedirs(os.path.dirname(fn))
+            with open(fn, 'wb') as f:
+                f.write(b'x' * size)
+
+    def tearDown(self):
+        shutil.rmtree(self.cachedir)
+
+    def test_scan(self):
+        entries = list(self.manager.scan())
+        self.assertEqual(dnf.cache_manager.usage(entries), {
+            ('main', 'metadata'): [1, 10],
+            ('main', 'packages'): [1, 100],
+            ('main', 'dbcache'): [2, 50]})
+
+    def test_remove(self):
+        entries = [e for e in self.manager.scan() if e.type == 'dbcache']
+        self.assertEqual(self.manager.remove(entries), 2)
+        self.assertCountEqual([e.type for e in self.manager.scan()],
+                              ['metadata', 'packages'])
+
+    def test_over_budget(self):
+        entries = [_entry('a.rpm', 10, 100), _entry('b.rpm', 10, 300),
+                   _entry('c.rpm', 10, 200)]
+        evict = dnf.cache_manager.over_budget(entries, max_size=15, now=400)
+        self.assertEqual([e.path for e in evict], ['a.rpm', 'c.rpm'])
+        evict = dnf.cache_manager.over_budget(entries, max_age=150, now=400)
+        self.assertEqual([e.path for e in evict], ['a.rpm', 'c.rpm'])
+        evict = dnf.cache_manager.over_budget(entries, max_size=30, now=400)
+        self.assertEqual(evict, [])
+
+    def test_over_budget_metadata_unit(self):
+        entries = [
+            dnf.cache_manager.CacheEntry(REPODIR + '/repodata/primary.xml.gz',
+                                         'metadata', 'main', 100, 100),
+            dnf.cache_manager.CacheEntry(REPODIR + '/repodata/repomd.xml',
+                                         'metadata', 'main', 10, 100),
+            # refreshed recently
+            dnf.cache_manager.CacheEntry(REPODIR + '/metalink.xml',
+                                         'metadata', 'main', 10, 390),
+            dnf.cache_manager.CacheEntry('main.solv', 'dbcache', 'main', 50, 100),
+            dnf.cache_manager.CacheEntry('old-0123456789abcdef/repodata/repomd.xml',
+                                         'metadata', 'old', 10, 200),
+            dnf.cache_manager.CacheEntry('old-0123456789abcdef/repodata/primary.xml.gz',
+                                         'metadata', 'old', 100, 200),
+            _entry('a.rpm', 10, 300)]
+        evict = dnf.cache_manager.over_budget(entries, max_age=150, now=400)
+        self.assertCountEqual([e.path for e in evict],
+                              ['old-0123456789abcdef/repodata/repomd.xml',
+                               'old-0123456789abcdef/repodata/primary.xml.gz'])
+        evict = dnf.cache_manager.over_budget(entries, max_size=100, now=400)
+        self.assertCountEqual([e.repoid for e in evict], ['old', 'old', 'main', 'main',
+                                                          'main', 'main'])
+
+    def test_enforce_budget(self):
+        package = REPODIR + '/packages/foo.rpm'
+        count = dnf.cache_manager.enforce_budget(self.cachedir, max_size=0, keep=[package],
+                                                 active_repos={'main'})
+        self.assertEqual(count, 0)
+        # the kept metadata and solv files count against the size
+        count = dnf.cache_manager.enforce_budget(self.cachedir, max_size=100,
+                                                 active_repos={'main'})
+        self.assertEqual(count, 1)
+        self.assertCountEqual([e.type for e in self.manager.scan()],
+                              ['metadata', 'dbcache', 'dbcache'])
@@ -60,6 +60,14 @@ class CompsTest(tests.support.TestCase):
         group = dnf.util.first(comps.groups_by_pattern('Base'))
         self.assertIsInstance(group, dnf.comps.Group)
 
+    def test_by_patterns(self):
+        matches = self.comps._groups_by_patterns(['Base', 'Solid*', 'nosuch'])
+        self.assertLength(matches['Base'], 1)
+        self.assertLength(matches['Solid*'], 1)
+        self.assertEmpty(matches['nosuch'])
+        matches = self.comps._groups_by_patterns(['*'])
+        self.assertLength(matches['*'], tests.support.TOTAL_GROUPS)
+
     def test_categories(self):
         cat = self.comps.categories[0]
         self.assertEqual(cat.name_by_lang['cs'], u'Základ systému')
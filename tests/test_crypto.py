@@ -28,6 +28,7 @@ import dnf.util
 import dnf.yum.misc
 
 import tests.support
+from tests.support import mock
 
 
 FINGERPRINT = '0BE49FAF9C955F4F1A98D14B24362A8492530C8E'
@@ -79,3 +80,58 @@ class CryptoTest(tests.support.TestCase):
         self.assertLength(keyinfos, 1)
         keyinfo = keyinfos[0]
         self.assertEqual(keyinfo.url, KEYFILE_URL)
+
+    def test_retrieve_all(self):
+        keyinfos = dnf.crypto.retrieve_all([KEYFILE_URL, KEYFILE_URL])
+        self.assertLength(keyinfos, 2)
+        for infos in keyinfos:
+            self.assertEqual([info.fingerprint for info in infos], [FINGERPRINT])
+            self.assertEqual(infos[0].url, KEYFILE_URL)
+
+    def test_retrieve_all_cached(self):
+        cachedir = tempfile.mkdtemp()
+        self.addCleanup(dnf.util.rm_rf, cachedir)
+        repo = mock.Mock()
+        repo._repo.getCachedir.return_value = cachedir
+        with open(KEYFILE, 'rb') as keyfile:
+            rawkey = keyfile.read()
+        with mock.patch('dnf.crypto._download', return_value=rawkey), \
+                mock.patch.dict(dnf.crypto._keyinfos_by_digest, clear=True):
+            first = dnf.crypto.retrieve_all([KEYFILE_URL], repo)[0][0]
+        # a new process only has the cache in the cachedir
+        with mock.patch('dnf.crypto._download', return_value=rawkey), \
+                mock.patch.dict(dnf.crypto._keyinfos_by_digest, clear=True), \
+                mock.patch('dnf.crypto._rawkeys2infos') as parse:
+            info = dnf.crypto.retrieve_all([KEYFILE_URL], repo)[0][0]
+        parse.assert_not_called()
+        self.assertEqual(info.fingerprint, FINGERPRINT)
+        self.assertEqual(info.raw_key, first.raw_key)
+        self.assertEqual(info.url, KEYFILE_URL)
+
+    def test_verify_keyinfo(self):
+        with open(KEYFILE, 'rb') as keyfile:
+            rawkey = keyfile.read()
+        packets = dnf.crypto._pgp_packets(rawkey)
+        data = {'id': FINGERPRINT[-16:], 'fingerprint': FINGERPRINT,
+                'raw_key': rawkey.decode('ascii'), 'timestamp': 1408534646,
+                'userid': 'Dandy Fied <dnf@example.com>'}
+        self.assertTrue(dnf.crypto._verify_keyinfo(packets, data))
+        for name, value in [('id', '0' * 16), ('fingerprint', '0' * 40),
+                            ('timestamp', 0), ('userid', 'Mallory')]:
+            self.assertFalse(dnf.crypto._verify_keyinfo(packets, dict(data, **{name: value})))
+        # key material which is not in the file
+        self.assertFalse(dnf.crypto._verify_keyinfo(packets[1:], data))
+
+    def test_retrieve_all_parsed_once(self):
+        with open(KEYFILE, 'rb') as keyfile:
+            rawkey = keyfile.read()
+        with mock.patch('dnf.crypto._download', return_value=rawkey), \
+                mock.patch.dict(dnf.crypto._keyinfos_by_digest, clear=True):
+            first = dnf.crypto.retrieve_all([KEYFILE_URL])[0][0]
+            with mock.patch('dnf.crypto._rawkeys2infos') as parse:
+                info = dnf.crypto.retrieve_all([KEYFILE_URL])[0][0]
+        parse.assert_not_called()
+        self.assertIsNot(info, first)
+        self.assertEqual(info.fingerprint, FINGERPRINT)
+        self.assertEqual(info.raw_key, first.raw_key)
+        self.assertEqual(info.url, KEYFILE_URL)
@@ -17,9 +17,18 @@
 # Red Hat, Inc.
 #
 
+import base64
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
 import dnf.dnssec
 
 import tests.support
+from tests.support import mock
 
 
 RPM_USER = 'RPM Packager (The guy who creates packages) <packager@example.com>'
@@ -92,3 +101,108 @@ class KeyInfoTest(tests.support.TestCase):
     def test_key_info_from_rpm_key_object_key_part(self):
         key_info = dnf.dnssec.KeyInfo.from_rpm_key_object(RPM_USER, RPM_RAW_KEY)
         self.assertEqual(key_info.key, ASCII_RAW_KEY)
+
+
+class FakeResult(object):
+    def __init__(self, data=None, ttl=300):
+        self.secure = True
+        self.bogus = False
+        self.nxdomain = data is None
+        self.havedata = data is not None
+        self.data = mock.Mock()
+        self.data.as_raw_data.return_value = [data]
+        self.ttl = ttl
+
+
+class FakeContext(object):
+    """Stand-in for unbound.ub_ctx answering from a dict of records."""
+
+    records = {}
+
+    def __init__(self):
+        self.queries = []
+        self.pending = []
+
+    def set_option(self, option, value):
+        return 0
+
+    def resolvconf(self):
+        return 0
+
+    def add_ta_file(self, fn):
+        return 0
+
+    def resolve(self, name, rrtype, rrclass):
+        self.queries.append(name)
+        return 0, self.records[name]
+
+    def resolve_async(self, name, data, callback, rrtype, rrclass):
+        self.queries.append(name)
+        self.pending.append((data, callback, self.records[name]))
+        return 0, len(self.pending)
+
+    def wait(self):
+        for data, callback, result in self.pending:
+            callback(data, 0, result)
+        self.pending = []
+
+
+class DNSSECKeyVerificationTest(tests.support.TestCase):
+
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp(prefix="dnf-dnssec-test-")
+        self.addCleanup(shutil.rmtree, self.cachedir)
+        unbound = mock.Mock(RR_CLASS_IN=1)
+        unbound.ub_ctx.side_effect = FakeContext
+        FakeContext.records = {
+            dnf.dnssec.email2location(EMAIL): FakeResult(base64.b64decode(ASCII_RAW_KEY)),
+            dnf.dnssec.email2location('nobody@example.com'): FakeResult(),
+        }
+        self.unbound = unbound
+        for patcher in (mock.patch.dict(sys.modules, {'unbound': unbound}),
+                        mock.patch.object(dnf.dnssec.DNSSECKeyVerification, '_cache', {}),
+                        mock.patch.object(dnf.dnssec.DNSSECKeyVerification, '_cache_file', None),
+                        mock.patch.object(dnf.dnssec.DNSSECKeyVerification, '_ctx', None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        dnf.dnssec.DNSSECKeyVerification._set_cachedir(self.cachedir)
+
+    def test_verify_all(self):
+        keys = [dnf.dnssec.KeyInfo(EMAIL, ASCII_RAW_KEY),
+                dnf.dnssec.KeyInfo('nobody@example.com', b'key')]
+        results = dnf.dnssec.DNSSECKeyVerification.verify_all(keys)
+        self.assertEqual(results, [dnf.dnssec.Validity.VALID,
+                                   dnf.dnssec.Validity.PROVEN_NONEXISTENCE])
+        # one resolver context serves all the queries
+        self.assertEqual(self.unbound.ub_ctx.call_count, 1)
+        self.assertEqual(len(dnf.dnssec.DNSSECKeyVerification._ctx.queries), 2)
+
+        self.assertEqual(dnf.dnssec.DNSSECKeyVerification.verify(keys[0]),
+                         dnf.dnssec.Validity.VALID)
+        self.assertEqual(len(dnf.dnssec.DNSSECKeyVerification._ctx.queries), 2)
+
+    def test_persistent_cache(self):
+        key = dnf.dnssec.KeyInfo(EMAIL, ASCII_RAW_KEY)
+        self.assertEqual(dnf.dnssec.DNSSECKeyVerification.verify(key),
+                         dnf.dnssec.Validity.VALID)
+
+        # a new process starts with an empty cache and a new context
+        dnf.dnssec.DNSSECKeyVerification._cache = {}
+        dnf.dnssec.DNSSECKeyVerification._cache_file = None
+        dnf.dnssec.DNSSECKeyVerification._ctx = None
+        dnf.dnssec.DNSSECKeyVerification._set_cachedir(self.cachedir)
+        revoked = dnf.dnssec.KeyInfo(EMAIL, b'other')
+        self.assertEqual(dnf.dnssec.DNSSECKeyVerification.verify(revoked),
+                         dnf.dnssec.Validity.REVOKED)
+        self.assertIsNone(dnf.dnssec.DNSSECKeyVerification._ctx)
+
+    def test_expired_cache(self):
+        cache_file = os.path.join(self.cachedir, dnf.dnssec.CACHE_FILENAME)
+        with open(cache_file, 'w') as f:
+            json.dump({EMAIL: ['b3RoZXI=', time.time() - 1]}, f)
+        dnf.dnssec.DNSSECKeyVerification._cache_file = None
+        dnf.dnssec.DNSSECKeyVerification._set_cachedir(self.cachedir)
+        key = dnf.dnssec.KeyInfo(EMAIL, ASCII_RAW_KEY)
+        self.assertEqual(dnf.dnssec.DNSSECKeyVerification.verify(key),
+                         dnf.dnssec.Validity.VALID)
+        self.assertEqual(len(dnf.dnssec.DNSSECKeyVerification._ctx.queries), 1)
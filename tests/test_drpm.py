@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import stat
+import tempfile
+
+import dnf.callback
+import dnf.drpm
+
+import tests.support
+from tests.support import mock
+
+# sleeps for the number of seconds stored in the delta, then "rebuilds" it
+FAKE_APPLYDELTA = """#!/bin/sh
+sleep "$(cat "$3")"
+cp "$3" "$4"
+"""
+
+
+class DeltaInfoRebuildTest(tests.support.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="dnf-drpm-test-")
+        applydelta = os.path.join(self.tmpdir, 'applydeltarpm')
+        with open(applydelta, 'w') as f:
+            f.write(FAKE_APPLYDELTA)
+        os.chmod(applydelta, stat.S_IRWXU)
+        patcher = mock.patch('dnf.drpm.APPLYDELTA', applydelta)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.progress = mock.Mock()
+        self.delta_info = dnf.drpm.DeltaInfo([], self.progress, 75)
+        self.delta_info.deltarpm_jobs = 2
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _payload(self, name, delay):
+        drpm = os.path.join(self.tmpdir, name + '.drpm')
+        rpm = os.path.join(self.tmpdir, name + '.rpm')
+        with open(drpm, 'w') as f:
+            f.write(delay)
+        pkg = mock.Mock(arch='noarch')
+        pkg.localPkg.return_value = rpm
+        pkg.verifyLocalPkg.side_effect = lambda: os.path.exists(rpm)
+        pload = mock.Mock(pkg=pkg)
+        pload.localPkg.return_value = drpm
+        return pload
+
+    def test_slow_job_does_not_block(self):
+        slow = self._payload('slow', '1')
+        fast = [self._payload('fast%d' % i, '0') for i in range(4)]
+        for pload in [slow] + fast:
+            self.delta_info.enqueue(pload)
+        self.delta_info.wait()
+
+        self.assertEqual(self.delta_info.err, {})
+        self.assertEqual(self.delta_info.jobs, {})
+        finished = [c[0][0] for c in self.progress.end.call_args_list]
+        # the fast rebuilds reuse the second slot while the slow one runs
+        self.assertEqual(finished[-1], slow)
+        self.assertCountEqual(finished[:-1], fast)
+        for pload in [slow] + fast:
+            self.progress.end.assert_any_call(
+                pload, dnf.callback.STATUS_DRPM, 'done')
+            self.assertFalse(os.path.exists(pload.localPkg()))
+
+    def test_spawn_failure(self):
+        ploads = [self._payload('pkg%d' % i, '0') for i in range(4)]
+        spawnl = os.spawnl
+        spawned = []
+
+        def _spawnl(*args):
+            # the queued rebuilds are started by the reaper threads
+            if len(spawned) >= 2:
+                raise OSError(11, 'Resource temporarily unavailable')
+            spawned.append(args)
+            return spawnl(*args)
+
+        with mock.patch('os.spawnl', _spawnl):
+            for pload in ploads:
+                self.delta_info.enqueue(pload)
+            self.delta_info.wait()
+
+        self.assertEqual(self.delta_info.jobs, {})
+        self.assertCountEqual(self.delta_info.err, [p.pkg for p in ploads[2:]])
+
+    def test_installed_index(self):
+        ipo = mock.Mock(arch='x86_64')
+        ipo.name = 'tour'
+        delta_info = dnf.drpm.DeltaInfo([ipo], self.progress, 75)
+        self.assertEqual(delta_info._installed_by_na('tour', 'x86_64'), [ipo])
+        self.assertEqual(delta_info._installed_by_na('tour', 'noarch'), ())
@@ -20,6 +20,8 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import json
+
 import libdnf.transaction
 
 import dnf.goal
@@ -56,3 +58,58 @@ class GoalTest(tests.support.DnfBaseTestCase):
         self.goal.group_members.add('hole')
         self.assertEqual(libdnf.transaction.TransactionItemReason_GROUP, self.goal.group_reason(hole, libdnf.transaction.TransactionItemReason_GROUP))
         self.assertEqual(libdnf.transaction.TransactionItemReason_DEPENDENCY, self.goal.group_reason(hole, libdnf.transaction.TransactionItemReason_DEPENDENCY))
+
+    def test_resolved_goal(self):
+        sltr = dnf.selector.Selector(self.sack)
+        sltr.set(name='mrkite')
+        self.goal.install(select=sltr)
+        self.goal.erase(self.sack.query().installed().filter(name='pepper')[0])
+        self.assertTrue(self.goal.run())
+        data = json.loads(json.dumps(dnf.goal._ResolvedGoal.dump(self.goal)))
+        resolved = dnf.goal._ResolvedGoal.load(self.sack, data)
+        self.assertCountEqual(resolved.list_installs(), self.goal.list_installs())
+        self.assertCountEqual(resolved.list_erasures(), self.goal.list_erasures())
+        self.assertEqual(resolved.list_upgrades(), [])
+        for pkg in self.goal.list_installs():
+            self.assertEqual(resolved.get_reason(pkg), self.goal.get_reason(pkg))
+            self.assertCountEqual(resolved.obsoleted_by_package(pkg),
+                                  self.goal.obsoleted_by_package(pkg))
+
+    def test_resolved_goal_missing_package(self):
+        data = {'lists': {'installs': [['missing-1-1.noarch', 'main']]},
+                'obsoleted_by': [], 'reasons': []}
+        self.assertIsNone(dnf.goal._ResolvedGoal.load(self.sack, data))
+
+    def test_skipped(self):
+        mrkite = self.sack.query().available().filter(name='mrkite')[0]
+        lotus = self.sack.query().available().filter(name='lotus')[0]
+        data = dnf.goal._dump_skipped({mrkite}, {lotus}, 'problem')
+        data = json.loads(json.dumps(data))
+        self.assertEqual(dnf.goal._load_skipped(self.sack, data),
+                         ({mrkite}, {lotus}, 'problem'))
+
+        data['broken'].append(['missing-1-1.noarch', 'main'])
+        self.assertIsNone(dnf.goal._load_skipped(self.sack, data))
+
+    def test_job_key(self):
+        sltr = dnf.selector.Selector(self.sack)
+        sltr.set(name='mrkite')
+        self.goal.install(select=sltr)
+        key = self.goal._job_key()
+        self.assertIsNotNone(key)
+
+        other = dnf.goal.Goal(self.sack)
+        sltr = dnf.selector.Selector(self.sack)
+        sltr.set(name='lotus')
+        other.install(select=sltr)
+        self.assertNotEqual(other._job_key(), key)
+
+        same = dnf.goal.Goal(self.sack)
+        sltr = dnf.selector.Selector(self.sack)
+        sltr.set(name='mrkite')
+        same.install(select=sltr)
+        self.assertEqual(same._job_key(), key)
+
+        # jobs added behind the back of dnf.goal.Goal make the key unknown
+        same.push_userinstalled(self.sack.query().installed(), self.history)
+        self.assertIsNone(same._job_key())
@@ -23,6 +23,7 @@ from __future__ import unicode_literals
 import libdnf.transaction
 
 import dnf.history
+import dnf.util
 
 import tests.support
 from tests.support import mock
@@ -503,3 +504,24 @@ class TransactionConverterTest(tests.support.TestCase):
             yield (item.op_type, item.installed, item.erased, item.obsoleted,
                    item.reason)
 '''
+
+
+class PackageOriginsTest(tests.support.DnfBaseTestCase):
+
+    REPOS = []
+
+    def test_package_origins(self):
+        pkgs = self.sack.query().installed().filter(name=['pepper', 'tour']).run()
+        for pkg in pkgs:
+            pkg._force_swdb_repoid = "updates"
+            self.history.rpm.add_install(pkg)
+        self._swdb_commit()
+
+        hole = dnf.util.first(self.sack.query().installed().filter(name='hole'))
+        repos, installed_by = self.history.package_origins(pkgs + [hole])
+        for pkg in pkgs:
+            self.assertEqual(repos[str(pkg)], "updates")
+            self.assertEqual(self.history.repo(pkg), "updates")
+            self.assertIsNotNone(installed_by[str(pkg)])
+        self.assertEqual(repos[str(hole)], "")
+        self.assertIsNone(installed_by[str(hole)])
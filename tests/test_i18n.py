@@ -136,6 +136,14 @@ class TestFormatedOutput(tests.support.TestCase):
 
     def test_exact_width(self):
         self.assertEqual(dnf.i18n.exact_width("重uř"), 4)
+        self.assertEqual(dnf.i18n.exact_width("重uř"), 4)
+        self.assertEqual(dnf.i18n.exact_width("x86_64"), 6)
+
+    def test_chop_str(self):
+        self.assertEqual(dnf.i18n.chop_str("x86_64", 3), (3, "x86"))
+        self.assertEqual(dnf.i18n.chop_str("x86_64", 10), (6, "x86_64"))
+        self.assertEqual(dnf.i18n.chop_str("重uř", 1), (0, ""))
+        self.assertEqual(dnf.i18n.chop_str("重uř", 3), (3, "重u"))
 
     def test_textwrap_fill(self):
         msg = "12345 67890"
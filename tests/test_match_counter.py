@@ -117,6 +117,44 @@ class MatchCounterTest(tests.support.TestCase):
         counter.add(pkg2, 'summary', 'clock')
         self.assertSequenceEqual(counter.sorted(), (pkg2, pkg1))
 
+    def test_rank_cached(self):
+        counter = dnf.match_counter.MatchCounter()
+        pkg1, pkg2 = PackageStub().several(2)
+        counter.add(pkg1, 'summary', 'sum')
+        counter.add(pkg2, 'summary', 'summary')
+        with mock.patch.object(counter, '_eval_weights',
+                               wraps=counter._eval_weights) as weights:
+            counter.sorted()
+            counter.sorted(reverse=True)
+            self.assertEqual(weights.call_count, 2)
+            counter.add(pkg1, 'name', 'nevra')
+            self.assertEqual(counter.matched_needles(pkg1),
+                             set(['sum', 'nevra']))
+            self.assertEqual(weights.call_count, 3)
+        del counter[pkg2]
+        self.assertEqual(counter.sorted(), [pkg1])
+        self.assertEqual(list(counter._ranks), [pkg1])
+
+    def test_rank_mutated(self):
+        counter = dnf.match_counter.MatchCounter()
+        pkg1, pkg2 = PackageStub().several(2)
+        counter.add(pkg1, 'summary', 'sum')
+        counter.add(pkg2, 'summary', 'summary')
+        self.assertEqual(counter.matched_needles(pkg1), set(['sum']))
+        counter[pkg1].append(('name', 'nevra'))
+        self.assertEqual(counter.matched_needles(pkg1), set(['sum', 'nevra']))
+        self.assertEqual(counter.matched_haystacks(pkg1),
+                         set([pkg1.summary, pkg1.name]))
+        counter[pkg1] = [('summary', 'summ')]
+        self.assertEqual(counter.matched_needles(pkg1), set(['summ']))
+        counter.update({pkg2: [('name', 'nevra')]})
+        self.assertEqual(counter.matched_needles(pkg2), set(['nevra']))
+        counter.pop(pkg2)
+        self.assertNotIn(pkg2, counter._ranks)
+        counter.clear()
+        self.assertEqual(counter._ranks, {})
+        self.assertEqual(counter._haystacks, {})
+
     def test_total(self):
         counter = dnf.match_counter.MatchCounter()
         counter.add(3, 'summary', 'humbert')
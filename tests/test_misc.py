@@ -19,6 +19,12 @@
 
 from __future__ import unicode_literals
 
+import hashlib
+import io
+import os
+import tempfile
+
+import dnf.exceptions
 import dnf.yum.misc
 
 import tests.support
@@ -34,3 +40,43 @@ class TestGenericHolder(tests.support.TestCase):
         gh.merge_lists(gh2)
         self.assertEqual(gh.l, ["lucy", "in", "the", "sky"])
         self.assertEqual(gh.l2, ["with", "diamonds"])
+
+
+class TestChecksum(tests.support.TestCase):
+    def setUp(self):
+        self.data = os.urandom(3 * 2**16 + 7)
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_checksum(self):
+        expected = hashlib.sha256(self.data).hexdigest()
+        self.assertEqual(dnf.yum.misc.checksum('sha256', self.path), expected)
+        self.assertEqual(dnf.yum.misc.checksum('sha256', self.path, CHUNK=2**16), expected)
+        self.assertEqual(dnf.yum.misc.checksum('sha256', io.BytesIO(self.data)), expected)
+
+    def test_checksum_datasize(self):
+        result = dnf.yum.misc.checksum('sha256', self.path, CHUNK=2**16, datasize=10)
+        self.assertTrue(result.startswith('!10!'))
+
+    def test_checksums_one_pass(self):
+        sums = dnf.yum.misc.Checksums(['md5', 'sha1', 'sha256'])
+        with open(self.path, 'rb', 0) as fo:
+            sums.update_from_file(fo, size=2**16)
+        self.assertEqual(sums.length, len(self.data))
+        self.assertEqual(sums.hexdigests(), {
+            'md5': hashlib.md5(self.data).hexdigest(),
+            'sha1': hashlib.sha1(self.data).hexdigest(),
+            'sha256': hashlib.sha256(self.data).hexdigest()})
+
+    def test_checksum_files(self):
+        missing = self.path + '.missing'
+        results = dnf.yum.misc.checksum_files(
+            [('sha256', self.path, None), ('sha256', missing, None),
+             ('md5', self.path, None)], workers=2)
+        self.assertEqual(results[0], hashlib.sha256(self.data).hexdigest())
+        self.assertIsInstance(results[1], dnf.exceptions.MiscError)
+        self.assertEqual(results[2], hashlib.md5(self.data).hexdigest())
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+import dnf.name_index
+
+import tests.support
+from tests.support import mock
+
+
+class NameIndexTest(tests.support.DnfBaseTestCase):
+
+    REPOS = ['main']
+
+    def setUp(self):
+        super(NameIndexTest, self).setUp()
+        self.tmpdir = tempfile.mkdtemp(prefix='dnf-name-index-')
+        self.path = os.path.join(self.tmpdir, 'names.json')
+        self.rpmdb = [['Packages', 1, 2.0]]
+        patchers = [
+            mock.patch('dnf.util._rpmdb_stamp', lambda root: self.rpmdb),
+            mock.patch('dnf.name_index._repo_stamp', lambda repo: [repo.id, 1, 2.0])]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        super(NameIndexTest, self).tearDown()
+
+    def _load(self, parts=dnf.name_index.PARTS):
+        return dnf.name_index.NameIndex.load(
+            self.path, self.base.conf.installroot, self.base.repos, parts)
+
+    def test_lookup(self):
+        dnf.name_index.update(self.path, self.base, True, True)
+        index = self._load()
+        self.assertEqual(index.lookup('installed', 'lib'),
+                         ['librita-1-1.i686', 'librita-1-1.x86_64'])
+        self.assertEqual(index.lookup('available', 'pepp'),
+                         ['pepper-20-0.src', 'pepper-20-0.x86_64'])
+        self.assertEqual(index.lookup('installed', 'nope'), [])
+
+    def test_excludes_ignored(self):
+        self.base.sack.add_excludes(self.base.sack.query().filter(name='pepper'))
+        dnf.name_index.update(self.path, self.base, True, True)
+        self.assertEqual(self._load().lookup('available', 'pepp'),
+                         ['pepper-20-0.src', 'pepper-20-0.x86_64'])
+
+    def test_stale(self):
+        self.assertIsNone(self._load())
+        dnf.name_index.update(self.path, self.base, True, False)
+        self.assertIsNone(self._load())
+        self.assertIsNotNone(self._load(('installed',)))
+        self.rpmdb = [['Packages', 2, 3.0]]
+        self.assertIsNone(self._load(('installed',)))
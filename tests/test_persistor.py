@@ -20,6 +20,8 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import json
+import os
 import tempfile
 
 import dnf.comps
@@ -48,3 +50,48 @@ class RepoPersistorTest(tests.support.TestCase):
 
         persistor = dnf.persistor.RepoPersistor(self.persistdir)
         self.assertEqual(persistor.get_expired_repos(), IDS)
+
+    def test_expired_repos_unchanged(self):
+        self.persistor.expired_to_add = set(IDS)
+        self.persistor.save()
+        mtime = os.stat(self.persistor.db_path).st_mtime
+        os.utime(self.persistor.db_path, (mtime - 10, mtime - 10))
+        self.persistor.save()
+        self.assertEqual(os.stat(self.persistor.db_path).st_mtime, mtime - 10)
+
+
+class TempfilePersistorTest(tests.support.TestCase):
+    def setUp(self):
+        self.persistdir = tempfile.mkdtemp(prefix="dnf-persistor-test-")
+        self.persistor = dnf.persistor.TempfilePersistor(self.persistdir)
+
+    def tearDown(self):
+        dnf.util.rm_rf(self.persistdir)
+
+    def test_tempfiles(self):
+        self.persistor.tempfiles_to_add = set(['a.rpm', 'b.rpm'])
+        self.persistor.save()
+        persistor = dnf.persistor.TempfilePersistor(self.persistdir)
+        persistor.tempfiles_to_add = set(['b.rpm', 'c.rpm'])
+        persistor.save()
+        self.assertCountEqual(persistor.get_saved_tempfiles(),
+                              ['a.rpm', 'b.rpm', 'c.rpm'])
+
+        persistor.empty()
+        persistor.save()
+        self.assertEqual(persistor.get_saved_tempfiles(), [])
+
+    def test_journal_merged(self):
+        self.persistor.JOURNAL_MIN_SIZE = 0
+        self.persistor.tempfiles_to_add = set(['a.rpm'])
+        self.persistor.save()
+        self.assertFalse(os.path.exists(self.persistor.journal_path))
+        with open(self.persistor.db_path) as f:
+            self.assertEqual(json.load(f), ['a.rpm'])
+
+    def test_interrupted_append(self):
+        self.persistor.tempfiles_to_add = set(['a.rpm'])
+        self.persistor.save()
+        with open(self.persistor.journal_path, 'a') as f:
+            f.write('"b.r')
+        self.assertEqual(self.persistor.get_saved_tempfiles(), ['a.rpm'])
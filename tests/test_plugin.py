@@ -20,11 +20,17 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import os
+import shutil
+import sys
+import tempfile
+
 import dnf.logging
 import dnf.plugin
 import dnf.pycomp
 
 import tests.support
+from tests.support import mock
 
 
 PLUGINS = "%s/tests/plugins" % tests.support.dnf_toplevel()
@@ -80,6 +86,59 @@ class PluginTest(tests.support.TestCase):
         base.close()
 
 
+HOOKED_PLUGIN = """
+import dnf.plugin
+
+
+class HookedPlugin(dnf.plugin.Plugin):
+
+    name = 'hooked'
+
+    def config(self):
+        self.base.hooked = True
+"""
+
+
+class PluginManifestTest(tests.support.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="dnf-plugin-test-")
+        with open(os.path.join(self.tmpdir, 'hooked_manifest.py'), 'w') as f:
+            f.write(HOOKED_PLUGIN)
+        self.manifest = os.path.join(self.tmpdir, 'plugins.json')
+        self.conf = testconf()
+        self.conf.pluginpath = [PLUGINS, self.tmpdir]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        sys.modules.pop(dnf.plugin.DYNAMIC_PACKAGE, None)
+        sys.modules.pop('%s.hooked_manifest' % dnf.plugin.DYNAMIC_PACKAGE, None)
+
+    def _load(self):
+        plugins = dnf.plugin.Plugins()
+        plugins._load(self.conf, (), (), self.manifest)
+        return plugins
+
+    def test_deferred_import(self):
+        plugins = self._load()
+        self.assertEqual(sorted(p.name for p in plugins.plugin_cls),
+                         ['hooked', 'lucky'])
+        self.assertTrue(os.path.exists(self.manifest))
+        plugins._unload()
+        module = '%s.hooked_manifest' % dnf.plugin.DYNAMIC_PACKAGE
+        del sys.modules[module]
+
+        plugins = self._load()
+        self.assertEqual(sorted(p.name for p in plugins.plugin_cls),
+                         ['hooked', 'lucky'])
+        base = mock.Mock(hooked=False)
+        plugins._run_init(base, None)
+        plugins._run_pre_config()
+        self.assertNotIn(module, sys.modules)
+        plugins._run_config()
+        self.assertIn(module, sys.modules)
+        self.assertTrue(base.hooked)
+
+
 class PluginSkipsTest(tests.support.TestCase):
     def test_skip(self):
         self.plugins = dnf.plugin.Plugins()
@@ -60,3 +60,27 @@ class TestRepoDict(TestCase):
 
     def test_all(self):
         self.assertCountEqual(self.repos.all(), self.full_set)
+
+    def test_get_matching_index(self):
+        self.assertEqual(list(self.repos.get_matching('x?')), [self.xx])
+        self.assertEqual(list(self.repos.get_matching('[yz]')), [self.y, self.z])
+        del self.repos['xx']
+        self.assertEqual(list(self.repos.get_matching('x*')), [self.x])
+        conf = tests.support.FakeConf()
+        xy = tests.support.MockRepo('xy', conf)
+        self.repos.add(xy)
+        self.assertEqual(list(self.repos.get_matching('x*')), [self.x, xy])
+
+    def test_get_matching_order(self):
+        # the order the repos were added in, whatever their priority
+        self.x.priority = 100
+        self.assertEqual(list(self.repos.get_matching('*')),
+                         [self.x, self.xx, self.y, self.z])
+
+    def test_enable_source_repos(self):
+        conf = tests.support.FakeConf()
+        source = tests.support.MockRepo('x-source', conf)
+        source.disable()
+        self.repos.add(source)
+        self.repos.enable_source_repos()
+        self.assertTrue(source.enabled)
@@ -100,6 +100,17 @@ class ArgParseTest(tests.support.TestCase):
         tests.support.command_configure(self.cmd, ['/var/foobar'])
         self.assertIsNone(self.cmd.opts.file)
 
+    def test_json(self):
+        tests.support.command_configure(self.cmd, ['--jsonl', 'pepper'])
+        self.assertEqual(self.cmd.opts.json_output, 'jsonl')
+
+    @mock.patch('argparse.ArgumentParser.print_help', lambda x: x)
+    def test_json_conflict(self):
+        with self.assertRaises(SystemExit) as sysexit, \
+                tests.support.patch_std_streams() as (stdout, stderr):
+                tests.support.command_configure(self.cmd, ['--json', '--info'])
+        self.assertEqual(sysexit.exception.code, 1)
+
 
 class FilelistFormatTest(tests.support.TestCase):
     def test_filelist(self):
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+
+import dnf.yum.rpmtrans
+
+import tests.support
+from tests.support import mock
+
+
+class OutputReaderTest(tests.support.TestCase):
+
+    def setUp(self):
+        read_fd, self.write_fd = os.pipe()
+        self.reader = dnf.yum.rpmtrans._OutputReader(read_fd, limit=100)
+        self.addCleanup(self.reader.close)
+        self.addCleanup(os.close, self.write_fd)
+
+    def test_read(self):
+        self.assertIsNone(self.reader.read())
+        os.write(self.write_fd, b'scriptlet output\n')
+        self.assertEqual(self.reader.read(), b'scriptlet output\n')
+        self.assertIsNone(self.reader.read())
+
+    def test_overflow(self):
+        os.write(self.write_fd, b'a' * 250 + b'b' * 50)
+        out = self.reader.read()
+        self.assertEqual(out, b'[200 bytes of output dropped]\n' + b'a' * 50 + b'b' * 50)
+        os.write(self.write_fd, b'c')
+        self.assertEqual(self.reader.read(), b'c')
+
+    def test_close(self):
+        # rpm keeps its own copy of the write end open
+        os.write(self.write_fd, b'kept')
+        self.reader.close()
+        self.assertFalse(self.reader._thread.is_alive())
+        self.assertEqual(self.reader.read(), b'kept')
+        self.reader.close()
+
+    def test_close_reuses_fd(self):
+        self.reader.close()
+        # the thread has closed its fd, a new pipe may get the same number
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, write_fd)
+        other = dnf.yum.rpmtrans._OutputReader(read_fd)
+        self.addCleanup(other.close)
+        os.write(write_fd, b'other')
+        self.assertEqual(other.read(), b'other')
+        self.assertIsNone(self.reader.read())
+
+
+class RPMTransactionTest(tests.support.TestCase):
+
+    def test_shutdown_output_logging(self):
+        base = mock.Mock()
+        base.conf.rpmverbosity = 'info'
+        cb = dnf.yum.rpmtrans.RPMTransaction(base)
+        reader = cb._readpipe
+        cb._shutdownOutputLogging()
+        self.assertFalse(reader._thread.is_alive())
+        # the fallback in __del__ has nothing left to do
+        with mock.patch.object(reader, 'close') as close:
+            cb.__del__()
+        close.assert_not_called()
@@ -65,6 +65,16 @@ class SackTest(tests.support.DnfBaseTestCase):
         peppers = self.base.sack.query().filter(name='pepper', reponame='main')
         self.assertLength(peppers, 0)
 
+    def test_excludepkgs_mixed_patterns(self):
+        self.base.conf.excludepkgs = ['pepper', 'tour-*', 'lib*.i686', 'hole']
+        self.base._setup_excludes_includes()
+        names = set(pkg.name for pkg in self.base.sack.query())
+        self.assertNotIn('pepper', names)
+        self.assertNotIn('tour', names)
+        self.assertNotIn('hole', names)
+        librita = self.base.sack.query().filter(name='librita').run()
+        self.assertEqual([str(pkg) for pkg in librita], ["librita-1-1.x86_64"])
+
     def test_excludepkgs_includepkgs(self):
         self.base.conf.excludepkgs = ['*.i?86']
         self.base.conf.includepkgs = ['lib*']
@@ -21,6 +21,9 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 import operator
+import os
+import shutil
+import tempfile
 
 import dnf.util
 
@@ -206,6 +209,24 @@ class Util(tests.support.TestCase):
         self.assertIsNone(dnf.util.strip_prefix("razorblade", "blade"))
         self.assertEqual(dnf.util.strip_prefix("razorblade", "razor"), "blade")
 
+    def test_atomic_write(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'sub', 'data.json')
+        with dnf.util._atomic_write(path) as f:
+            f.write('new')
+        with open(path) as f:
+            self.assertEqual(f.read(), 'new')
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+
+        with self.assertRaises(ValueError):
+            with dnf.util._atomic_write(path) as f:
+                f.write('partial')
+                raise ValueError()
+        with open(path) as f:
+            self.assertEqual(f.read(), 'new')
+        self.assertEqual(os.listdir(os.path.dirname(path)), ['data.json'])
+
     def test_touch(self):
         self.assertRaises(OSError, dnf.util.touch,
                           tests.support.NONEXISTENT_FILE, no_create=True)